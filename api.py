@@ -0,0 +1,400 @@
+"""
+Layanan HTTP/JSON untuk analisis MSY/JTB ikan kurisi.
+
+Memakai pipeline yang sama dengan aplikasi Streamlit (main.py) sehingga sistem lain
+(portal perizinan, dashboard kuota) bisa mengambil JTB dan status stok tanpa UI.
+
+Jalankan:
+    python api.py --port 8000
+
+Endpoint:
+    GET  /health   -> {"status": "ok"}
+    POST /analyze  -> hasil analisis_status_stok + ringkasan model MSY
+    POST /status   -> klasifikasi status stok untuk banyak stok sekaligus (array kolom)
+
+Body yang tidak valid dijawab 400 dan kesalahan tak terduga 500, keduanya berupa {"error": "..."}.
+
+Contoh body /analyze:
+    {
+        "production": [{"Tahun": 2018, "Jaring_Hela_Dasar": 6105, "Pancing": 811}, ...],
+        "effort":     [{"Tahun": 2018, "Jaring_Hela_Dasar": 2430, "Pancing": 246}, ...],
+        "models": ["Schaefer", "Fox"],
+        "r": 0.58
+    }
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+import main
+
+MODEL_TERSEDIA = ('Schaefer', 'Fox')
+KOLOM_NON_ALAT = ('Tahun', 'Jumlah')
+# Rentang r yang diterima, sama dengan input r di sidebar aplikasi
+BATAS_R = (0.1, 2.0)
+
+
+class PermintaanTidakValid(ValueError):
+    """Body permintaan tidak bisa dianalisis (dikembalikan sebagai HTTP 400)"""
+
+
+def ke_json(obj):
+    """Konversi hasil analisis (tipe numpy, NaN) ke nilai yang aman untuk JSON"""
+    if isinstance(obj, dict):
+        return {str(k): ke_json(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple, np.ndarray)):
+        return [ke_json(v) for v in obj]
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, float) and not math.isfinite(obj):
+        return None
+    return obj
+
+
+def angka(nilai, nama, batas=None):
+    """Nilai numerik hingga (bukan bool/string), opsional dalam `batas` (min, maks), atau PermintaanTidakValid"""
+    if isinstance(nilai, bool) or not isinstance(nilai, (int, float)) or not math.isfinite(nilai):
+        raise PermintaanTidakValid(f"{nama} harus berupa angka")
+    if batas is not None and not batas[0] <= nilai <= batas[1]:
+        raise PermintaanTidakValid(f"{nama} harus di antara {batas[0]} dan {batas[1]}")
+    return float(nilai)
+
+
+def daftar_teks(nilai, nama):
+    """List string tidak kosong atau PermintaanTidakValid"""
+    if not isinstance(nilai, list) or not nilai or not all(isinstance(v, str) and v for v in nilai):
+        raise PermintaanTidakValid(f"{nama} harus berupa list nama (string) yang tidak kosong")
+    return nilai
+
+
+def pilihan(payload, kunci, bawaan, opsi):
+    """Nilai string yang harus salah satu kunci `opsi`"""
+    nilai = payload.get(kunci, bawaan)
+    if not isinstance(nilai, str) or nilai not in opsi:
+        raise PermintaanTidakValid(f"{kunci} harus salah satu dari {list(opsi)}")
+    return nilai
+
+
+def siapkan_parameter(payload):
+    """Validasi body JSON dan ubah menjadi argumen jalankan_pipeline_analisis"""
+    if not isinstance(payload, dict):
+        raise PermintaanTidakValid("Body harus berupa objek JSON")
+
+    production_data = payload.get('production')
+    effort_data = payload.get('effort')
+    if not production_data or not effort_data:
+        raise PermintaanTidakValid("Field 'production' dan 'effort' wajib diisi (list baris per tahun)")
+    for nama, rows in (('production', production_data), ('effort', effort_data)):
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise PermintaanTidakValid(f"Field '{nama}' harus berupa list objek (satu objek per baris)")
+
+    kolom_waktu = payload.get('kolom_waktu', 'Tahun')
+    if not isinstance(kolom_waktu, str) or not kolom_waktu:
+        raise PermintaanTidakValid("kolom_waktu harus berupa nama kolom (string)")
+    if payload.get('gears') is not None:
+        gears = daftar_teks(payload['gears'], 'gears')
+        if len(set(gears)) != len(gears) or any(gear in KOLOM_NON_ALAT or gear == kolom_waktu for gear in gears):
+            raise PermintaanTidakValid("gears harus unik dan tidak boleh memuat kolom waktu atau 'Jumlah'")
+    else:
+        gears = [k for k in production_data[0] if k not in KOLOM_NON_ALAT and k != kolom_waktu]
+    if not gears:
+        raise PermintaanTidakValid("Tidak ada kolom alat tangkap pada data produksi")
+
+    display_names = payload.get('display_names')
+    if display_names is not None and len(daftar_teks(display_names, 'display_names')) != len(gears):
+        raise PermintaanTidakValid("display_names harus sepanjang daftar alat tangkap")
+
+    standard_gear = payload.get('standard_gear', gears[0])
+    if standard_gear not in gears:
+        raise PermintaanTidakValid(f"standard_gear harus salah satu alat tangkap pada data: {gears}")
+
+    def rapikan(rows, jenis):
+        hasil = []
+        for row in rows:
+            if kolom_waktu not in row:
+                raise PermintaanTidakValid(f"Setiap baris {jenis} wajib memiliki '{kolom_waktu}'")
+            try:
+                baris = {kolom_waktu: int(row[kolom_waktu]) if kolom_waktu == 'Tahun' else str(row[kolom_waktu])}
+                # Sel null/tidak ada dibiarkan NaN agar diisi tahap imputasi pipeline
+                baris.update({
+                    gear: math.nan if row.get(gear) is None else angka(row[gear], gear) for gear in gears
+                })
+                baris['Jumlah'] = angka(row['Jumlah'], 'Jumlah') if row.get('Jumlah') is not None else \
+                    sum(baris[g] for g in gears if not math.isnan(baris[g]))
+            except (TypeError, ValueError):
+                raise PermintaanTidakValid(f"Nilai non-numerik pada data {jenis} periode {row.get(kolom_waktu)}")
+            hasil.append(baris)
+        try:
+            urutan = main.urutan_waktu([baris[kolom_waktu] for baris in hasil])
+        except (TypeError, ValueError):
+            raise PermintaanTidakValid(f"Nilai '{kolom_waktu}' pada data {jenis} bukan tahun atau periode yang valid")
+        return [hasil[i] for i in np.argsort(urutan, kind='stable')]
+
+    production_data = rapikan(production_data, 'produksi')
+    effort_data = rapikan(effort_data, 'upaya')
+    if [r[kolom_waktu] for r in production_data] != [r[kolom_waktu] for r in effort_data]:
+        raise PermintaanTidakValid(f"{kolom_waktu} pada 'production' dan 'effort' harus sama")
+
+    models = payload.get('models') or list(MODEL_TERSEDIA)
+    if not isinstance(models, list) or any(not isinstance(model, str) or model not in MODEL_TERSEDIA for model in models):
+        raise PermintaanTidakValid(f"Model harus salah satu dari {list(MODEL_TERSEDIA)}")
+
+    r_value = angka(payload.get('r', 0.58), 'r')
+    if not BATAS_R[0] <= r_value <= BATAS_R[1]:
+        raise PermintaanTidakValid(f"r harus di antara {BATAS_R[0]} dan {BATAS_R[1]}")
+
+    metode = pilihan(payload, 'metode_standardisasi', 'fpi', main.METODE_STANDARDISASI)
+    validasi = pilihan(payload, 'metode_validasi', 'loyo', main.METODE_VALIDASI)
+    regresi = pilihan(payload, 'metode_regresi', 'ols', main.METODE_REGRESI)
+    imputasi = pilihan(payload, 'metode_imputasi', 'interpolasi', main.METODE_IMPUTASI)
+    perlakuan = pilihan(payload, 'perlakuan_imputasi', 'pakai', main.PERLAKUAN_IMPUTASI)
+    
+    daya_tangkap = payload.get('daya_tangkap')
+    if daya_tangkap is not None:
+        if not isinstance(daya_tangkap, dict):
+            raise PermintaanTidakValid("daya_tangkap harus berupa objek {kode alat: angka}")
+        daya_tangkap = {str(gear): angka(nilai, f"daya_tangkap.{gear}") for gear, nilai in daya_tangkap.items()}
+
+    konversi = payload.get('konversi')
+    if konversi is not None:
+        if not isinstance(konversi, dict) or not isinstance(konversi.get('satuan_produksi', 'kg'), str) or \
+                konversi.get('satuan_produksi', 'kg') not in main.SATUAN_PRODUKSI_KG:
+            raise PermintaanTidakValid(f"konversi.satuan_produksi harus salah satu dari {list(main.SATUAN_PRODUKSI_KG)}")
+        for kunci in ('faktor_konversi_kg_ton', 'kalibrasi_cpue', 'tahun_dasar_kalibrasi'):
+            if kunci in konversi:
+                angka(konversi[kunci], f"konversi.{kunci}", main.BATAS_KONVERSI.get(kunci))
+        if not isinstance(konversi.get('satuan_upaya', 'trip'), str):
+            raise PermintaanTidakValid("konversi.satuan_upaya harus berupa teks")
+        konversi = {**main.KONVERSI_BAKU, **konversi}
+
+    return {
+        'production_data': production_data,
+        'effort_data': effort_data,
+        'gears': gears,
+        'display_names': display_names or gears,
+        'standard_gear': standard_gear,
+        'selected_models': models,
+        'r_value': r_value,
+        'metode_standardisasi': metode,
+        'metode_validasi': validasi,
+        'metode_regresi': regresi,
+        'metode_imputasi': imputasi,
+        'perlakuan_imputasi': perlakuan,
+        'konversi': konversi,
+        'daya_tangkap': daya_tangkap,
+        'kolom_waktu': kolom_waktu
+    }
+
+
+def analisis_json(parameter):
+    """Jalankan pipeline dan kembalikan bagian hasil yang relevan untuk klien API"""
+    results = main.jalankan_pipeline_analisis(**parameter)
+    return ke_json({
+        'status': results.recommendations,
+        'msy_results': results.msy_results,
+        'hindcast': results.hindcast,
+        'kualitas_data': results.kualitas_data,
+        'imputasi': results.imputasi,
+        'konversi': results.konversi,
+        'periode': results.periode,
+        'tahun': results.years,
+        'alat_tangkap': results.gears
+    })
+
+
+KOLOM_STATUS_WAJIB = ('msy', 'f_msy', 'produksi', 'upaya')
+
+def status_massal_json(payload):
+    """
+    Klasifikasi status banyak stok sekaligus. Body berupa array kolom dengan panjang sama:
+    msy, f_msy, produksi, upaya (wajib), r, produksi_terakhir (list 3 tahun per stok), id (opsional).
+    """
+    if not isinstance(payload, dict) or any(kolom not in payload for kolom in KOLOM_STATUS_WAJIB):
+        raise PermintaanTidakValid(f"Field {list(KOLOM_STATUS_WAJIB)} wajib diisi (array per stok)")
+    try:
+        kolom = {nama: np.asarray(payload[nama], dtype=float) for nama in KOLOM_STATUS_WAJIB}
+        r = np.asarray(payload['r'], dtype=float) if 'r' in payload else None
+        produksi_terakhir = (
+            np.asarray([[np.nan if v is None else v for v in baris] for baris in payload['produksi_terakhir']], dtype=float)
+            if 'produksi_terakhir' in payload else None
+        )
+    except (TypeError, ValueError):
+        raise PermintaanTidakValid("Nilai non-numerik pada data stok")
+    
+    n = len(kolom['msy'])
+    if any(len(v) != n for v in kolom.values()) or (r is not None and len(r) != n) or \
+            (produksi_terakhir is not None and produksi_terakhir.shape[0] != n):
+        raise PermintaanTidakValid("Semua array stok harus memiliki panjang yang sama")
+    
+    df = main.klasifikasi_status_massal(
+        kolom['msy'], kolom['f_msy'], kolom['produksi'], kolom['upaya'], r, produksi_terakhir
+    )
+    if 'id' in payload:
+        df.insert(0, 'id', payload['id'])
+    return ke_json({
+        'hasil': df.to_dict('records'),
+        'ringkasan': df['status_stok'].value_counts().to_dict()
+    })
+
+
+def hash_parameter(parameter):
+    """Kunci cache: SHA-256 dari parameter yang sudah dinormalisasi"""
+    return hashlib.sha256(json.dumps(parameter, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class CacheHasil:
+    """Cache LRU hasil analisis per hash input; permintaan identik yang bersamaan berbagi satu Future"""
+
+    def __init__(self, maks_entri=256):
+        self.maks_entri = maks_entri
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def ambil_atau_hitung(self, kunci, hitung):
+        with self._lock:
+            if kunci in self._data:
+                self._data.move_to_end(kunci)
+                return self._data[kunci], True
+            future = hitung()
+            self._data[kunci] = future
+            while len(self._data) > self.maks_entri:
+                self._data.popitem(last=False)
+
+        def buang_jika_gagal(f):
+            # Jangan simpan kegagalan di cache agar permintaan berikutnya dicoba ulang
+            if f.cancelled() or f.exception() is not None:
+                self.hapus(kunci)
+        future.add_done_callback(buang_jika_gagal)
+        return future, False
+
+    def hapus(self, kunci):
+        with self._lock:
+            self._data.pop(kunci, None)
+
+
+class HandlerAnalisis(BaseHTTPRequestHandler):
+    server_version = "KurisiMSY/1.0"
+
+    def kirim_json(self, kode, data):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(kode)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.tangani(self.proses_get)
+
+    def do_POST(self):
+        self.tangani(self.proses_post)
+
+    def tangani(self, proses):
+        # Kesalahan tak terduga tetap dijawab JSON 500, bukan koneksi yang terputus
+        try:
+            proses()
+        except Exception as e:
+            self.log_error("Kesalahan internal: %r", e)
+            self.kirim_json(500, {'error': f'Kesalahan internal server: {e}'})
+
+    def baca_json(self):
+        panjang = int(self.headers.get('Content-Length', 0))
+        return json.loads(self.rfile.read(panjang) or b'null')
+
+    def proses_get(self):
+        if self.path == '/health':
+            self.kirim_json(200, {'status': 'ok'})
+        else:
+            self.kirim_json(404, {'error': 'Endpoint tidak ditemukan'})
+
+    def proses_post(self):
+        if self.path == '/status':
+            self.proses_status()
+            return
+        if self.path != '/analyze':
+            self.kirim_json(404, {'error': 'Endpoint tidak ditemukan'})
+            return
+
+        try:
+            parameter = siapkan_parameter(self.baca_json())
+        except json.JSONDecodeError:
+            self.kirim_json(400, {'error': 'Body bukan JSON yang valid'})
+            return
+        except PermintaanTidakValid as e:
+            self.kirim_json(400, {'error': str(e)})
+            return
+
+        future, dari_cache = self.server.cache.ambil_atau_hitung(
+            hash_parameter(parameter),
+            lambda: self.server.pool.submit(analisis_json, parameter)
+        )
+        try:
+            hasil = future.result(timeout=self.server.batas_waktu)
+        except Exception as e:
+            self.kirim_json(500, {'error': f'Analisis gagal: {e}'})
+            return
+
+        self.kirim_json(200, {**hasil, 'cache': dari_cache})
+
+    def proses_status(self):
+        # Klasifikasi massal cukup cepat (vektor numpy) sehingga dijalankan langsung di thread koneksi
+        try:
+            hasil = status_massal_json(self.baca_json())
+        except json.JSONDecodeError:
+            self.kirim_json(400, {'error': 'Body bukan JSON yang valid'})
+            return
+        except PermintaanTidakValid as e:
+            self.kirim_json(400, {'error': str(e)})
+            return
+        self.kirim_json(200, hasil)
+
+    def log_message(self, format, *args):
+        if not self.server.senyap:
+            super().log_message(format, *args)
+
+
+class ServerAnalisis(ThreadingHTTPServer):
+    """Server HTTP: koneksi ditangani thread, perhitungan dijalankan di pool proses worker"""
+    daemon_threads = True
+
+    def __init__(self, alamat, jumlah_worker=None, maks_cache=256, batas_waktu=120, senyap=False):
+        super().__init__(alamat, HandlerAnalisis)
+        self.pool = ProcessPoolExecutor(max_workers=jumlah_worker or min(4, os.cpu_count() or 1))
+        self.cache = CacheHasil(maks_cache)
+        self.batas_waktu = batas_waktu
+        self.senyap = senyap
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+
+def buat_server(host='127.0.0.1', port=8000, **kwargs):
+    """Buat server (port=0 memilih port bebas, berguna untuk pengujian lokal)"""
+    return ServerAnalisis((host, port), **kwargs)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Layanan HTTP/JSON analisis MSY ikan kurisi")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=None, help="Jumlah proses worker analisis")
+    parser.add_argument('--cache', type=int, default=256, help="Jumlah maksimum hasil yang di-cache")
+    args = parser.parse_args()
+
+    server = buat_server(args.host, args.port, jumlah_worker=args.workers, maks_cache=args.cache)
+    print(f"🐟 API analisis MSY berjalan di http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
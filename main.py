@@ -5,8 +5,12 @@ import matplotlib.pyplot as plt
 import io
 from scipy import stats
 from scipy.optimize import curve_fit
+from scipy import sparse
+from scipy.sparse.linalg import lsqr
+from sklearn.linear_model import TweedieRegressor
 import warnings
 from matplotlib.ticker import FuncFormatter
+from matplotlib.figure import Figure
 import base64
 from io import BytesIO
 from reportlab.lib import colors
@@ -16,9 +20,31 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 import matplotlib
 from PIL import Image as PILImage
 import os
+import sys
+import json
+import hashlib
+import shutil
+import subprocess
+import threading
+import time
+import weakref
+import uuid
+import pickle
+import sqlite3
+import zlib
+from contextlib import closing, contextmanager
+from xlsxwriter.utility import xl_col_to_name
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+try:
+    import python_calamine  # noqa: F401  (engine Excel berbasis Rust, opsional)
+    CALAMINE_TERSEDIA = True
+except ImportError:
+    CALAMINE_TERSEDIA = False
 
 warnings.filterwarnings('ignore')
 matplotlib.use('Agg')
@@ -32,6 +58,16 @@ st.set_page_config(
     page_icon="🐟"
 )
 
+# Cache lintas sesi untuk objek sisi server (template Excel). Tahap-tahap perhitungan sengaja tidak
+# di-cache: analisis berjalan di subproses worker berumur pendek, jadi deduplikasi dataset identik
+# ditangani kunci SHA-256 antrean job, bukan st.cache_data.
+CACHE_TTL_DETIK = int(os.environ.get('KURISI_CACHE_TTL_DETIK', 3600))
+CACHE_ANALISIS = dict(
+    ttl=CACHE_TTL_DETIK,
+    max_entries=int(os.environ.get('KURISI_CACHE_MAKS_ENTRI', 256)),
+    show_spinner=False
+)
+
 # =====================================================
 # FIX FONT RENDERING
 # =====================================================
@@ -99,28 +135,44 @@ def fix_font_rendering():
 # =====================================================
 # LOAD GAMBAR IKAN KURISI
 # =====================================================
+# Lebar maksimum (px) varian gambar yang disiapkan untuk setiap tempat tampil
+UKURAN_VARIAN_GAMBAR = {'header': 600, 'sidebar': 400, 'pdf': 1000}
+
+@st.cache_resource
 def load_kurisi_image():
-    """Load gambar ikan kurisi dengan berbagai fallback options"""
+    """
+    Decode gambar ikan kurisi sekali per proses dan siapkan varian JPEG terkompresi
+    (header/sidebar/pdf) yang dipakai bersama oleh semua sesi.
+    """
     try:
         # Coba beberapa path yang mungkin
         possible_paths = [
             "kurisi.jpeg",
-            "./kurisi.jpeg",
             "images/kurisi.jpeg",
             "kurisi.jpg",
             "kurisi.png"
         ]
-        
-        for path in possible_paths:
-            if os.path.exists(path):
-                return PILImage.open(path)
-        
-        # Jika tidak ditemukan, buat placeholder
-        st.warning("⚠ Gambar ikan kurisi tidak ditemukan. Gunakan placeholder.")
-        return None
+        path = next((p for p in possible_paths if os.path.exists(p)), None)
+        
+        if path is None:
+            return {'varian': {}, 'rasio': None, 'pesan': "⚠ Gambar ikan kurisi tidak ditemukan. Gunakan placeholder."}
+        
+        with PILImage.open(path) as gambar:
+            gambar = gambar.convert('RGB')
+            varian = {}
+            for nama, lebar in UKURAN_VARIAN_GAMBAR.items():
+                salinan = gambar.copy()
+                salinan.thumbnail((lebar, lebar * gambar.height // gambar.width + 1))
+                buffer = BytesIO()
+                salinan.save(buffer, format='JPEG', quality=85, optimize=True)
+                varian[nama] = buffer.getvalue()
+            return {'varian': varian, 'rasio': gambar.height / gambar.width, 'pesan': None}
     except Exception as e:
-        st.warning(f"⚠ Error loading image: {e}")
-        return None
+        return {'varian': {}, 'rasio': None, 'pesan': f"⚠ Error loading image: {e}"}
+
+def gambar_kurisi(varian):
+    """Bytes JPEG varian gambar kurisi ('header', 'sidebar', 'pdf'), atau None bila tidak tersedia"""
+    return load_kurisi_image()['varian'].get(varian)
 
 # =====================================================
 # INISIALISASI SESSION STATE
@@ -180,6 +232,28 @@ def initialize_session_state():
     if 'r_value' not in st.session_state:
         st.session_state.r_value = 0.58
     
+    if 'metode_standardisasi' not in st.session_state:
+        st.session_state.metode_standardisasi = 'fpi'
+    
+    if 'metode_validasi' not in st.session_state:
+        st.session_state.metode_validasi = 'loyo'
+    
+    if 'metode_regresi' not in st.session_state:
+        st.session_state.metode_regresi = 'ols'
+    
+    if 'metode_imputasi' not in st.session_state:
+        st.session_state.metode_imputasi = 'interpolasi'
+    
+    if 'perlakuan_imputasi' not in st.session_state:
+        st.session_state.perlakuan_imputasi = 'pakai'
+    
+    if 'grafik_interaktif' not in st.session_state:
+        st.session_state.grafik_interaktif = False
+    
+    if 'job_analisis' not in st.session_state:
+        # Sesi baru setelah refresh: lanjutkan memantau job dari parameter URL
+        st.session_state.job_analisis = st.query_params.get('job')
+    
     if 'use_uploaded_data' not in st.session_state:
         st.session_state.use_uploaded_data = False
     
@@ -217,9 +291,11 @@ def initialize_session_state():
             'versi_analisis': '1.0'
         }
     
-    # State untuk gambar kurisi
-    if 'kurisi_image' not in st.session_state:
-        st.session_state.kurisi_image = load_kurisi_image()
+    # Gambar kurisi di-cache per proses; peringatan (bila gagal dimuat) cukup sekali per sesi
+    if 'gambar_diperiksa' not in st.session_state:
+        st.session_state.gambar_diperiksa = True
+        if load_kurisi_image()['pesan']:
+            st.warning(load_kurisi_image()['pesan'])
 
 # =====================================================
 # HEADER UTAMA DENGAN GAMBAR
@@ -248,8 +324,8 @@ def render_main_header():
         """, unsafe_allow_html=True)
     
     with col2:
-        if st.session_state.kurisi_image:
-            st.image(st.session_state.kurisi_image, 
+        if gambar_kurisi('header'):
+            st.image(gambar_kurisi('header'), 
                     caption="Ikan Kurisi (Nemipterus spp)", 
                     use_container_width=True)
         else:
@@ -367,8 +443,8 @@ def render_kurisi_info():
         col1, col2 = st.columns([1, 2])
         
         with col1:
-            if st.session_state.kurisi_image:
-                st.image(st.session_state.kurisi_image, 
+            if gambar_kurisi('sidebar'):
+                st.image(gambar_kurisi('sidebar'), 
                         caption="Ikan Kurisi (Nemipterus spp)", 
                         use_container_width=True)
             else:
@@ -472,41 +548,68 @@ def render_kurisi_info():
 # =====================================================
 # TEMPLATE EXCEL
 # =====================================================
-def create_excel_template():
-    """Membuat template Excel (Produksi dalam kg, Upaya dalam trip)"""
-    production_data = {
+DATA_CONTOH_TEMPLATE = {
+    'production': pd.DataFrame({
         'Tahun': [2018, 2019, 2020, 2021, 2022, 2023, 2024],
         'Jaring_Insang_Tetap': [1004, 2189, 122, 8, 23, 67, 0],
         'Jaring_Hela_Dasar': [6105, 10145, 9338, 10439, 10880, 13174, 12512],
         'Bagan_Berperahu': [628, 77, 187, 377, 189, 33, 315],
-        'Pancing': [811, 396, 311, 418, 21, 13, 85],
-        'Jumlah': [8548, 12807, 9958, 11242, 11113, 13287, 12912]
-    }
-
-    effort_data = {
+        'Pancing': [811, 396, 311, 418, 21, 13, 85]
+    }).to_dict('records'),
+    'effort': pd.DataFrame({
         'Tahun': [2018, 2019, 2020, 2021, 2022, 2023, 2024],
         'Jaring_Insang_Tetap': [6452, 9894, 10122, 11010, 18796, 15899, 16151],
         'Jaring_Hela_Dasar': [2430, 6270, 7076, 7315, 10183, 8205, 7241],
         'Bagan_Berperahu': [2434, 1835, 1915, 1445, 1151, 777, 1047],
-        'Pancing': [246, 139, 191, 162, 77, 78, 71],
-        'Jumlah': [11562, 18138, 19304, 19932, 30207, 24959, 24510]
-    }
+        'Pancing': [246, 139, 191, 162, 77, 78, 71]
+    }).to_dict('records')
+}
+
+GEARS_CONTOH_TEMPLATE = ['Jaring_Insang_Tetap', 'Jaring_Hela_Dasar', 'Bagan_Berperahu', 'Pancing']
 
-    df_prod = pd.DataFrame(production_data)
-    df_eff = pd.DataFrame(effort_data)
+def _tabel_template(baris, gears, tahun):
+    """Tabel Tahun × alat untuk template; tahun/alat tanpa data dibiarkan kosong"""
+    df = pd.DataFrame(baris or [], columns=None if baris else ['Tahun'])
+    df = df.drop_duplicates('Tahun').set_index('Tahun').reindex(columns=gears).reindex(tahun)
+    df.index.name = 'Tahun'
+    return df.reset_index()
 
+@st.cache_data(**CACHE_ANALISIS)
+def create_excel_template(gears=None, tahun_awal=None, tahun_akhir=None, sumber='contoh'):
+    """
+    Membuat template Excel (Produksi dalam kg, Upaya dalam trip) untuk daftar alat dan rentang tahun.
+    `sumber`: 'contoh', 'kosong', atau id analisis tersimpan yang data historisnya dipakai sebagai isian.
+    Di-cache per parameter sehingga template besar cukup dibuat sekali.
+    """
+    if sumber == 'contoh':
+        data = DATA_CONTOH_TEMPLATE
+    elif sumber == 'kosong':
+        data = {'production': [], 'effort': []}
+    else:
+        state_proyek, _ = muat_analisis_tersimpan(sumber, dengan_hasil=False)
+        data = (state_proyek or {}).get('data_tables') or {'production': [], 'effort': []}
+    
+    gears = list(gears or GEARS_CONTOH_TEMPLATE)
+    tahun_data = [baris['Tahun'] for baris in data['production']] or [2018, 2024]
+    tahun = list(range(int(tahun_awal or min(tahun_data)), int(tahun_akhir or max(tahun_data)) + 1))
+    
     output = io.BytesIO()
     with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        df_prod.to_excel(writer, sheet_name='Produksi', index=False)
-        df_eff.to_excel(writer, sheet_name='Upaya', index=False)
-
-        workbook = writer.book
-        num_fmt = workbook.add_format({'num_format': '#,##0'})
-
-        for sheet in ['Produksi', 'Upaya']:
+        num_fmt = writer.book.add_format({'num_format': '#,##0'})
+        kolom_akhir = xl_col_to_name(len(gears))
+        
+        for sheet, kunci in (('Produksi', 'production'), ('Upaya', 'effort')):
+            df = _tabel_template(data[kunci], gears, tahun)
+            df.to_excel(writer, sheet_name=sheet, index=False)
             ws = writer.sheets[sheet]
-            ws.set_column(0, len(df_prod.columns), 16, num_fmt)
-
+            ws.set_column(0, len(gears) + 1, 16, num_fmt)
+            # Jumlah sebagai rumus (dengan nilai awal) agar ikut berubah saat template diisi
+            ws.write(0, len(gears) + 1, 'Jumlah')
+            jumlah = df[gears].sum(axis=1).tolist()
+            for baris in range(1, len(tahun) + 1):
+                ws.write_formula(baris, len(gears) + 1, f"=SUM(B{baris + 1}:{kolom_akhir}{baris + 1})",
+                                 num_fmt, jumlah[baris - 1])
+    
     return output.getvalue()
 
 # =====================================================
@@ -536,42 +639,445 @@ def render_template_section():
         - Data numerik tanpa teks
         """)
     with col2:
-        st.download_button(
-            label="📥 Download Template Excel",
-            data=create_excel_template(),
-            file_name="Template_Data_Perikanan_kg.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            use_container_width=True
+        config = get_config()
+        # Template dibuat hanya setelah diminta; parameter yang sama dilayani dari cache
+        with st.form("form_template"):
+            gears = st.multiselect("Alat tangkap", options=config['gears'], default=config['gears'])
+            tahun_awal, tahun_akhir = st.slider(
+                "Rentang tahun", min_value=1950, max_value=2100,
+                value=(int(min(config['years'])), int(max(config['years'])))
+            )
+            tersimpan = daftar_analisis_tersimpan(batas=50)
+            label = {'contoh': "Data contoh", 'kosong': "Kosong"}
+            label.update({
+                int(row.id): f"{row.proyek} | {row.tahun_awal}-{row.tahun_akhir} | {row.disimpan}"
+                for row in tersimpan.itertuples()
+            })
+            sumber = st.selectbox("Isi dengan data", list(label), format_func=label.get)
+            siapkan = st.form_submit_button("⚙️ Siapkan Template", use_container_width=True)
+        
+        if siapkan:
+            st.session_state.parameter_template = {
+                'gears': tuple(gears or config['gears']), 'tahun_awal': tahun_awal,
+                'tahun_akhir': tahun_akhir, 'sumber': sumber
+            }
+        
+        parameter = st.session_state.get('parameter_template')
+        if parameter:
+            st.download_button(
+                label="📥 Download Template Excel",
+                data=create_excel_template(**parameter),
+                file_name=f"Template_Data_Perikanan_{parameter['tahun_awal']}-{parameter['tahun_akhir']}_kg.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                use_container_width=True
+            )
+
+# ==============================================
+# PEMERIKSAAN KUALITAS DATA (QA SEBELUM ANALISIS)
+# ==============================================
+RASIO_LONJAKAN_CPUE = 5.0       # CPUE naik/turun lebih dari 5× dibanding tahun sebelumnya
+FRAKSI_CPUE_HAMPIR_NOL = 0.02   # CPUE ≤ 2% CPUE maksimum alat tangkap tersebut
+TOLERANSI_JUMLAH = 0.005        # selisih relatif kolom Jumlah terhadap jumlah alat tangkap
+
+KOLOM_TEMUAN_QA = ['Tahun', 'Alat', 'Pemeriksaan', 'Tingkat', 'Nilai', 'Keterangan']
+
+def _temuan_sel(masker, tahun, gears, pemeriksaan, tingkat, nilai, keterangan, grup=None):
+    """Ubah matriks boolean (baris × alat) menjadi baris-baris temuan sekaligus"""
+    baris, kolom = np.nonzero(masker)
+    temuan = pd.DataFrame({
+        'Tahun': tahun[baris],
+        'Alat': np.asarray(gears, dtype=object)[kolom],
+        'Pemeriksaan': pemeriksaan,
+        'Tingkat': tingkat,
+        'Nilai': nilai[baris, kolom],
+        'Keterangan': keterangan
+    })
+    if grup is not None:
+        temuan.insert(0, 'Grup', grup[baris])
+    return temuan
+
+def periksa_kualitas_data(df_production, df_effort, gears, kolom_grup=None, kolom_waktu='Tahun'):
+    """
+    Pemeriksaan kualitas data produksi/upaya sebelum analisis, seluruhnya operasi matriks
+    (tahun × alat) sehingga ribuan grup (mis. pelabuhan) diperiksa dalam satu lintasan:
+    tahun ganda, kolom Jumlah tidak cocok, nilai negatif, produksi tanpa upaya,
+    tangkapan (hampir) nol dengan upaya tinggi, dan lonjakan CPUE antar periode.
+    `kolom_waktu` boleh beresolusi sub-tahunan; kolom Tahun pada temuan berisi label periodenya.
+    Kembalikan DataFrame temuan (kosong bila data bersih).
+    """
+    kunci = ([kolom_grup] if kolom_grup else []) + [kolom_waktu]
+    produksi = urutkan_waktu(df_production, kolom_waktu, kolom_grup)
+    upaya = urutkan_waktu(df_effort, kolom_waktu, kolom_grup)
+    temuan = []
+    
+    # Tahun ganda (per grup) pada masing-masing tabel
+    for nama_tabel, df in (('produksi', produksi), ('upaya', upaya)):
+        ganda = df.duplicated(kunci, keep=False).to_numpy()
+        if ganda.any():
+            temuan.append(_temuan_sel(
+                ganda[:, None], df[kolom_waktu].to_numpy(), ['-'], 'Tahun ganda', 'error',
+                np.full((len(df), 1), np.nan), f"Tahun muncul lebih dari sekali pada data {nama_tabel}",
+                df[kolom_grup].to_numpy() if kolom_grup else None
+            ))
+    
+    # Kolom Jumlah yang tidak sama dengan jumlah alat tangkap
+    for nama_tabel, df in (('produksi', produksi), ('upaya', upaya)):
+        if 'Jumlah' in df:
+            jumlah_alat = np.nansum(df[gears].to_numpy(dtype=float), axis=1)
+            jumlah = df['Jumlah'].to_numpy(dtype=float)
+            beda = np.abs(jumlah - jumlah_alat) > TOLERANSI_JUMLAH * np.maximum(np.abs(jumlah_alat), 1)
+            if beda.any():
+                temuan.append(_temuan_sel(
+                    beda[:, None], df[kolom_waktu].to_numpy(), ['Jumlah'], 'Jumlah tidak cocok', 'warning',
+                    (jumlah - jumlah_alat)[:, None], f"Kolom Jumlah {nama_tabel} berbeda dari jumlah alat tangkap (selisih)",
+                    df[kolom_grup].to_numpy() if kolom_grup else None
+                ))
+    
+    # Pemeriksaan per sel memakai kemunculan pertama tiap tahun dan hanya bila kedua tabel sejajar
+    produksi = produksi.drop_duplicates(kunci).reset_index(drop=True)
+    upaya = upaya.drop_duplicates(kunci).reset_index(drop=True)
+    if len(produksi) != len(upaya) or not (produksi[kunci].to_numpy() == upaya[kunci].to_numpy()).all():
+        temuan.append(pd.DataFrame([{
+            'Tahun': np.nan, 'Alat': '-', 'Pemeriksaan': 'Tahun tidak sejajar', 'Tingkat': 'error',
+            'Nilai': np.nan, 'Keterangan': "Tahun pada data produksi dan upaya tidak sama; pemeriksaan per sel dilewati"
+        }]))
+        return pd.concat(temuan, ignore_index=True)
+    
+    grup = produksi[kolom_grup].to_numpy() if kolom_grup else None
+    kelompok = produksi[kolom_grup] if kolom_grup else np.zeros(len(produksi), dtype=int)
+    tahun = produksi[kolom_waktu].to_numpy()
+    c = produksi[gears].to_numpy(dtype=float)
+    f = upaya[gears].to_numpy(dtype=float)
+    
+    kosong = np.isnan(c) | np.isnan(f)
+    temuan.append(_temuan_sel(kosong, tahun, gears, 'Sel kosong', 'info', np.where(np.isnan(c), f, c),
+                              "Produksi atau upaya kosong; akan diisi pada tahap imputasi", grup))
+    
+    negatif = (c < 0) | (f < 0)
+    temuan.append(_temuan_sel(negatif, tahun, gears, 'Nilai negatif', 'error', np.minimum(c, f),
+                              "Produksi atau upaya bernilai negatif", grup))
+    
+    tanpa_upaya = (c > 0) & (f == 0)
+    temuan.append(_temuan_sel(tanpa_upaya, tahun, gears, 'Produksi tanpa upaya', 'error', c,
+                              "Produksi tercatat tetapi upaya nol; CPUE tidak terdefinisi", grup))
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cpue = np.where(f > 0, c / f, np.nan)
+    cpue_df = pd.DataFrame(cpue, columns=gears)
+    cpue_maks = cpue_df.groupby(kelompok).transform('max').to_numpy()
+    upaya_median = pd.DataFrame(f, columns=gears).groupby(kelompok).transform('median').to_numpy()
+    
+    hampir_nol = (f > 0) & (f >= upaya_median) & (cpue <= FRAKSI_CPUE_HAMPIR_NOL * cpue_maks) & (cpue_maks > 0)
+    temuan.append(_temuan_sel(
+        hampir_nol, tahun, gears, 'Tangkapan hampir nol, upaya tinggi', 'warning', c,
+        f"CPUE ≤ {FRAKSI_CPUE_HAMPIR_NOL:.0%} CPUE maksimum alat ini sementara upaya ≥ median; "
+        "FPI mendekati nol dan dapat mendistorsi upaya standar", grup
+    ))
+    
+    cpue_sebelum = cpue_df.groupby(kelompok).shift(1).to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rasio = cpue / cpue_sebelum
+    lonjakan = (cpue > 0) & (cpue_sebelum > 0) & ((rasio > RASIO_LONJAKAN_CPUE) | (rasio < 1 / RASIO_LONJAKAN_CPUE))
+    temuan.append(_temuan_sel(
+        lonjakan, tahun, gears, 'Lonjakan CPUE', 'warning', rasio,
+        f"CPUE berubah lebih dari {RASIO_LONJAKAN_CPUE:.0f}× dibanding tahun sebelumnya (nilai = rasio)", grup
+    ))
+    
+    return pd.concat(temuan, ignore_index=True)
+
+def _format_waktu(nilai):
+    """Label waktu untuk tabel: tahun numerik tanpa desimal, label periode apa adanya"""
+    return nilai if isinstance(nilai, str) else f"{nilai:.0f}"
+
+def ringkasan_kualitas_data(temuan):
+    """Jumlah temuan per jenis pemeriksaan dan tingkat"""
+    if temuan is None or len(temuan) == 0:
+        return pd.DataFrame(columns=['Pemeriksaan', 'Tingkat', 'Jumlah'])
+    return temuan.groupby(['Pemeriksaan', 'Tingkat']).size().reset_index(name='Jumlah')
+
+def render_kualitas_data(temuan, judul="🩺 Pemeriksaan Kualitas Data"):
+    """Tampilkan hasil pemeriksaan kualitas data"""
+    temuan = pd.DataFrame(temuan, columns=KOLOM_TEMUAN_QA) if not isinstance(temuan, pd.DataFrame) else temuan
+    if len(temuan) == 0:
+        st.success(f"✅ {judul}: tidak ada anomali terdeteksi")
+        return
+    
+    jumlah_error = int((temuan['Tingkat'] == 'error').sum())
+    pesan = f"{judul}: {len(temuan)} temuan ({jumlah_error} error)"
+    (st.error if jumlah_error else st.warning)(f"⚠️ {pesan}")
+    with st.expander("📋 Detail temuan kualitas data"):
+        st.dataframe(ringkasan_kualitas_data(temuan), use_container_width=True, hide_index=True)
+        st.dataframe(temuan.style.format({'Nilai': '{:,.4g}', 'Tahun': _format_waktu}, na_rep='-'),
+                     use_container_width=True, hide_index=True)
+
+# ==============================================
+# PENYERAGAMAN SATUAN DAN KALIBRASI CPUE
+# ==============================================
+# Pengali produksi ke kg; None berarti memakai faktor konversi (kg per satuan) dari konfigurasi
+SATUAN_PRODUKSI_KG = {'kg': 1.0, 'ton': 1000.0, 'ekor': None}
+
+KONVERSI_BAKU = {
+    'satuan_produksi': 'kg',
+    'satuan_upaya': 'trip',
+    'faktor_konversi_kg_ton': 0.001,
+    'kalibrasi_cpue': 1.0,
+    'tahun_dasar_kalibrasi': 2018
+}
+
+# Rentang sah (min, maks) faktor numerik konversi; dipakai input UI dan validasi API
+BATAS_KONVERSI = {
+    'faktor_konversi_kg_ton': (0.001, 1000.0),
+    'kalibrasi_cpue': (0.1, 10.0)
+}
+
+def _faktor_per_baris(df, konversi, kolom_grup=None, kolom_waktu='Tahun'):
+    """Pengali produksi dan faktor kalibrasi per baris; konversi boleh satu dict atau {grup: dict}"""
+    if kolom_grup:
+        tabel = pd.DataFrame.from_dict(konversi, orient='index').reindex(df[kolom_grup].to_numpy())
+    else:
+        tabel = pd.DataFrame([konversi] * len(df))
+    tabel = tabel.reindex(columns=list(KONVERSI_BAKU)).fillna(KONVERSI_BAKU).reset_index(drop=True)
+    
+    pengali = tabel['satuan_produksi'].map(SATUAN_PRODUKSI_KG).astype(float)
+    pengali = pengali.fillna(tabel['faktor_konversi_kg_ton'].astype(float)).to_numpy()
+    kalibrasi = np.where(
+        tahun_dari_waktu(df[kolom_waktu]) >= tabel['tahun_dasar_kalibrasi'].astype(float).to_numpy(),
+        tabel['kalibrasi_cpue'].astype(float).to_numpy(), 1.0
+    )
+    return pengali, kalibrasi
+
+def seragamkan_satuan(df_production, df_effort, gears, konversi=None, kolom_grup=None, kolom_waktu='Tahun'):
+    """
+    Tahap ingest sebelum hitung_cpue: produksi dikonversi ke kg dan CPUE dikalibrasi
+    (upaya tahun ≥ tahun dasar dibagi faktor kalibrasi, produksi tetap) sebagai operasi broadcast.
+    Data multi-grup dengan satuan berbeda memakai `konversi` = {grup: conversion_factors}.
+    Kembalikan (df_production, df_effort, info).
+    """
+    konversi = konversi or KONVERSI_BAKU
+    df_production, df_effort = df_production.copy(), df_effort.copy()
+    
+    pengali, _ = _faktor_per_baris(df_production, konversi, kolom_grup, kolom_waktu)
+    _, kalibrasi = _faktor_per_baris(df_effort, konversi, kolom_grup, kolom_waktu)
+    # Pembagi nol/negatif menghasilkan upaya tak hingga dan MSY NaN yang tampak "berhasil"
+    if not (np.all(np.isfinite(kalibrasi)) and np.all(kalibrasi > 0)):
+        raise ValueError("Faktor kalibrasi CPUE harus bernilai positif")
+    if not (np.all(np.isfinite(pengali)) and np.all(pengali > 0)):
+        raise ValueError("Faktor konversi produksi ke kg harus bernilai positif")
+    df_production[gears] = df_production[gears].to_numpy(dtype=float) * pengali[:, None]
+    df_effort[gears] = df_effort[gears].to_numpy(dtype=float) / kalibrasi[:, None]
+    df_production['Jumlah'] = df_production[gears].sum(axis=1)
+    df_effort['Jumlah'] = df_effort[gears].sum(axis=1)
+    
+    info = {
+        'pengali_produksi_kg': sorted(set(pengali.tolist())),
+        'satuan_upaya': konversi.get('satuan_upaya', 'trip') if not kolom_grup else 'campuran',
+        'tahun_terkalibrasi': np.unique(tahun_dari_waktu(df_effort[kolom_waktu])[kalibrasi != 1.0]).tolist()
+    }
+    return df_production, df_effort, info
+
+# ==============================================
+# IMPUTASI DATA HILANG
+# ==============================================
+METODE_IMPUTASI = {
+    'interpolasi': 'Interpolasi linear antar tahun',
+    'rasio_alat': 'Rasio terhadap alat tangkap lain',
+    'model': 'Model multiplikatif tahun × alat'
+}
+
+PERLAKUAN_IMPUTASI = {
+    'pakai': 'Pakai nilai imputasi dalam fit MSY',
+    'kecualikan': 'Kecualikan tahun berimputasi dari fit MSY'
+}
+
+ITERASI_MODEL_IMPUTASI = 25
+MIN_TAHUN_FIT_MSY = 3
+
+KOLOM_SEL_IMPUTASI = ['Tabel', 'Tahun', 'Alat', 'Metode', 'Nilai']
+
+def _jumlah_per_grup(nilai, kode, n_grup):
+    """Jumlah kolom per grup, dikembalikan per baris asli (setara groupby().transform('sum'))"""
+    indikator = sparse.csr_matrix(
+        (np.ones(len(kode)), (kode, np.arange(len(kode)))), shape=(n_grup, len(kode))
+    )
+    return (indikator @ nilai)[kode]
+
+def _imputasi_interpolasi(nilai, tahun, kode):
+    """Interpolasi linear per kolom di antara tahun teramati dalam grup; ujung deret diisi nilai terdekat"""
+    ada = ~np.isnan(nilai)
+    t = np.broadcast_to(np.asarray(tahun, dtype=float)[:, None], nilai.shape)
+    t_obs = pd.DataFrame(np.where(ada, t, np.nan)).groupby(kode)
+    v_obs = pd.DataFrame(nilai).groupby(kode)
+    t0, v0 = t_obs.ffill().to_numpy(), v_obs.ffill().to_numpy()
+    t1, v1 = t_obs.bfill().to_numpy(), v_obs.bfill().to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        w = np.where(t1 > t0, (t - t0) / (t1 - t0), 0.0)
+    isi = np.where(np.isnan(v0), v1, np.where(np.isnan(v1), v0, v0 + w * (v1 - v0)))
+    return np.where(ada, nilai, isi)
+
+def _imputasi_rasio_alat(nilai, kode, n_grup):
+    """Sel hilang = rasio alat (terhadap alat lain, dari tahun teramati) × jumlah alat lain tahun itu"""
+    ada = ~np.isnan(nilai)
+    x = np.where(ada, nilai, 0.0)
+    lain = x.sum(axis=1, keepdims=True) - x
+    ada_lain = (ada.sum(axis=1, keepdims=True) - ada) > 0
+    pakai = ada & ada_lain
+    pembilang = _jumlah_per_grup(np.where(pakai, x, 0.0), kode, n_grup)
+    penyebut = _jumlah_per_grup(np.where(pakai, lain, 0.0), kode, n_grup)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        isi = np.where(ada_lain & (penyebut > 0), pembilang / penyebut * lain, np.nan)
+    return np.where(ada, nilai, isi)
+
+def _imputasi_model(nilai, kode, n_grup):
+    """
+    Model log(1 + x) = efek tahun + efek alat (per grup), di-fit dengan kuadrat terkecil
+    bergantian pada sel teramati; sel hilang diisi dari prediksi model.
+    """
+    ada = ~np.isnan(nilai)
+    y = np.log1p(np.where(ada, np.maximum(nilai, 0.0), 0.0))
+    n_baris = ada.sum(axis=1, keepdims=True)
+    n_alat = _jumlah_per_grup(ada.astype(float), kode, n_grup)
+    efek_alat = np.zeros_like(y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for _ in range(ITERASI_MODEL_IMPUTASI):
+            efek_tahun = np.where(ada, y - efek_alat, 0.0).sum(axis=1, keepdims=True) / n_baris
+            efek_alat = _jumlah_per_grup(np.where(ada, y - efek_tahun, 0.0), kode, n_grup) / n_alat
+    return np.where(ada, nilai, np.expm1(efek_tahun + efek_alat))
+
+def imputasi_matriks(nilai, tahun, metode='interpolasi', grup=None):
+    """
+    Isi sel kosong (NaN) matriks tahun × alat. Sel yang tidak dapat diisi metode terpilih
+    diisi interpolasi, lalu 0 bila alat tidak pernah teramati dalam grupnya.
+    Kembalikan (nilai terisi, label metode per sel; None untuk sel asli).
+    """
+    nilai = np.asarray(nilai, dtype=float)
+    kode, unik = pd.factorize(pd.Series(np.zeros(len(nilai), dtype=int) if grup is None else grup))
+    n_grup = len(unik)
+    label = np.full(nilai.shape, None, dtype=object)
+    hilang = np.isnan(nilai)
+    if not hilang.any():
+        return nilai, label
+    
+    if metode == 'rasio_alat':
+        hasil = _imputasi_rasio_alat(nilai, kode, n_grup)
+    elif metode == 'model':
+        hasil = _imputasi_model(nilai, kode, n_grup)
+    else:
+        hasil = _imputasi_interpolasi(nilai, tahun, kode)
+    hasil = np.where(np.isfinite(hasil), np.maximum(hasil, 0.0), np.nan)
+    label[hilang & ~np.isnan(hasil)] = metode
+    
+    sisa = np.isnan(hasil)
+    if sisa.any() and metode != 'interpolasi':
+        hasil = np.where(sisa, _imputasi_interpolasi(nilai, tahun, kode), hasil)
+        label[sisa & ~np.isnan(hasil)] = 'interpolasi'
+        sisa = np.isnan(hasil)
+    label[sisa] = 'nol'
+    return np.where(sisa, 0.0, hasil), label
+
+def imputasi_data(df_production, df_effort, gears, metode='interpolasi', kolom_grup=None, kolom_waktu='Tahun'):
+    """
+    Tahap imputasi vektor atas data produksi dan upaya (boleh multi-grup/pelabuhan, resolusi waktu apa pun).
+    Kembalikan (df_production, df_effort, df_sel) dengan Jumlah dihitung ulang dan df_sel
+    menandai setiap sel yang diisi (tabel, periode, alat, metode, nilai).
+    """
+    hasil, sel = [], []
+    for nama_tabel, df in (('Produksi', df_production), ('Upaya', df_effort)):
+        df = urutkan_waktu(df, kolom_waktu, kolom_grup)
+        grup = df[kolom_grup].to_numpy() if kolom_grup else None
+        terisi, label = imputasi_matriks(
+            df[gears].to_numpy(dtype=float), urutan_waktu(df[kolom_waktu]), metode, grup
         )
+        
+        df = df.copy()
+        df[gears] = terisi
+        df['Jumlah'] = terisi.sum(axis=1)
+        hasil.append(df)
+        
+        baris, kolom = np.nonzero(label != None)  # noqa: E711 (perbandingan elemen array)
+        tanda = pd.DataFrame({
+            'Tabel': nama_tabel,
+            'Tahun': df[kolom_waktu].to_numpy()[baris],
+            'Alat': np.asarray(gears, dtype=object)[kolom],
+            'Metode': label[baris, kolom],
+            'Nilai': terisi[baris, kolom]
+        }, columns=KOLOM_SEL_IMPUTASI)
+        if kolom_grup:
+            tanda.insert(0, kolom_grup, grup[baris])
+        sel.append(tanda)
+    
+    return hasil[0], hasil[1], pd.concat(sel, ignore_index=True)
+
+def render_imputasi(info_imputasi):
+    """Tampilkan ringkasan sel yang diisi oleh tahap imputasi"""
+    sel = pd.DataFrame(info_imputasi['sel'], columns=KOLOM_SEL_IMPUTASI)
+    if len(sel) == 0:
+        return
+    
+    st.info(f"🩹 {len(sel)} sel kosong diisi ({METODE_IMPUTASI[info_imputasi['metode']]}). "
+            f"{PERLAKUAN_IMPUTASI[info_imputasi['perlakuan']]}")
+    if info_imputasi.get('catatan'):
+        st.warning(f"⚠️ {info_imputasi['catatan']}")
+    with st.expander("📋 Sel hasil imputasi"):
+        st.dataframe(sel.style.format({'Nilai': '{:,.1f}'}), use_container_width=True, hide_index=True)
 
 # ==============================================
 # FUNGSI UPLOAD DATA
 # ==============================================
-def process_uploaded_file(uploaded_file):
+UPLOAD_MAX_WORKERS = min(8, os.cpu_count() or 2)
+
+def _tulis_log(log, level, pesan):
+    """Tampilkan pesan langsung ke UI, atau simpan ke log jika berjalan di thread latar belakang"""
+    if log is None:
+        getattr(st, level)(pesan)
+    else:
+        log.append((level, pesan))
+
+NAMA_SHEET_PRODUKSI = ('produksi', 'production', 'tangkapan', 'catch')
+NAMA_SHEET_UPAYA = ('upaya', 'effort', 'trip')
+
+def pilih_sheet_data(sheet_names):
+    """Pilih sheet Produksi dan Upaya berdasarkan nama, fallback ke urutan sheet"""
+    def cari(kata_kunci, kecuali=None):
+        for name in sheet_names:
+            if name != kecuali and any(kata in str(name).lower() for kata in kata_kunci):
+                return name
+        return None
+    
+    production_name = cari(NAMA_SHEET_PRODUKSI) or sheet_names[0]
+    effort_name = cari(NAMA_SHEET_UPAYA, kecuali=production_name)
+    if effort_name is None:
+        effort_name = next((name for name in sheet_names if name != production_name), None)
+    return production_name, effort_name
+
+def process_uploaded_file(uploaded_file, log=None):
     """Proses file yang diupload (Excel atau CSV)"""
     try:
         if uploaded_file.name.endswith('.xlsx') or uploaded_file.name.endswith('.xls'):
-            excel_data = pd.read_excel(uploaded_file, sheet_name=None)
-            st.info(f"📊 Sheet yang ditemukan: {list(excel_data.keys())}")
-            sheet_names = list(excel_data.keys())
-            
-            if len(sheet_names) >= 2:
-                production_sheet = excel_data[sheet_names[0]]
-                effort_sheet = excel_data[sheet_names[1]]
-                st.success(f"✅ Menggunakan sheet 1 ({sheet_names[0]}) sebagai Produksi")
-                st.success(f"✅ Menggunakan sheet 2 ({sheet_names[1]}) sebagai Upaya")
-            else:
-                production_sheet = excel_data[sheet_names[0]]
-                effort_sheet = None
-                st.warning("⚠ Hanya 1 sheet ditemukan. Data upaya akan dibuat otomatis.")
+            # Baca indeks sheet dulu, lalu parse hanya sheet Produksi dan Upaya
+            # (openpyxl dibuka read-only/values-only oleh pandas; calamine dipakai jika tersedia)
+            engine = 'calamine' if CALAMINE_TERSEDIA else None
+            with pd.ExcelFile(uploaded_file, engine=engine) as excel_file:
+                sheet_names = excel_file.sheet_names
+                _tulis_log(log, 'info', f"📊 Sheet yang ditemukan: {sheet_names}")
+                production_name, effort_name = pilih_sheet_data(sheet_names)
+                
+                production_sheet = excel_file.parse(production_name)
+                _tulis_log(log, 'success', f"✅ Menggunakan sheet ({production_name}) sebagai Produksi")
+                
+                if effort_name is not None:
+                    effort_sheet = excel_file.parse(effort_name)
+                    _tulis_log(log, 'success', f"✅ Menggunakan sheet ({effort_name}) sebagai Upaya")
+                else:
+                    effort_sheet = None
+                    _tulis_log(log, 'warning', "⚠ Hanya 1 sheet ditemukan. Data upaya akan dibuat otomatis.")
                 
         elif uploaded_file.name.endswith('.csv'):
             csv_data = pd.read_csv(uploaded_file)
             production_sheet = csv_data
             effort_sheet = None
-            st.info("📊 File CSV dibaca sebagai data produksi")
+            _tulis_log(log, 'info', "📊 File CSV dibaca sebagai data produksi")
         else:
-            st.error("❌ Format file tidak didukung.")
+            _tulis_log(log, 'error', "❌ Format file tidak didukung.")
             return None
         
         return {
@@ -581,123 +1087,287 @@ def process_uploaded_file(uploaded_file):
         }
         
     except Exception as e:
-        st.error(f"❌ Error membaca file: {str(e)}")
+        _tulis_log(log, 'error', f"❌ Error membaca file: {str(e)}")
         return None
 
-def validate_uploaded_data(uploaded_data):
+def validate_uploaded_data(uploaded_data, log=None):
     """Validasi data yang diupload"""
     production_df = uploaded_data['production']
     
     if production_df is None or production_df.empty:
-        st.error("❌ Data produksi tidak ditemukan atau kosong")
+        _tulis_log(log, 'error', "❌ Data produksi tidak ditemukan atau kosong")
         return False
     
-    st.success(f"✅ Data produksi valid: {len(production_df)} baris, {len(production_df.columns)} kolom")
-    st.write(f"📋 Kolom produksi: {list(production_df.columns)}")
+    _tulis_log(log, 'success', f"✅ Data produksi valid: {len(production_df)} baris, {len(production_df.columns)} kolom")
+    _tulis_log(log, 'write', f"📋 Kolom produksi: {list(production_df.columns)}")
     
     effort_df = uploaded_data['effort']
     if effort_df is not None and not effort_df.empty:
-        st.success(f"✅ Data upaya valid: {len(effort_df)} baris, {len(effort_df.columns)} kolom")
-        st.write(f"📋 Kolom upaya: {list(effort_df.columns)}")
+        _tulis_log(log, 'success', f"✅ Data upaya valid: {len(effort_df)} baris, {len(effort_df.columns)} kolom")
+        _tulis_log(log, 'write', f"📋 Kolom upaya: {list(effort_df.columns)}")
     else:
-        st.warning("⚠ Data upaya tidak ditemukan, akan dibuat otomatis")
+        _tulis_log(log, 'error', "❌ Data upaya tidak ditemukan; CPUE tidak dapat dihitung tanpa data upaya")
+        return False
     
     return True
 
-def convert_uploaded_data(uploaded_data):
-    """Konversi data yang diupload ke format aplikasi"""
+KOLOM_PERIODE = 'Periode'
+NAMA_KOLOM_TAHUN = ('tahun', 'year', 'thn', 'yr')
+NAMA_KOLOM_PERIODE = ('periode', 'period', 'tanggal', 'date', 'waktu')
+NAMA_KOLOM_BULAN = ('bulan', 'month', 'bln')
+NAMA_BULAN = {
+    **dict.fromkeys(('jan', 'januari', 'january'), 1), **dict.fromkeys(('feb', 'februari', 'february'), 2),
+    **dict.fromkeys(('mar', 'maret', 'march'), 3), **dict.fromkeys(('apr', 'april'), 4),
+    **dict.fromkeys(('mei', 'may'), 5), **dict.fromkeys(('jun', 'juni', 'june'), 6),
+    **dict.fromkeys(('jul', 'juli', 'july'), 7), **dict.fromkeys(('agu', 'agt', 'agustus', 'aug', 'august'), 8),
+    **dict.fromkeys(('sep', 'september'), 9), **dict.fromkeys(('okt', 'oktober', 'oct', 'october'), 10),
+    **dict.fromkeys(('nov', 'november'), 11), **dict.fromkeys(('des', 'desember', 'dec', 'december'), 12)
+}
+
+def kolom_waktu_tabel(baris):
+    """Kolom waktu baris data_tables: 'Periode' untuk data sub-tahunan, selain itu 'Tahun'"""
+    return KOLOM_PERIODE if baris and KOLOM_PERIODE in baris[0] else 'Tahun'
+
+def _label_periode(waktu):
+    """Tanggal atau label periode ('2021-03', 'Mar 2021', '2021Q2') → label teks 'YYYY-MM' / 'YYYYQn' (NaN bila tidak terbaca)"""
+    label = pd.Series(np.nan, index=waktu.index, dtype=object)
+    if pd.api.types.is_datetime64_any_dtype(waktu):
+        tanggal = waktu
+    else:
+        teks = waktu.astype(str).str.strip().str.upper()
+        kuartal = teks.str.extract(r'^(\d{4})\s*-?\s*Q([1-4])$')
+        if kuartal[0].notna().any():
+            # Label kuartal tidak dicampur dengan tanggal dalam satu kolom
+            ada = kuartal[0].notna()
+            label[ada] = kuartal[0][ada] + 'Q' + kuartal[1][ada]
+            return label
+        tanggal = pd.to_datetime(teks.where(waktu.notna()), errors='coerce', format='mixed')
+    ada = tanggal.notna()
+    format_label = '%Y-%m' if (tanggal[ada].dt.day == 1).all() else '%Y-%m-%d'
+    label[ada] = tanggal[ada].dt.strftime(format_label)
+    return label
+
+def baca_waktu_upload(waktu, bulan=None):
+    """
+    Kolom waktu file upload → (nama kolom waktu, label per baris; NaN bila tidak terbaca).
+    Angka tahun → 'Tahun' (data tahunan). Tanggal, label periode ('2021-03', 'Mar 2021', '2021Q2'),
+    atau angka tahun + kolom bulan (angka atau nama bulan) → 'Periode' berlabel 'YYYY-MM' / 'YYYYQn'.
+    """
+    waktu = pd.Series(waktu)
+    if pd.api.types.is_datetime64_any_dtype(waktu):
+        return KOLOM_PERIODE, _label_periode(waktu)
+    angka = pd.to_numeric(waktu, errors='coerce')
+    if bulan is not None and angka.notna().any():
+        bulan = pd.Series(bulan, index=waktu.index)
+        nomor = pd.to_numeric(bulan, errors='coerce').fillna(bulan.astype(str).str.strip().str.lower().map(NAMA_BULAN))
+        valid = angka.notna() & nomor.between(1, 12)
+        label = pd.Series(np.nan, index=waktu.index, dtype=object)
+        label[valid] = [f"{int(t)}-{int(b):02d}" for t, b in zip(angka[valid], nomor[valid])]
+        return KOLOM_PERIODE, label
+    periode = _label_periode(waktu.where(angka.isna()))
+    if periode.notna().sum() > angka.notna().sum():
+        return KOLOM_PERIODE, periode
+    return 'Tahun', angka
+
+def convert_uploaded_data(uploaded_data, log=None):
+    """
+    Konversi data yang diupload ke format aplikasi. Kolom waktu berisi tahun menghasilkan data tahunan
+    ('Tahun'); tanggal/label periode atau kolom Tahun + Bulan menghasilkan data sub-tahunan ('Periode').
+    """
     production_df = uploaded_data['production']
     effort_df = uploaded_data['effort']
     
-    st.write("🔄 Mengkonversi format data...")
+    _tulis_log(log, 'write', "🔄 Mengkonversi format data...")
+    tabel_mentah = {}
     
     def process_dataframe(df, data_type="Produksi"):
         """Proses dataframe menjadi format aplikasi"""
-        year_columns = ['tahun', 'year', 'tahun', 'thn', 'yr']
-        year_col = None
-        for col in df.columns:
-            if str(col).lower() in year_columns:
-                year_col = col
-                break
+        def cari_kolom(nama):
+            return next((col for col in df.columns if str(col).strip().lower() in nama), None)
+        
+        year_col = cari_kolom(NAMA_KOLOM_TAHUN) or cari_kolom(NAMA_KOLOM_PERIODE)
+        month_col = cari_kolom(NAMA_KOLOM_BULAN)
         if year_col is None:
-            year_col = df.columns[0]
+            year_col = next(col for col in df.columns if col != month_col)
         
         total_columns = ['jumlah', 'total', 'sum', 'grand total', 'total produksi', 'total upaya']
         gear_columns = [col for col in df.columns 
-                       if col != year_col and str(col).lower() not in total_columns]
-        
-        st.write(f"🔧 {data_type} - Kolom tahun: '{year_col}'")
-        st.write(f"🔧 {data_type} - Kolom alat tangkap: {gear_columns}")
-        
-        result_data = []
-        for _, row in df.iterrows():
-            try:
-                year_val = row[year_col]
-                if pd.isna(year_val):
-                    continue
-                    
-                try:
-                    year_val = int(float(year_val))
-                except:
-                    continue
-                
-                year_data = {'Tahun': year_val}
-                total = 0
-                
-                for gear in gear_columns:
-                    if gear in row:
-                        value = float(row[gear]) if pd.notna(row[gear]) else 0
-                    else:
-                        value = 0
-                    year_data[gear] = value
-                    total += value
-                
-                year_data['Jumlah'] = total
-                result_data.append(year_data)
-                
-            except Exception as e:
-                st.warning(f"⚠ Skip baris {data_type} dengan error: {e}")
-                continue
-        
-        return result_data, gear_columns
+                       if col not in (year_col, month_col) and str(col).lower() not in total_columns]
+        
+        kolom_waktu, waktu = baca_waktu_upload(df[year_col], df[month_col] if month_col is not None else None)
+        _tulis_log(log, 'write', f"🔧 {data_type} - Kolom waktu: '{year_col}'"
+                                 f"{f' + ' + repr(month_col) if kolom_waktu == KOLOM_PERIODE and month_col is not None else ''}"
+                                 f" ({'sub-tahunan' if kolom_waktu == KOLOM_PERIODE else 'tahunan'})")
+        _tulis_log(log, 'write', f"🔧 {data_type} - Kolom alat tangkap: {gear_columns}")
+        
+        # Tabel mentah untuk pemeriksaan kualitas: kolom total dari file dipertahankan sebagai Jumlah
+        valid = waktu.notna()
+        mentah = df.loc[valid, gear_columns].apply(pd.to_numeric, errors='coerce')
+        mentah.insert(0, kolom_waktu, waktu[valid].astype(int) if kolom_waktu == 'Tahun' else waktu[valid])
+        total_col = next((col for col in df.columns if str(col).lower() in total_columns), None)
+        if total_col is not None:
+            mentah['Jumlah'] = pd.to_numeric(df.loc[valid, total_col], errors='coerce')
+        tabel_mentah[data_type] = mentah
+        
+        # Sel kosong/non-numerik tetap NaN; pengisian dilakukan tahap imputasi pada pipeline
+        kosong = int(mentah[gear_columns].isna().to_numpy().sum())
+        if kosong:
+            _tulis_log(log, 'warning', f"⚠ {data_type}: {kosong} sel kosong akan diisi pada tahap imputasi")
+        result_data = mentah[[kolom_waktu] + gear_columns].astype({gear: float for gear in gear_columns})
+        result_data['Jumlah'] = result_data[gear_columns].sum(axis=1)
+        
+        return result_data.to_dict('records'), gear_columns, kolom_waktu
+    
+    if effort_df is None or effort_df.empty:
+        _tulis_log(log, 'error', "❌ Data upaya tidak ditemukan; CPUE tidak dapat dihitung tanpa data upaya")
+        return None
     
-    production_data, prod_gears = process_dataframe(production_df, "Produksi")
+    production_data, prod_gears, kolom_waktu = process_dataframe(production_df, "Produksi")
+    effort_data, effort_gears, kolom_waktu_upaya = process_dataframe(effort_df, "Upaya")
     
-    if effort_df is not None and not effort_df.empty:
-        effort_data, effort_gears = process_dataframe(effort_df, "Upaya")
-        
-        if set(prod_gears) != set(effort_gears):
-            st.warning("⚠ Kolom alat tangkap tidak konsisten antara produksi dan upaya")
-            common_gears = list(set(prod_gears) & set(effort_gears))
-            if common_gears:
-                st.info(f"🔧 Menggunakan kolom umum: {common_gears}")
-                gear_columns = common_gears
-            else:
-                st.error("❌ Tidak ada kolom alat tangkap yang sama")
-                return None
+    if kolom_waktu != kolom_waktu_upaya:
+        _tulis_log(log, 'error', "❌ Resolusi waktu data produksi dan upaya berbeda (tahunan vs sub-tahunan)")
+        return None
+    
+    if set(prod_gears) != set(effort_gears):
+        _tulis_log(log, 'warning', "⚠ Kolom alat tangkap tidak konsisten antara produksi dan upaya")
+        common_gears = list(set(prod_gears) & set(effort_gears))
+        if common_gears:
+            _tulis_log(log, 'info', f"🔧 Menggunakan kolom umum: {common_gears}")
+            gear_columns = common_gears
         else:
-            gear_columns = prod_gears
+            _tulis_log(log, 'error', "❌ Tidak ada kolom alat tangkap yang sama")
+            return None
     else:
-        st.info("🔄 Membuat data upaya default...")
-        effort_data = []
-        for prod_row in production_data:
-            year_data = {'Tahun': prod_row['Tahun']}
-            total = 0
-            for gear in prod_gears:
-                value = max(100, int(np.sqrt(prod_row[gear]) * 10)) if prod_row[gear] > 0 else 100
-                year_data[gear] = value
-                total += value
-            year_data['Jumlah'] = total
-            effort_data.append(year_data)
         gear_columns = prod_gears
     
-    st.success(f"✅ Konversi selesai: {len(production_data)} tahun, {len(gear_columns)} alat tangkap")
+    satuan_waktu = 'periode' if kolom_waktu == KOLOM_PERIODE else 'tahun'
+    _tulis_log(log, 'success', f"✅ Konversi selesai: {len(production_data)} {satuan_waktu}, {len(gear_columns)} alat tangkap")
+    
+    kualitas = periksa_kualitas_data(tabel_mentah['Produksi'], tabel_mentah['Upaya'], gear_columns,
+                                     kolom_waktu=kolom_waktu)
+    if len(kualitas):
+        _tulis_log(log, 'warning', f"⚠ Pemeriksaan kualitas: {len(kualitas)} temuan")
     
     return {
         'production': production_data,
         'effort': effort_data,
         'gears': gear_columns,
-        'display_names': gear_columns
+        'display_names': gear_columns,
+        'kualitas_data': kualitas.to_dict('records')
+    }
+
+def proses_file_upload(nama_file, isi_file, progres):
+    """Baca, validasi, dan konversi satu file upload tanpa memanggil st.* (aman untuk thread pool)"""
+    log = []
+    berkas = io.BytesIO(isi_file)
+    berkas.name = nama_file
+    
+    progres['tahap'] = "📖 Membaca file..."
+    uploaded_data = process_uploaded_file(berkas, log=log)
+    if uploaded_data is None:
+        return {'status': 'error', 'label': "❌ Gagal membaca file", 'log': log, 'data': None}
+    
+    progres['tahap'] = "🔍 Memvalidasi data..."
+    if not validate_uploaded_data(uploaded_data, log=log):
+        return {'status': 'error', 'label': "❌ Data tidak valid", 'log': log, 'data': None}
+    
+    progres['tahap'] = "🔄 Mengkonversi format..."
+    converted_data = convert_uploaded_data(uploaded_data, log=log)
+    if converted_data is None:
+        return {'status': 'error', 'label': "❌ Gagal mengkonversi data", 'log': log, 'data': None}
+    
+    return {'status': 'complete', 'label': "✅ Data berhasil diproses", 'log': log, 'data': converted_data}
+
+@st.cache_resource
+def get_upload_executor():
+    """Thread pool bersama (per proses server) untuk parsing file upload di latar belakang"""
+    return ThreadPoolExecutor(max_workers=UPLOAD_MAX_WORKERS, thread_name_prefix="upload")
+
+def mulai_parsing_upload(uploaded_files):
+    """Kirim file baru ke thread pool dan kembalikan kunci job sesuai urutan upload"""
+    if 'upload_jobs' not in st.session_state:
+        st.session_state.upload_jobs = {}
+    jobs = st.session_state.upload_jobs
+    executor = get_upload_executor()
+    
+    keys = []
+    for uploaded_file in uploaded_files:
+        key = uploaded_file.file_id
+        if key not in jobs:
+            progres = {'tahap': "⏳ Menunggu giliran..."}
+            jobs[key] = {
+                'nama': uploaded_file.name,
+                'progres': progres,
+                'future': executor.submit(proses_file_upload, uploaded_file.name, uploaded_file.getvalue(), progres)
+            }
+        keys.append(key)
+    
+    # Buang job untuk file yang sudah dihapus dari uploader
+    for key in list(jobs):
+        if key not in keys:
+            jobs.pop(key)['future'].cancel()
+    
+    return keys
+
+@st.fragment(run_every=0.5)
+def pantau_parsing_upload(keys):
+    """Tampilkan progres parsing per file; rerun halaman penuh setelah semua file selesai"""
+    jobs = st.session_state.upload_jobs
+    selesai = sum(jobs[key]['future'].done() for key in keys)
+    
+    st.progress(selesai / len(keys), text=f"📤 {selesai}/{len(keys)} file selesai diproses")
+    for key in keys:
+        job = jobs[key]
+        if job['future'].done():
+            st.write(f"✅ {job['nama']}")
+        else:
+            st.write(f"{job['progres']['tahap']} — {job['nama']}")
+    
+    if selesai == len(keys):
+        st.rerun()
+
+def gabungkan_data_upload(daftar_data, log=None):
+    """Gabungkan hasil konversi beberapa file menjadi satu dataset berdasarkan kolom waktu (Tahun/Periode)"""
+    if len(daftar_data) == 1:
+        return daftar_data[0]
+    
+    resolusi = {kolom_waktu_tabel(data['production']) for data in daftar_data}
+    if len(resolusi) > 1:
+        _tulis_log(log, 'error', "❌ File tahunan dan sub-tahunan tidak dapat digabung")
+        return None
+    kolom_waktu = resolusi.pop()
+    
+    gears = []
+    for data in daftar_data:
+        for gear in data['gears']:
+            if gear not in gears:
+                gears.append(gear)
+    
+    def gabung(kunci):
+        df = pd.concat([pd.DataFrame(data[kunci]) for data in daftar_data], ignore_index=True)
+        duplikat = sorted(df.loc[df[kolom_waktu].duplicated(), kolom_waktu].unique().tolist())
+        df = df.drop_duplicates(kolom_waktu, keep='last')
+        df = df.iloc[np.argsort(urutan_waktu(df[kolom_waktu]), kind='stable')]
+        df = df.reindex(columns=[kolom_waktu] + gears)
+        df[gears] = df[gears].astype(float)
+        df['Jumlah'] = df[gears].sum(axis=1)
+        return df.to_dict('records'), duplikat
+    
+    production_data, duplikat = gabung('production')
+    effort_data, _ = gabung('effort')
+    
+    if duplikat:
+        _tulis_log(log, 'warning', f"⚠ {kolom_waktu} {duplikat} muncul di lebih dari satu file, data dari file terakhir yang dipakai")
+    _tulis_log(log, 'success', f"✅ {len(daftar_data)} file digabung: {len(production_data)} "
+                               f"{'periode' if kolom_waktu == KOLOM_PERIODE else 'tahun'}, {len(gears)} alat tangkap")
+    
+    return {
+        'production': production_data,
+        'effort': effort_data,
+        'gears': gears,
+        'display_names': gears,
+        'kualitas_data': [temuan for data in daftar_data for temuan in data.get('kualitas_data', [])]
     }
 
 def render_upload_section():
@@ -706,79 +1376,84 @@ def render_upload_section():
     render_template_section()
     st.markdown("---")
     
-    uploaded_file = st.file_uploader(
+    uploaded_files = st.file_uploader(
         "Upload file Excel atau CSV data perikanan",
         type=['xlsx', 'xls', 'csv'],
-        help="Upload file Excel dengan 2 sheet (Produksi dan Upaya) atau file CSV"
+        accept_multiple_files=True,
+        help="Upload satu atau beberapa file Excel dengan 2 sheet (Produksi dan Upaya) atau file CSV. "
+             "Beberapa file akan digabung berdasarkan Tahun."
     )
     
-    if uploaded_file is not None:
-        with st.status("📤 Memproses file...", expanded=True) as status:
-            st.write("📖 Membaca file...")
-            uploaded_data = process_uploaded_file(uploaded_file)
+    keys = mulai_parsing_upload(uploaded_files or [])
+    
+    if keys:
+        jobs = st.session_state.upload_jobs
+        
+        if not all(jobs[key]['future'].done() for key in keys):
+            pantau_parsing_upload(keys)
+        else:
+            daftar_data = []
+            for key in keys:
+                job = jobs[key]
+                hasil = job['future'].result()
+                with st.status(f"{hasil['label']}: {job['nama']}", expanded=False, state=hasil['status']):
+                    for level, pesan in hasil['log']:
+                        _tulis_log(None, level, pesan)
+                if hasil['data'] is not None:
+                    daftar_data.append(hasil['data'])
             
-            if uploaded_data is not None:
-                st.write("✅ File berhasil dibaca")
-                st.write("🔍 Memvalidasi data...")
+            converted_data = gabungkan_data_upload(daftar_data) if daftar_data else None
+            
+            if converted_data is not None:
+                st.session_state.uploaded_data = converted_data
+                
+                render_kualitas_data(converted_data.get('kualitas_data', []))
+                
+                st.subheader("👀 Preview Data")
+                col1, col2 = st.columns(2)
                 
-                if validate_uploaded_data(uploaded_data):
-                    st.write("✅ Data valid")
-                    st.write("🔄 Mengkonversi format...")
+                with col1:
+                    st.write("📊 Data Produksi")
+                    st.dataframe(
+                        pd.DataFrame(converted_data['production']).style.format({
+                            col: "{:,.1f}" for col in converted_data['gears']
+                        }), 
+                        use_container_width=True
+                    )
+                
+                with col2:
+                    st.write("🎣 Data Upaya")
+                    st.dataframe(
+                        pd.DataFrame(converted_data['effort']).style.format({
+                            col: "{:,}" for col in converted_data['gears']
+                        }), 
+                        use_container_width=True
+                    )
+                
+                if st.button("💾 Gunakan Data yang Diupload", type="primary", use_container_width=True):
+                    gears = converted_data['gears']
+                    display_names = converted_data['display_names']
+                    kolom_waktu = kolom_waktu_tabel(converted_data['production'])
+                    years = sorted(set(tahun_dari_waktu([data[kolom_waktu] for data in converted_data['production']]).tolist()))
                     
-                    converted_data = convert_uploaded_data(uploaded_data)
+                    st.session_state.gear_config = {
+                        'gears': gears,
+                        'display_names': display_names,
+                        'standard_gear': gears[0] if gears else 'Jaring_Hela_Dasar',
+                        'years': years,
+                        'num_years': len(years)
+                    }
                     
-                    if converted_data is not None:
-                        st.session_state.uploaded_data = converted_data
-                        status.update(label="✅ Data berhasil diproses!", state="complete")
-                        
-                        st.subheader("👀 Preview Data")
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            st.write("📊 Data Produksi")
-                            st.dataframe(
-                                pd.DataFrame(converted_data['production']).style.format({
-                                    col: "{:,.1f}" for col in converted_data['gears']
-                                }), 
-                                use_container_width=True
-                            )
-                        
-                        with col2:
-                            st.write("🎣 Data Upaya")
-                            st.dataframe(
-                                pd.DataFrame(converted_data['effort']).style.format({
-                                    col: "{:,}" for col in converted_data['gears']
-                                }), 
-                                use_container_width=True
-                            )
-                        
-                        if st.button("💾 Gunakan Data yang Diupload", type="primary", use_container_width=True):
-                            gears = converted_data['gears']
-                            display_names = converted_data['display_names']
-                            years = [data['Tahun'] for data in converted_data['production']]
-                            
-                            st.session_state.gear_config = {
-                                'gears': gears,
-                                'display_names': display_names,
-                                'standard_gear': gears[0] if gears else 'Jaring_Hela_Dasar',
-                                'years': years,
-                                'num_years': len(years)
-                            }
-                            
-                            st.session_state.data_tables = {
-                                'production': converted_data['production'],
-                                'effort': converted_data['effort']
-                            }
-                            
-                            st.session_state.analysis_results = None
-                            st.success("✅ Data berhasil diterapkan!")
-                            st.rerun()
-                    else:
-                        status.update(label="❌ Gagal mengkonversi data", state="error")
-                else:
-                    status.update(label="❌ Data tidak valid", state="error")
+                    st.session_state.data_tables = {
+                        'production': converted_data['production'],
+                        'effort': converted_data['effort']
+                    }
+                    
+                    st.session_state.analysis_results = None
+                    st.success("✅ Data berhasil diterapkan!")
+                    st.rerun()
             else:
-                status.update(label="❌ Gagal membaca file", state="error")
+                st.error("❌ Tidak ada file yang berhasil diproses")
     
     if st.button("← Kembali ke Menu Utama", use_container_width=True):
         st.session_state.show_upload_section = False
@@ -789,6 +1464,32 @@ def render_upload_section():
 # ==============================================
 # FUNGSI INPUT MANUAL DAN KONFIGURASI ALAT TANGKAP
 # ==============================================
+def tabel_input_manual(rows, years, gears):
+    """
+    Tabel (index Tahun × alat tangkap) untuk editor dari data tersimpan. Sel kosong atau yang belum ada
+    tetap NaN sehingga tersimpan kosong dan diisi tahap imputasi, bukan menjadi 0.
+    """
+    df = pd.DataFrame(rows)
+    if df.empty:
+        df = pd.DataFrame({'Tahun': []})
+    df = df.set_index('Tahun').reindex(index=years, columns=gears)
+    df.index.name = 'Tahun'
+    return df.apply(pd.to_numeric, errors='coerce').astype(float)
+
+def kolom_editor_input(gears, display_names, step, format):
+    return {
+        gear: st.column_config.NumberColumn(display_name, min_value=0.0, step=step, format=format)
+        for gear, display_name in zip(gears, display_names)
+    }
+
+def baris_dari_tabel_input(df_input, gears):
+    """Ubah tabel hasil editor ke format data_tables; Jumlah dihitung per kolom sekaligus"""
+    df = df_input[gears].apply(pd.to_numeric, errors='coerce').clip(lower=0.0).astype(float)
+    df['Jumlah'] = df.sum(axis=1)
+    df = df.reset_index()
+    df['Tahun'] = df['Tahun'].astype(int)
+    return df.to_dict('records')
+
 def render_manual_input_section():
     """Section untuk input manual data produksi dan upaya"""
     st.header("✏️ Input Data Manual")
@@ -882,128 +1583,57 @@ def render_manual_input_section():
             st.success("✅ Konfigurasi alat tangkap disimpan!")
             st.rerun()
     
-    # Input data produksi
-    st.markdown("---")
-    st.subheader("📊 Input Data Produksi (kg)")
-    
-    # Buat dataframe kosong untuk input
-    production_input = pd.DataFrame(index=years, columns=['Tahun'] + st.session_state.temp_gears)
-    production_input['Tahun'] = years
-    
-    # Buat input untuk setiap tahun dan alat
-    for i, year in enumerate(years):
-        st.markdown(f"**Tahun {year}**")
-        cols = st.columns(len(st.session_state.temp_gears) + 1)
-        
-        with cols[0]:
-            st.markdown(f"<div style='padding-top: 10px;'>{year}</div>", unsafe_allow_html=True)
-        
-        for j, gear in enumerate(st.session_state.temp_gears):
-            with cols[j + 1]:
-                if f"prod_{year}_{gear}" not in st.session_state:
-                    # Cari nilai existing jika ada
-                    existing_value = 0
-                    for prod in st.session_state.data_tables['production']:
-                        if prod['Tahun'] == year and gear in prod:
-                            existing_value = prod[gear]
-                            break
-                    st.session_state[f"prod_{year}_{gear}"] = existing_value
-                
-                value = st.number_input(
-                    f"",
-                    min_value=0.0,
-                    value=float(st.session_state[f"prod_{year}_{gear}"]),
-                    step=100.0,
-                    format="%.1f",
-                    key=f"prod_input_{year}_{gear}"
-                )
-                production_input.loc[production_input['Tahun'] == year, gear] = value
-                st.session_state[f"prod_{year}_{gear}"] = value
-    
-    # Input data upaya
-    st.markdown("---")
-    st.subheader("🎣 Input Data Upaya (trip)")
-    
-    # Buat dataframe kosong untuk input upaya
-    effort_input = pd.DataFrame(index=years, columns=['Tahun'] + st.session_state.temp_gears)
-    effort_input['Tahun'] = years
-    
-    # Buat input untuk setiap tahun dan alat
-    for i, year in enumerate(years):
-        st.markdown(f"**Tahun {year}**")
-        cols = st.columns(len(st.session_state.temp_gears) + 1)
-        
-        with cols[0]:
-            st.markdown(f"<div style='padding-top: 10px;'>{year}</div>", unsafe_allow_html=True)
-        
-        for j, gear in enumerate(st.session_state.temp_gears):
-            with cols[j + 1]:
-                if f"eff_{year}_{gear}" not in st.session_state:
-                    # Cari nilai existing jika ada
-                    existing_value = 0
-                    for eff in st.session_state.data_tables['effort']:
-                        if eff['Tahun'] == year and gear in eff:
-                            existing_value = eff[gear]
-                            break
-                    st.session_state[f"eff_{year}_{gear}"] = existing_value
-                
-                value = st.number_input(
-                    f"",
-                    min_value=0.0,
-                    value=float(st.session_state[f"eff_{year}_{gear}"]),
-                    step=10.0,
-                    format="%.0f",
-                    key=f"eff_input_{year}_{gear}"
-                )
-                effort_input.loc[effort_input['Tahun'] == year, gear] = value
-                st.session_state[f"eff_{year}_{gear}"] = value
+    gears = st.session_state.temp_gears
+    display_names = st.session_state.temp_display_names
     
-    # Tombol untuk menyimpan data manual
-    st.markdown("---")
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        if st.button("💾 Simpan Data Manual", type="primary", use_container_width=True):
-            # Konversi dataframe ke format aplikasi
-            production_data = []
-            effort_data = []
-            
-            for year in years:
-                # Data produksi
-                prod_row = {'Tahun': year}
-                total_prod = 0
-                for gear in st.session_state.temp_gears:
-                    value = production_input.loc[production_input['Tahun'] == year, gear].values[0]
-                    if pd.isna(value):
-                        value = 0
-                    prod_row[gear] = float(value)
-                    total_prod += float(value)
-                prod_row['Jumlah'] = total_prod
-                production_data.append(prod_row)
-                
-                # Data upaya
-                eff_row = {'Tahun': year}
-                total_eff = 0
-                for gear in st.session_state.temp_gears:
-                    value = effort_input.loc[effort_input['Tahun'] == year, gear].values[0]
-                    if pd.isna(value):
-                        value = 0
-                    eff_row[gear] = float(value)
-                    total_eff += float(value)
-                eff_row['Jumlah'] = total_eff
-                effort_data.append(eff_row)
-            
-            # Simpan ke session state
+    if kolom_waktu_tabel(st.session_state.data_tables['production']) == KOLOM_PERIODE:
+        # Editor manual berindeks tahun; menyimpannya akan membuang data periode hasil upload
+        st.info("ℹ️ Data saat ini berresolusi sub-tahunan (kolom Periode) dari file upload. Editor manual hanya "
+                "untuk data tahunan; ubah data periode melalui file upload, lalu analisis seperti biasa.")
+    else:
+        # Editor di dalam form: perubahan sel dikumpulkan di browser dan baru dikirim saat tombol ditekan,
+        # sehingga mengedit sel tidak memicu rerun. Kunci editor ikut berubah bila tahun/alat tangkap berubah.
+        tanda_tabel = zlib.crc32(repr((years, gears)).encode())
+        
+        with st.form("form_input_manual"):
+            st.subheader("📊 Input Data Produksi (kg)")
+            production_input = st.data_editor(
+                tabel_input_manual(st.session_state.data_tables['production'], years, gears),
+                column_config=kolom_editor_input(gears, display_names, step=100.0, format="%.1f"),
+                num_rows="fixed",
+                use_container_width=True,
+                key=f"editor_input_produksi_{tanda_tabel}"
+            )
+            
+            st.markdown("---")
+            st.subheader("🎣 Input Data Upaya (trip)")
+            effort_input = st.data_editor(
+                tabel_input_manual(st.session_state.data_tables['effort'], years, gears),
+                column_config=kolom_editor_input(gears, display_names, step=10.0, format="%.0f"),
+                num_rows="fixed",
+                use_container_width=True,
+                key=f"editor_input_upaya_{tanda_tabel}"
+            )
+            
+            st.markdown("---")
+            col1, col2 = st.columns(2)
+            with col1:
+                simpan = st.form_submit_button("💾 Simpan Data Manual", type="primary", use_container_width=True)
+            with col2:
+                preview = st.form_submit_button("📊 Preview Data", use_container_width=True)
+        
+        if simpan:
+            # Satu kali tulis ke data_tables untuk seluruh tabel
             st.session_state.data_tables = {
-                'production': production_data,
-                'effort': effort_data
+                'production': baris_dari_tabel_input(production_input, gears),
+                'effort': baris_dari_tabel_input(effort_input, gears)
             }
             
             # Update konfigurasi
             save_config(
-                st.session_state.temp_gears,
-                st.session_state.temp_display_names,
-                st.session_state.temp_gears[0] if st.session_state.temp_gears else 'Alat_Tangkap_1',
+                gears,
+                display_names,
+                gears[0] if gears else 'Alat_Tangkap_1',
                 years,
                 num_years
             )
@@ -1013,28 +1643,23 @@ def render_manual_input_section():
             
             st.success("✅ Data manual berhasil disimpan!")
             st.rerun()
-    
-    with col2:
-        if st.button("📊 Preview Data", use_container_width=True):
+        
+        if preview:
             st.subheader("Preview Data Produksi (kg)")
-            st.dataframe(production_input.set_index('Tahun'), use_container_width=True)
+            st.dataframe(pd.DataFrame(baris_dari_tabel_input(production_input, gears)).set_index('Tahun'), use_container_width=True)
             
             st.subheader("Preview Data Upaya (trip)")
-            st.dataframe(effort_input.set_index('Tahun'), use_container_width=True)
+            st.dataframe(pd.DataFrame(baris_dari_tabel_input(effort_input, gears)).set_index('Tahun'), use_container_width=True)
     
-    with col3:
-        if st.button("🔄 Reset Input", use_container_width=True):
-            # Hapus semua session state untuk input
-            keys_to_delete = []
-            for key in st.session_state.keys():
-                if key.startswith(('prod_', 'eff_', 'temp_')):
-                    keys_to_delete.append(key)
-            
-            for key in keys_to_delete:
-                del st.session_state[key]
-            
-            st.success("✅ Input data direset!")
-            st.rerun()
+    if st.button("🔄 Reset Input", use_container_width=True):
+        # Hapus semua session state untuk input
+        keys_to_delete = [key for key in st.session_state.keys() if key.startswith(('editor_input_', 'temp_'))]
+        
+        for key in keys_to_delete:
+            del st.session_state[key]
+        
+        st.success("✅ Input data direset!")
+        st.rerun()
     
     # Tampilkan data yang tersimpan
     st.markdown("---")
@@ -1047,7 +1672,7 @@ def render_manual_input_section():
         current_prod = pd.DataFrame(st.session_state.data_tables['production'])
         st.dataframe(
             current_prod.style.format({
-                col: "{:,.1f}" for col in current_prod.columns if col != 'Tahun'
+                col: "{:,.1f}" for col in current_prod.columns if col not in ('Tahun', KOLOM_PERIODE)
             }), 
             use_container_width=True
         )
@@ -1057,7 +1682,7 @@ def render_manual_input_section():
         current_eff = pd.DataFrame(st.session_state.data_tables['effort'])
         st.dataframe(
             current_eff.style.format({
-                col: "{:,.0f}" for col in current_eff.columns if col != 'Tahun'
+                col: "{:,.0f}" for col in current_eff.columns if col not in ('Tahun', KOLOM_PERIODE)
             }), 
             use_container_width=True
         )
@@ -1198,21 +1823,22 @@ def render_advanced_config_section():
             
             faktor_konversi = st.number_input(
                 "Faktor Konversi ke kg",
-                min_value=0.001,
-                max_value=1000.0,
+                min_value=BATAS_KONVERSI['faktor_konversi_kg_ton'][0],
+                max_value=BATAS_KONVERSI['faktor_konversi_kg_ton'][1],
                 value=st.session_state.conversion_factors['faktor_konversi_kg_ton'],
                 step=0.001,
-                help="Faktor untuk mengkonversi satuan produksi ke kg"
+                help="Berat (kg) per satuan produksi, dipakai bila satuan produksi 'ekor'. "
+                     "Satuan kg dan ton dikonversi otomatis"
             )
         
         with col2:
             kalibrasi_cpue = st.number_input(
                 "Faktor Kalibrasi CPUE",
-                min_value=0.1,
-                max_value=10.0,
+                min_value=BATAS_KONVERSI['kalibrasi_cpue'][0],
+                max_value=BATAS_KONVERSI['kalibrasi_cpue'][1],
                 value=st.session_state.conversion_factors['kalibrasi_cpue'],
                 step=0.1,
-                help="Faktor koreksi untuk CPUE"
+                help="CPUE tahun ≥ tahun dasar dikalikan faktor ini (upaya dibagi, produksi tetap)"
             )
             
             tahun_dasar = st.number_input(
@@ -1269,6 +1895,284 @@ def render_advanced_config_section():
         st.session_state.show_config_section = False
         st.rerun()
 
+# ==============================================
+# ANALISIS TREN CPUE (JENDELA BERGULIR, MANN-KENDALL, SEN, TITIK PERUBAHAN)
+# ==============================================
+ALFA_TREN = 0.05
+BATAS_SEN_LANGSUNG = 2000  # di atas ini median kemiringan dicari dengan bisection O(n log n)
+
+def kemiringan_bergulir(y, jendela):
+    """
+    Kemiringan OLS pada jendela bergulir untuk tiap kolom matriks (waktu × deret).
+    Dihitung dari jumlah kumulatif sehingga O(n) per deret; NaN diabaikan, nilai ditempatkan di akhir jendela.
+    """
+    y = np.asarray(y, dtype=float)
+    if y.ndim == 1:
+        y = y[:, None]
+    hasil = np.full(y.shape, np.nan)
+    if jendela < 2 or y.shape[0] < jendela:
+        return hasil
+    
+    valid = np.isfinite(y)
+    x = np.broadcast_to(np.arange(y.shape[0], dtype=float)[:, None], y.shape)
+    
+    def jumlah_jendela(a):
+        kumulatif = np.cumsum(np.vstack([np.zeros((1, a.shape[1])), a]), axis=0)
+        return kumulatif[jendela:] - kumulatif[:-jendela]
+    
+    k = jumlah_jendela(valid.astype(float))
+    sx = jumlah_jendela(np.where(valid, x, 0))
+    sy = jumlah_jendela(np.where(valid, y, 0))
+    sxy = jumlah_jendela(np.where(valid, x * y, 0))
+    sxx = jumlah_jendela(np.where(valid, x * x, 0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        hasil[jendela - 1:] = np.where(k >= 2, (k * sxy - sx * sy) / (k * sxx - sx * sx), np.nan)
+    return hasil
+
+def uji_mann_kendall(y):
+    """
+    Uji tren Mann-Kendall (koreksi ties). Statistik S diturunkan dari tau Kendall
+    (scipy, O(n log n)) sehingga praktis untuk deret bulanan yang panjang.
+    """
+    y = np.asarray(y, dtype=float)
+    y = y[np.isfinite(y)]
+    n = len(y)
+    if n < 3 or np.all(y == y[0]):
+        return {'n': n, 's': 0.0, 'tau': 0.0, 'z': 0.0, 'p_value': 1.0}
+    
+    tau = stats.kendalltau(np.arange(n), y).statistic
+    _, ties = np.unique(y, return_counts=True)
+    n0 = n * (n - 1) / 2
+    n_ties = np.sum(ties * (ties - 1) / 2)
+    s = tau * np.sqrt(n0 * (n0 - n_ties))
+    var_s = (n * (n - 1) * (2 * n + 5) - np.sum(ties * (ties - 1) * (2 * ties + 5))) / 18
+    z = (s - np.sign(s)) / np.sqrt(var_s)
+    return {'n': n, 's': s, 'tau': tau, 'z': z, 'p_value': 2 * stats.norm.sf(abs(z))}
+
+def kemiringan_sen(x, y):
+    """
+    Penduga kemiringan Theil-Sen (median kemiringan semua pasangan) dan intersepnya.
+    Deret pendek memakai semua pasangan secara vektor; deret panjang memakai bisection
+    di mana jumlah pasangan dengan kemiringan < b = pasangan diskordan (x, y - b·x), O(n log n) per langkah.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valid = np.isfinite(x) & np.isfinite(y)
+    x, y = x[valid], y[valid]
+    urutan = np.argsort(x, kind='stable')
+    x, y = x[urutan], y[urutan]
+    n = len(x)
+    if n < 2 or x[-1] == x[0]:
+        return np.nan, np.nan
+    
+    if n <= BATAS_SEN_LANGSUNG:
+        i, j = np.triu_indices(n, 1)
+        beda_x = x[j] - x[i]
+        kemiringan = np.median((y[j] - y[i])[beda_x != 0] / beda_x[beda_x != 0])
+    else:
+        n0 = n * (n - 1) / 2
+        
+        def jumlah_di_bawah(b):
+            return n0 * (1 - stats.kendalltau(x, y - b * x).statistic) / 2
+        
+        # Batas awal dari sampel pasangan acak, diperlebar hingga mengapit median
+        rng = np.random.default_rng(0)
+        i, j = rng.integers(0, n, (2, 20000))
+        sampel = (y[j] - y[i])[x[j] != x[i]] / (x[j] - x[i])[x[j] != x[i]]
+        bawah, atas = np.percentile(sampel, [1, 99])
+        lebar = max(atas - bawah, 1e-12)
+        while jumlah_di_bawah(bawah) > n0 / 2:
+            bawah -= lebar
+            lebar *= 2
+        while jumlah_di_bawah(atas) < n0 / 2:
+            atas += lebar
+            lebar *= 2
+        for _ in range(60):
+            tengah = (bawah + atas) / 2
+            if jumlah_di_bawah(tengah) < n0 / 2:
+                bawah = tengah
+            else:
+                atas = tengah
+            if atas - bawah <= 1e-9 * max(abs(tengah), 1.0):
+                break
+        kemiringan = (bawah + atas) / 2
+    
+    return kemiringan, np.median(y - kemiringan * x)
+
+def deteksi_titik_perubahan(y, min_segmen=3, penalti=None, maks_titik=None):
+    """
+    Deteksi titik perubahan rata-rata dengan binary segmentation. Penurunan jumlah kuadrat galat
+    untuk semua kandidat titik dalam satu segmen dihitung sekaligus dari jumlah kumulatif (O(n) per segmen).
+    Penalti default setara BIC: 2·σ²·ln(n), σ diduga dari MAD selisih berurutan.
+    Kembalikan indeks awal segmen baru (terurut).
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n < 2 * min_segmen:
+        return []
+    
+    if penalti is None:
+        selisih = np.diff(y)
+        sigma = 1.4826 * np.median(np.abs(selisih - np.median(selisih))) / np.sqrt(2)
+        if sigma <= 1e-12 * max(np.abs(y).max(), 1.0):
+            # MAD nol (atau sisa pembulatan) pada deret berpola rata: pakai simpangan baku selisih
+            sigma = np.std(selisih) / np.sqrt(2)
+        penalti = 2 * sigma ** 2 * np.log(n)
+    penalti = max(penalti, 1e-12 * max(np.var(y), 1.0) * n)
+    
+    titik = []
+    segmen = [(0, n)]
+    while segmen and (maks_titik is None or len(titik) < maks_titik):
+        awal, akhir = segmen.pop()
+        m = akhir - awal
+        if m < 2 * min_segmen:
+            continue
+        kumulatif = np.cumsum(y[awal:akhir])
+        k = np.arange(min_segmen, m - min_segmen + 1)
+        rata_kiri = kumulatif[k - 1] / k
+        rata_kanan = (kumulatif[-1] - kumulatif[k - 1]) / (m - k)
+        penurunan = k * (m - k) / m * (rata_kiri - rata_kanan) ** 2
+        terbaik = np.argmax(penurunan)
+        if penurunan[terbaik] > penalti:
+            potong = awal + k[terbaik]
+            titik.append(potong)
+            segmen.extend([(awal, potong), (potong, akhir)])
+    return sorted(titik)
+
+def arah_tren(p_value, sen):
+    """Label arah tren dari uji Mann-Kendall dan kemiringan Sen"""
+    if not np.isfinite(sen) or p_value >= ALFA_TREN or sen == 0:
+        return "➡ Tidak signifikan"
+    return "📈 Meningkat signifikan" if sen > 0 else "📉 Menurun signifikan"
+
+def perubahan_sen_persen(sen, intersep, posisi):
+    """
+    Perubahan garis Sen dari periode pertama ke terakhir, relatif terhadap nilai garis pada periode pertama (%).
+    CPUE tidak bisa negatif, jadi garis yang menembus nol dihitung sebagai -100%.
+    """
+    if len(posisi) < 2 or not np.isfinite(sen):
+        return np.nan
+    awal = intersep + sen * posisi[0]
+    akhir = intersep + sen * posisi[-1]
+    if awal <= 0:
+        return np.nan
+    return (max(akhir, 0.0) - awal) / awal * 100
+
+def analisis_tren_cpue(df, kolom, kolom_waktu='Tahun', jendela=None):
+    """
+    Mesin tren CPUE untuk beberapa deret sekaligus (alat tangkap dan total) pada resolusi data aslinya:
+    kemiringan jendela bergulir (vektor untuk semua deret), uji Mann-Kendall, kemiringan Sen,
+    dan titik perubahan rata-rata. Waktu boleh berupa tahun atau label periode ('2021-03', '2021Q2');
+    kemiringan dinyatakan per tahun.
+    """
+    waktu = df[kolom_waktu].to_numpy()
+    posisi = urutan_waktu(df[kolom_waktu])
+    nilai = df[kolom].to_numpy(dtype=float)
+    n = len(waktu)
+    jendela = int(jendela or np.clip(n // 2, 3, 12))
+    
+    # Kemiringan per tahun (mis. kg/trip per tahun) bila langkah waktu seragam
+    langkah = np.median(np.diff(posisi)) if n > 1 else 1
+    bergulir = pd.DataFrame(kemiringan_bergulir(nilai, jendela) / langkah, columns=kolom)
+    bergulir.insert(0, kolom_waktu, waktu)
+    
+    baris = []
+    garis_sen = {}
+    titik_perubahan = {}
+    for i, nama in enumerate(kolom):
+        y = nilai[:, i]
+        valid = np.isfinite(y)
+        mk = uji_mann_kendall(y)
+        sen, intersep = kemiringan_sen(posisi, y)
+        titik = [waktu[valid][t] for t in deteksi_titik_perubahan(y[valid])]
+        titik = [t.item() if isinstance(t, np.generic) else t for t in titik]
+        garis_sen[nama] = (sen, intersep)
+        titik_perubahan[nama] = titik
+        
+        baris.append({
+            'Deret': nama,
+            'Tau Kendall': mk['tau'],
+            'Z': mk['z'],
+            'p-value': mk['p_value'],
+            'Kemiringan Sen': sen,
+            'Perubahan Sen (%)': perubahan_sen_persen(sen, intersep, posisi[valid]),
+            'Kemiringan Terakhir': bergulir[nama].iloc[-1],
+            'Arah': arah_tren(mk['p_value'], sen),
+            'Titik Perubahan': ", ".join(str(t) for t in titik) or "-"
+        })
+    
+    return {
+        'ringkasan': pd.DataFrame(baris),
+        'bergulir': bergulir,
+        'garis_sen': garis_sen,
+        'titik_perubahan': titik_perubahan,
+        'jendela': jendela,
+        'kolom_waktu': kolom_waktu
+    }
+
+def ringkas_tren_cpue(tren, nama, deret_alat=None):
+    """
+    Ringkasan tren satu deret (total) dalam bentuk tipe dasar untuk rekomendasi dan ekspor.
+    `deret_alat` ({kolom deret: nama alat}) menambahkan ringkasan per alat tangkap di 'per_alat'.
+    """
+    ringkasan = tren['ringkasan'].set_index('Deret')
+    
+    def ringkas(baris):
+        return {
+            'arah': baris['Arah'],
+            'p_value': float(baris['p-value']),
+            'kemiringan_sen': float(baris['Kemiringan Sen']),
+            'perubahan_persen': float(baris['Perubahan Sen (%)']),
+            'signifikan': bool(baris['p-value'] < ALFA_TREN)
+        }
+    
+    hasil = ringkas(ringkasan.loc[nama])
+    hasil['titik_perubahan'] = list(tren['titik_perubahan'][nama])
+    hasil['resolusi'] = tren['kolom_waktu']
+    hasil['per_alat'] = [
+        {'alat': alat, **ringkas(ringkasan.loc[kolom])} for kolom, alat in (deret_alat or {}).items()
+    ]
+    return hasil
+
+KOLOM_TREN_TOTAL = 'CPUE_Standar_Total'
+
+def kemas_tren(tren, df):
+    """Hasil analisis_tren_cpue beserta deret yang diuji dalam tipe dasar, untuk disimpan di HasilAnalisis"""
+    return {
+        'data': df.to_dict('list'),
+        'ringkasan': tren['ringkasan'].to_dict('records'),
+        'bergulir': tren['bergulir'].to_dict('list'),
+        'garis_sen': {nama: (float(sen), float(intersep)) for nama, (sen, intersep) in tren['garis_sen'].items()},
+        'titik_perubahan': tren['titik_perubahan'],
+        'jendela': tren['jendela'],
+        'kolom_waktu': tren['kolom_waktu']
+    }
+
+def buka_tren(tersimpan):
+    """Kebalikan kemas_tren: tabel kembali menjadi DataFrame"""
+    return dict(
+        tersimpan,
+        data=pd.DataFrame(tersimpan['data']),
+        ringkasan=pd.DataFrame(tersimpan['ringkasan']),
+        bergulir=pd.DataFrame(tersimpan['bergulir'])
+    )
+
+def tren_hasil(results):
+    """Tren CPUE tersimpan di hasil analisis (sumber yang sama dengan rekomendasi); hasil lama dihitung ulang"""
+    if results.tren is None:
+        df = results.df_cpue[['Tahun'] + results.gears].assign(
+            **{KOLOM_TREN_TOTAL: results.df_standard_cpue[KOLOM_TREN_TOTAL]}
+        )
+        return buka_tren(kemas_tren(analisis_tren_cpue(df, results.gears + [KOLOM_TREN_TOTAL]), df))
+    return buka_tren(results.tren)
+
+def posisi_titik_perubahan(data, tren, nama=KOLOM_TREN_TOTAL):
+    """Posisi sumbu waktu (tahun desimal) batas titik perubahan: setengah langkah sebelum periode pertama segmen baru"""
+    waktu = data[tren['kolom_waktu']]
+    posisi = pd.Series(urutan_waktu(waktu), index=waktu.to_numpy())
+    langkah = np.median(np.diff(posisi.to_numpy())) if len(posisi) > 1 else 1
+    return [float(posisi[titik]) - langkah / 2 for titik in tren['titik_perubahan'][nama]]
+
 # ==============================================
 # FUNGSI GRAFIK CPUE DENGAN REFERENSI
 # ==============================================
@@ -1302,14 +2206,15 @@ def buat_grafik_cpue_per_alat_tangkap(df_cpue, gears, display_names):
     plt.tight_layout()
     return fig
 
-def buat_grafik_trend_cpue_total(df_cpue):
-    """Buat grafik trend CPUE total per tahun"""
+def buat_grafik_trend_cpue_total(tren):
+    """Buat grafik trend CPUE standar total (tren tersimpan) dengan garis Sen dan titik perubahan"""
     fig, ax = plt.subplots(figsize=(10, 6))
     
-    years = df_cpue['Tahun'].values
-    cpue_total = df_cpue['Jumlah'].values
+    data = tren['data']
+    years = urutan_waktu(data[tren['kolom_waktu']])
+    cpue_total = data[KOLOM_TREN_TOTAL].to_numpy(dtype=float)
     
-    ax.plot(years, cpue_total, 'bo-', linewidth=2, markersize=8, label='CPUE Total')
+    ax.plot(years, cpue_total, 'bo-', linewidth=2, markersize=8 if len(years) <= 40 else 3, label='CPUE Standar Total')
     
     # Tambahkan trend line
     if len(years) > 1:
@@ -1321,13 +2226,21 @@ def buat_grafik_trend_cpue_total(df_cpue):
         slope = z[0]
         intercept = z[1]
         trend_eq = f'y = {slope:.3f}x + {intercept:.3f}'
+        sen, intersep = tren['garis_sen'][KOLOM_TREN_TOTAL]
+        if np.isfinite(sen):
+            ax.plot(years, intersep + sen * years, 'g:', linewidth=2, label='Trend Sen (robust)')
+        for i, titik in enumerate(posisi_titik_perubahan(data, tren)):
+            ax.axvline(titik, color='purple', linestyle='-.', alpha=0.6,
+                       label='Titik Perubahan' if i == 0 else None)
+        baris = tren['ringkasan'].set_index('Deret').loc[KOLOM_TREN_TOTAL]
+        trend_eq += f"\nMann-Kendall: τ = {baris['Tau Kendall']:.3f}, p = {baris['p-value']:.3f}"
         ax.text(0.05, 0.95, f'Trend: {trend_eq}', transform=ax.transAxes, 
                 fontsize=10, verticalalignment='top',
                 bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.8))
     
     ax.set_xlabel('Tahun')
-    ax.set_ylabel('CPUE Total (kg/trip)')
-    ax.set_title('Trend CPUE Total per Tahun\n(Indikator Perubahan Kelimpahan Stok)')
+    ax.set_ylabel('CPUE Standar Total (kg/trip)')
+    ax.set_title('Trend CPUE Standar Total\n(Indikator Perubahan Kelimpahan Stok)')
     ax.legend()
     ax.grid(True, alpha=0.3)
     
@@ -1338,42 +2251,76 @@ def buat_grafik_trend_cpue_total(df_cpue):
     plt.tight_layout()
     return fig
 
-def buat_grafik_cpue_vs_upaya(df_cpue, df_effort, gears, display_names):
-    """Buat grafik hubungan CPUE vs Upaya per alat tangkap"""
-    fig, axes = plt.subplots(2, 2, figsize=(14, 10))
-    axes = axes.flatten()
-    
-    for i, (gear, display_name) in enumerate(zip(gears[:4], display_names[:4])):
-        if i >= len(axes):
-            break
-            
-        ax = axes[i]
-        cpue_values = df_cpue[gear].values
-        effort_values = df_effort[gear].values
-        
-        ax.scatter(effort_values, cpue_values, s=80, alpha=0.7, color='blue')
-        
-        # Tambahkan label titik
-        years = df_cpue['Tahun'].values
-        for j, year in enumerate(years):
-            ax.annotate(str(int(year)), 
-                       (effort_values[j], cpue_values[j]),
-                       xytext=(5, 5), textcoords='offset points',
-                       fontsize=8, alpha=0.7)
-        
-        ax.set_xlabel('Upaya (trip)')
-        ax.set_ylabel('CPUE (kg/trip)')
-        ax.set_title(f'{display_name}\nHubungan CPUE vs Upaya')
+FACET_PER_HALAMAN = 12
+MAKS_KOLOM_FACET = 4
+MAKS_LABEL_FACET = 6
+
+def tata_letak_facet(n, maks_kolom=MAKS_KOLOM_FACET):
+    """Jumlah baris × kolom grid yang mendekati persegi untuk n panel"""
+    kolom = max(1, min(maks_kolom, int(np.ceil(np.sqrt(n)))))
+    return int(np.ceil(n / kolom)), kolom
+
+def indeks_label_tipis(n, maks_label=MAKS_LABEL_FACET):
+    """Indeks titik yang diberi label tahun: semua bila sedikit, selain itu tersebar merata termasuk awal dan akhir"""
+    if n <= maks_label:
+        return np.arange(n)
+    return np.unique(np.linspace(0, n - 1, maks_label).round().astype(int))
+
+def buat_halaman_cpue_vs_upaya(tahun, upaya, cpue, judul):
+    """
+    Satu halaman facet CPUE vs Upaya; `upaya` dan `cpue` berupa matriks (tahun × panel).
+    Memakai Figure tanpa pyplot agar beberapa halaman aman dirender di thread terpisah, dengan
+    margin tetap (dalam inci) karena tata letak otomatis mendominasi waktu render pada grid besar.
+    """
+    baris, kolom = tata_letak_facet(len(judul))
+    lebar, tinggi = 3.4 * kolom + 1.6, 2.9 * baris + 1.0
+    fig = Figure(figsize=(lebar, tinggi))
+    fig.subplots_adjust(left=0.8 / lebar, right=1 - 1.1 / lebar, bottom=0.75 / tinggi, top=1 - 0.45 / tinggi,
+                        wspace=0.3, hspace=0.6)
+    axes = fig.subplots(baris, kolom, squeeze=False).ravel()
+    warna = matplotlib.colors.Normalize(tahun.min(), tahun.max())
+    label = indeks_label_tipis(len(tahun))
+    ukuran = 50 if len(tahun) <= 30 else 15
+    
+    for i, ax in enumerate(axes):
+        if i >= len(judul):
+            ax.set_visible(False)
+            continue
+        # Semua titik satu alat tangkap digambar dengan satu koleksi; warna menunjukkan tahun
+        titik = ax.scatter(upaya[:, i], cpue[:, i], c=tahun, cmap='viridis', norm=warna, s=ukuran, alpha=0.8)
+        for j in label:
+            if np.isfinite(upaya[j, i]) and np.isfinite(cpue[j, i]):
+                ax.annotate(str(int(tahun[j])), (upaya[j, i], cpue[j, i]),
+                            xytext=(4, 4), textcoords='offset points', fontsize=7, alpha=0.7)
+        ax.set_title(f'{judul[i]}\nHubungan CPUE vs Upaya', fontsize=10)
+        ax.locator_params(nbins=4)
+        ax.tick_params(labelsize=8)
         ax.grid(True, alpha=0.3)
     
-    plt.tight_layout()
+    fig.supxlabel('Upaya (trip)', y=0.3 / tinggi)
+    fig.supylabel('CPUE (kg/trip)', x=0.15 / lebar)
+    sumbu_warna = fig.add_axes([1 - 0.95 / lebar, 0.75 / tinggi, 0.15 / lebar, 1 - 1.2 / tinggi])
+    fig.colorbar(titik, cax=sumbu_warna, label='Tahun', ticks=matplotlib.ticker.MaxNLocator(integer=True))
     
     # Tambahkan referensi
-    fig.text(0.02, 0.02, 'Sumber: Schaefer (1954). Relationship between CPUE and fishing effort', 
+    fig.text(0.02, 0.05 / tinggi, 'Sumber: Schaefer (1954). Relationship between CPUE and fishing effort', 
              fontsize=8, style='italic', color='gray')
-    
     return fig
 
+def buat_png_cpue_vs_upaya(df_cpue, df_effort, gears, display_names, facet_per_halaman=FACET_PER_HALAMAN):
+    """Grafik CPUE vs Upaya untuk semua alat tangkap, dibagi per halaman dan dirender paralel ke PNG"""
+    tahun = df_cpue['Tahun'].to_numpy()
+    cpue = df_cpue[gears].to_numpy(dtype=float)
+    upaya = df_effort[gears].to_numpy(dtype=float)
+    halaman = [slice(i, i + facet_per_halaman) for i in range(0, len(gears), facet_per_halaman)]
+    
+    def render(bagian):
+        fig = buat_halaman_cpue_vs_upaya(tahun, upaya[:, bagian], cpue[:, bagian], display_names[bagian])
+        return gambar_ke_png(fig, dpi=110, rapat=False)
+    
+    with ThreadPoolExecutor(max_workers=min(4, len(halaman))) as executor:
+        return list(executor.map(render, halaman))
+
 def buat_grafik_cpue_perbandingan(df_cpue, gears, display_names):
     """Buat grafik perbandingan CPUE antar alat tangkap"""
     fig, ax = plt.subplots(figsize=(12, 6))
@@ -1416,8 +2363,8 @@ def buat_grafik_cpue_perbandingan(df_cpue, gears, display_names):
     plt.tight_layout()
     return fig
 
-def render_grafik_cpue(df_cpue, df_effort, gears, display_names):
-    """Render semua grafik CPUE"""
+def render_grafik_cpue(df_cpue, df_effort, gears, display_names, tren):
+    """Render semua grafik CPUE; tab tren memakai `tren` tersimpan (tren_hasil), sama dengan rekomendasi"""
     st.header("📈 GRAFIK ANALISIS CPUE")
     
     # Tampilkan rumus CPUE
@@ -1456,8 +2403,8 @@ def render_grafik_cpue(df_cpue, df_effort, gears, display_names):
     
     with tab1:
         st.subheader("CPUE per Alat Tangkap per Tahun")
-        fig = buat_grafik_cpue_per_alat_tangkap(df_cpue, gears, display_names)
-        st.pyplot(fig)
+        tampilkan_grafik('cpue_per_alat', lambda: buat_grafik_cpue_per_alat_tangkap(df_cpue, gears, display_names),
+                         lambda: vega_cpue_per_alat(df_cpue, gears, display_names))
         
         # Tampilkan data tabel
         with st.expander("📋 Lihat Data CPUE per Alat Tangkap"):
@@ -1466,36 +2413,66 @@ def render_grafik_cpue(df_cpue, df_effort, gears, display_names):
             }), use_container_width=True)
     
     with tab2:
-        st.subheader("Trend CPUE Total per Tahun")
-        fig = buat_grafik_trend_cpue_total(df_cpue)
-        st.pyplot(fig)
+        st.subheader("Trend CPUE Standar Total")
+        tampilkan_grafik('trend_cpue_total', lambda: buat_grafik_trend_cpue_total(tren),
+                         lambda: vega_trend_cpue(tren))
         
         # Analisis trend
-        years = df_cpue['Tahun'].values
-        cpue_total = df_cpue['Jumlah'].values
+        kolom_waktu = tren['kolom_waktu']
+        years = tren['data'][kolom_waktu].values
+        cpue_total = tren['data'][KOLOM_TREN_TOTAL].values
         
         if len(years) > 1:
-            slope, intercept = np.polyfit(years, cpue_total, 1)
+            total = tren['ringkasan'].set_index('Deret').loc[KOLOM_TREN_TOTAL]
             percentage_change = ((cpue_total[-1] - cpue_total[0]) / cpue_total[0] * 100) if cpue_total[0] > 0 else 0
             
-            col1, col2, col3 = st.columns(3)
+            col1, col2, col3, col4 = st.columns(4)
             with col1:
-                st.metric("Slope Trend", f"{slope:.4f}")
+                st.metric("Kemiringan Sen", f"{total['Kemiringan Sen']:.4f}")
             with col2:
                 st.metric("Perubahan Total", f"{percentage_change:.1f}%")
             with col3:
-                if slope > 0:
-                    st.success("📈 Trend Meningkat")
-                elif slope < 0:
-                    st.error("📉 Trend Menurun")
+                st.metric("Mann-Kendall (p)", f"{total['p-value']:.3f}")
+            with col4:
+                if total['Arah'].startswith("📈"):
+                    st.success(total['Arah'])
+                elif total['Arah'].startswith("📉"):
+                    st.error(total['Arah'])
                 else:
-                    st.info("➡ Trend Stabil")
+                    st.info(total['Arah'])
+            
+            st.markdown("##### 🔎 Uji Tren per Alat Tangkap (CPUE nominal) dan Total (CPUE standar)")
+            label_deret = dict(zip(gears + [KOLOM_TREN_TOTAL], display_names + ['Total (CPUE standar)']))
+            ringkasan = tren['ringkasan'].copy()
+            ringkasan['Deret'] = ringkasan['Deret'].map(label_deret)
+            st.dataframe(ringkasan.style.format({
+                'Tau Kendall': '{:.3f}', 'Z': '{:.2f}', 'p-value': '{:.3f}', 'Kemiringan Sen': '{:.4f}',
+                'Perubahan Sen (%)': '{:.1f}', 'Kemiringan Terakhir': '{:.4f}'
+            }, na_rep='-'), use_container_width=True, hide_index=True)
+            
+            st.markdown(f"##### 📉 Kemiringan Bergulir (jendela {tren['jendela']} periode)")
+            st.line_chart(
+                tren['bergulir'].set_index(kolom_waktu).rename(columns=label_deret).dropna(how='all')
+            )
+            st.caption(
+                f"Tren signifikan bila p < {ALFA_TREN} (Mann-Kendall); kemiringan Sen = median kemiringan "
+                "semua pasangan periode (tahan pencilan, per tahun); titik perubahan = pergeseran rata-rata "
+                "(binary segmentation). Hasil yang sama dipakai di bagian rekomendasi."
+            )
     
     with tab3:
         st.subheader("Hubungan CPUE vs Upaya per Alat Tangkap")
         if len(gears) > 0:
-            fig = buat_grafik_cpue_vs_upaya(df_cpue, df_effort, gears, display_names)
-            st.pyplot(fig)
+            if st.session_state.get('grafik_interaktif'):
+                st.vega_lite_chart(spec=ambil_cache_hasil(
+                    'vega_cpue_vs_upaya', lambda: vega_cpue_vs_upaya(df_cpue, df_effort, gears, display_names)
+                ))
+            else:
+                halaman = ambil_cache_hasil('cpue_vs_upaya', lambda: buat_png_cpue_vs_upaya(df_cpue, df_effort, gears, display_names))
+                for png in halaman:
+                    st.image(png, use_container_width=True)
+                if len(halaman) > 1:
+                    st.caption(f"{len(gears)} alat tangkap ditampilkan dalam {len(halaman)} halaman grafik")
             
             # Penjelasan hubungan CPUE-Upaya
             st.info("""
@@ -1520,8 +2497,8 @@ def render_grafik_cpue(df_cpue, df_effort, gears, display_names):
     
     with tab4:
         st.subheader("Perbandingan Efisiensi Alat Tangkap")
-        fig = buat_grafik_cpue_perbandingan(df_cpue, gears, display_names)
-        st.pyplot(fig)
+        tampilkan_grafik('cpue_perbandingan', lambda: buat_grafik_cpue_perbandingan(df_cpue, gears, display_names),
+                         lambda: vega_cpue_perbandingan(df_cpue, gears, display_names))
         
         # Tampilkan ranking efisiensi
         avg_cpue = []
@@ -1539,19 +2516,166 @@ def render_grafik_cpue(df_cpue, df_effort, gears, display_names):
             'Rata-rata CPUE (kg/trip)': '{:.3f}'
         }), use_container_width=True)
 
+# ==============================================
+# REGRESI ROBUST UNTUK MODEL SCHAEFER
+# ==============================================
+METODE_REGRESI = {
+    'ols': "OLS (kuadrat terkecil biasa)",
+    'theil_sen': "Theil-Sen (median kemiringan)",
+    'huber': "Huber (M-estimator)",
+    'ransac': "RANSAC (konsensus inlier)"
+}
+REFERENSI_REGRESI = {
+    'theil_sen': "Theil (1950), Sen (1968)",
+    'huber': "Huber (1964)",
+    'ransac': "Fischler & Bolles (1981)"
+}
+KONSTANTA_HUBER = 1.345
+AMBANG_PENCILAN = 2.5  # × skala MAD residual
+MAKS_KANDIDAT_RANSAC = 2000
+
+def skala_mad(residual):
+    """Simpangan baku robust dari median absolute deviation"""
+    return 1.4826 * np.median(np.abs(residual - np.median(residual)))
+
+def regresi_huber(x, y, c=KONSTANTA_HUBER, maks_iterasi=50, toleransi=1e-8):
+    """Regresi Huber dengan iteratively reweighted least squares; skala residual dari MAD"""
+    X = np.column_stack([np.ones_like(x), x])
+    beta = np.linalg.lstsq(X, y, rcond=None)[0]
+    bobot = np.ones_like(y)
+    for _ in range(maks_iterasi):
+        residual = y - X @ beta
+        skala = skala_mad(residual)
+        if skala == 0:
+            break
+        bobot = np.minimum(1.0, c * skala / np.maximum(np.abs(residual), 1e-300))
+        akar = np.sqrt(bobot)
+        beta_baru = np.linalg.lstsq(X * akar[:, None], y * akar, rcond=None)[0]
+        if np.all(np.abs(beta_baru - beta) <= toleransi * (np.abs(beta) + toleransi)):
+            beta = beta_baru
+            break
+        beta = beta_baru
+    return beta[0], beta[1], bobot
+
+def regresi_ransac(x, y):
+    """
+    RANSAC deterministik: setiap kandidat garis dari sepasang titik (semua pasangan bila sedikit,
+    sampel acak berbenih bila banyak) dinilai sekaligus dalam satu matriks residual; garis dengan
+    inlier terbanyak di-fit ulang dengan OLS pada inliernya.
+    """
+    n = len(x)
+    b_awal, a_awal = kemiringan_sen(x, y)
+    ambang = AMBANG_PENCILAN * skala_mad(y - (a_awal + b_awal * x))
+    if not np.isfinite(ambang) or ambang == 0:
+        ambang = AMBANG_PENCILAN * max(np.std(y), 1e-12)
+    
+    if n * (n - 1) // 2 <= MAKS_KANDIDAT_RANSAC:
+        i, j = np.triu_indices(n, 1)
+    else:
+        i, j = np.random.default_rng(0).integers(0, n, (2, MAKS_KANDIDAT_RANSAC))
+    sah = x[i] != x[j]
+    i, j = i[sah], j[sah]
+    b = (y[j] - y[i]) / (x[j] - x[i])
+    a = y[i] - b * x[i]
+    
+    # Matriks residual (kandidat × titik) dinilai per blok agar memori tetap kecil pada deret panjang
+    jumlah = np.empty(len(b))
+    sse = np.empty(len(b))
+    blok = max(1, 2_000_000 // n)
+    for awal in range(0, len(b), blok):
+        bagian = slice(awal, awal + blok)
+        residual = np.abs(y[None, :] - (a[bagian, None] + b[bagian, None] * x[None, :]))
+        inlier = residual <= ambang
+        jumlah[bagian] = inlier.sum(axis=1)
+        sse[bagian] = np.where(inlier, residual ** 2, 0).sum(axis=1)
+    # Kandidat dengan inlier terbanyak; seri dipecah dengan jumlah kuadrat residual inlier terkecil
+    terbaik = np.lexsort((sse, -jumlah))[0]
+    
+    pilih = np.abs(y - (a[terbaik] + b[terbaik] * x)) <= ambang
+    slope, intercept = np.polyfit(x[pilih], y[pilih], 1)
+    return intercept, slope, pilih.astype(float)
+
+def regresi_garis(x, y, metode='ols'):
+    """
+    Fit garis y = a + b·x dengan metode regresi terpilih.
+    Kembalikan (a, b, bobot): bobot 1 = dipakai penuh, < 1 = diturunkan, 0 = dianggap pencilan.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if metode == 'theil_sen':
+        b, a = kemiringan_sen(x, y)
+        residual = y - (a + b * x)
+        skala = skala_mad(residual)
+        bobot = (np.abs(residual) <= AMBANG_PENCILAN * skala).astype(float) if skala > 0 else np.ones_like(y)
+        return a, b, bobot
+    if metode == 'huber':
+        return regresi_huber(x, y)
+    if metode == 'ransac':
+        return regresi_ransac(x, y)
+    b, a = np.polyfit(x, y, 1)
+    return a, b, np.ones_like(y)
+
+def statistik_garis(x, y, a, b):
+    """R², galat baku kemiringan, dan p-value (uji t) untuk garis yang sudah di-fit"""
+    residual = y - (a + b * x)
+    n = len(x)
+    sse = np.sum(residual ** 2)
+    sst = np.sum((y - y.mean()) ** 2)
+    sxx = np.sum((x - x.mean()) ** 2)
+    r_squared = 1 - sse / sst if sst > 0 else 0.0
+    if n <= 2 or sxx == 0:
+        return r_squared, np.nan, np.nan
+    std_err = np.sqrt(sse / (n - 2) / sxx)
+    p_value = 2 * stats.t.sf(abs(b / std_err), n - 2) if std_err > 0 else 0.0
+    return r_squared, std_err, p_value
+
+def diagnostik_pengaruh(x, y, bobot):
+    """
+    Diagnostik titik berpengaruh: Cook's distance dari fit OLS (ambang 4/n) dan bobot robust.
+    Tahun ditandai bila Cook's D melewati ambang atau bobot robust < 0,5 (setara residual > ±2,5 skala).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    cook = np.full(n, np.nan)
+    sxx = np.sum((x - x.mean()) ** 2)
+    if n > 2 and sxx > 0:
+        b, a = np.polyfit(x, y, 1)
+        residual = y - (a + b * x)
+        s2 = np.sum(residual ** 2) / (n - 2)
+        leverage = 1 / n + (x - x.mean()) ** 2 / sxx
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cook = residual ** 2 / (2 * s2) * leverage / (1 - leverage) ** 2 if s2 > 0 else np.zeros(n)
+    ambang = 4 / n if n else np.nan
+    return {
+        'cook': cook,
+        'ambang_cook': ambang,
+        'bobot': np.asarray(bobot, dtype=float),
+        'berpengaruh': (np.nan_to_num(cook) > ambang) | (np.asarray(bobot) < 0.5)
+    }
+
 # ==============================================
 # FUNGSI MODEL MSY DENGAN PARAMETER r DAN REFERENSI
 # ==============================================
-def analisis_msy_schaefer(standard_effort_total, cpue_standard_total, production_total, r_value):
+def analisis_msy_schaefer(standard_effort_total, cpue_standard_total, production_total, r_value, metode_regresi='ols'):
     """
-    Analisis MSY menggunakan Model Schaefer (1954)
+    Analisis MSY menggunakan Model Schaefer (1954).
+    `metode_regresi` memilih penduga garis CPUE = a + bF: OLS atau robust (Theil-Sen, Huber, RANSAC).
     """
     if len(standard_effort_total) < 2:
         return None
     
     try:
         # Linear regression: CPUE = a + b × F
-        slope, intercept, r_value_reg, p_value, std_err = stats.linregress(standard_effort_total, cpue_standard_total)
+        effort = np.asarray(standard_effort_total, dtype=float)
+        cpue = np.asarray(cpue_standard_total, dtype=float)
+        if metode_regresi == 'ols':
+            slope, intercept, r_value_reg, p_value, std_err = stats.linregress(effort, cpue)
+            r_squared = r_value_reg ** 2
+            bobot = np.ones_like(cpue)
+        else:
+            intercept, slope, bobot = regresi_garis(effort, cpue, metode_regresi)
+            r_squared, std_err, p_value = statistik_garis(effort, cpue, intercept, slope)
         
         if slope >= 0:
             return {'success': False, 'error': 'Slope (b) harus negatif untuk model Schaefer yang valid'}
@@ -1565,16 +2689,25 @@ def analisis_msy_schaefer(standard_effort_total, cpue_standard_total, production
         K = 4 * C_MSY / r_value if r_value > 0 else 0
         q = U_MSY / (K/2) if K > 0 else 0  # Catchability coefficient
         
-        return {
+        referensi = 'Schaefer (1954)'
+        if metode_regresi in REFERENSI_REGRESI:
+            referensi += f"; regresi {REFERENSI_REGRESI[metode_regresi]}"
+        hasil = {
             'model': 'Schaefer',
-            'a': intercept, 'b': slope, 'r_squared': r_value_reg ** 2, 'p_value': p_value,
+            'a': intercept, 'b': slope, 'r_squared': r_squared, 'p_value': p_value,
             'std_err': std_err, 'F_MSY': F_MSY, 'C_MSY': C_MSY, 'U_MSY': U_MSY,
             'r': r_value, 'K': K, 'q': q,
             'success': True,
             'equation': f"CPUE = {intercept:.4f} + {slope:.6f} × F",
-            'reference': 'Schaefer (1954)',
-            'formula': 'CPUE = a + b × F; MSY = -a²/(4b)'
+            'reference': referensi,
+            'formula': 'CPUE = a + b × F; MSY = -a²/(4b)',
+            'metode_regresi': metode_regresi,
+            'diagnostik': diagnostik_pengaruh(effort, cpue, bobot)
         }
+        hasil['kurva'] = evaluasi_kurva_model(
+            'Schaefer', hasil, standard_effort_total, cpue_standard_total, production_total
+        )
+        return hasil
     except Exception as e:
         return {'success': False, 'error': f'Error dalam model Schaefer: {str(e)}'}
 
@@ -1584,6 +2717,55 @@ def model_fox(F, a, b):
     """
     return F * np.exp(a - b * F)
 
+# ==============================================
+# EVALUASI KURVA MODEL (DIHITUNG SEKALI, DIPAKAI GRAFIK/TABEL/LAPORAN)
+# ==============================================
+TITIK_KURVA = 100
+
+def produksi_model(model_name, a, b, effort):
+    """Produksi prediksi model pada upaya tertentu"""
+    if model_name == 'Schaefer':
+        return a * effort + b * effort ** 2
+    return model_fox(effort, a, b)
+
+def evaluasi_kurva_model(model_name, results, effort, cpue=None, production=None, n=TITIK_KURVA):
+    """
+    Evaluasi satu hasil model: sampel kurva CPUE/produksi (0 .. 1.2 × upaya maksimum), titik MSY,
+    serta prediksi dan residual pada data observasi. Disimpan di hasil model (kunci 'kurva').
+    """
+    effort = np.asarray(effort, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if production is None:
+            production = np.asarray(cpue, dtype=float) * effort
+        if cpue is None:
+            cpue = np.where(effort > 0, np.asarray(production, dtype=float) / effort, np.nan)
+    a, b = results['a'], results['b']
+    
+    awal = 0.0 if model_name == 'Schaefer' else 0.1
+    x = np.linspace(awal, effort.max() * 1.2, n)
+    produksi_kurva = produksi_model(model_name, a, b, x)
+    prediksi_produksi = produksi_model(model_name, a, b, effort)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cpue_kurva = a + b * x if model_name == 'Schaefer' else produksi_kurva / x
+        prediksi_cpue = np.where(effort > 0, prediksi_produksi / effort, np.nan)
+    
+    return {
+        'upaya': x,
+        'cpue': cpue_kurva,
+        'produksi': produksi_kurva,
+        'titik_msy': {'F': results['F_MSY'], 'C': results['C_MSY'], 'U': results['U_MSY']},
+        'prediksi_produksi': prediksi_produksi,
+        'residual_produksi': np.asarray(production, dtype=float) - prediksi_produksi,
+        'prediksi_cpue': prediksi_cpue,
+        'residual_cpue': np.asarray(cpue, dtype=float) - prediksi_cpue
+    }
+
+def ambil_kurva(model_name, results, effort, cpue=None, production=None):
+    """Kurva tersimpan di hasil model; hasil lama (tanpa 'kurva') dievaluasi saat itu juga"""
+    if results.get('kurva') is not None:
+        return results['kurva']
+    return evaluasi_kurva_model(model_name, results, effort, cpue, production)
+
 def analisis_msy_fox(standard_effort_total, production_total, r_value):
     """
     Analisis MSY menggunakan Model Fox (1970)
@@ -1607,15 +2789,9 @@ def analisis_msy_fox(standard_effort_total, production_total, r_value):
         # Carrying capacity: K = exp(a) / b
         K = np.exp(a) / b if b != 0 else 0
         
-        # R-squared calculation
-        predictions = model_fox(standard_effort_total, a, b)
-        ss_res = np.sum((production_total - predictions) ** 2)
-        ss_tot = np.sum((production_total - np.mean(production_total)) ** 2)
-        r_squared = 1 - (ss_res / ss_tot) if ss_tot != 0 else 0
-        
-        return {
+        hasil = {
             'model': 'Fox',
-            'a': a, 'b': b, 'r_squared': r_squared, 'p_value': 0.001,
+            'a': a, 'b': b, 'p_value': 0.001,
             'std_err': np.sqrt(np.diag(pcov))[0], 'F_MSY': F_MSY, 'C_MSY': C_MSY, 'U_MSY': U_MSY,
             'r': r_value, 'K': K,
             'success': True,
@@ -1623,21 +2799,190 @@ def analisis_msy_fox(standard_effort_total, production_total, r_value):
             'reference': 'Fox (1970)',
             'formula': 'C = F × exp(a - b × F); MSY = (1/b) × exp(a - 1)'
         }
+        hasil['kurva'] = evaluasi_kurva_model('Fox', hasil, standard_effort_total, production=production_total)
+        
+        # R-squared calculation dari residual kurva
+        ss_res = np.sum(hasil['kurva']['residual_produksi'] ** 2)
+        ss_tot = np.sum((production_total - np.mean(production_total)) ** 2)
+        hasil['r_squared'] = 1 - (ss_res / ss_tot) if ss_tot != 0 else 0
+        return hasil
     except Exception as e:
         return {'success': False, 'error': f'Error dalam model Fox: {str(e)}'}
 
-def bandingkan_model_msy(standard_effort_total, cpue_standard_total, production_total, selected_models, r_value):
+def bandingkan_model_msy(standard_effort_total, cpue_standard_total, production_total, selected_models, r_value,
+                         metode_regresi='ols'):
     """Bandingkan beberapa model MSY"""
     results = {}
     
     if 'Schaefer' in selected_models:
-        results['Schaefer'] = analisis_msy_schaefer(standard_effort_total, cpue_standard_total, production_total, r_value)
+        results['Schaefer'] = analisis_msy_schaefer(
+            standard_effort_total, cpue_standard_total, production_total, r_value, metode_regresi
+        )
     
     if 'Fox' in selected_models:
         results['Fox'] = analisis_msy_fox(standard_effort_total, production_total, r_value)
     
     return results
 
+# ==============================================
+# VALIDASI SILANG (HINDCAST) MODEL MSY
+# ==============================================
+METODE_VALIDASI = {
+    'loyo': "Leave-one-year-out (hindcast)",
+    'rolling': "Rolling-origin (prediksi 1 tahun ke depan)",
+    'r2': "R² in-sample"
+}
+
+def lipatan_validasi(n, skema):
+    """
+    Matriks bobot latih (lipatan × tahun) dan indeks tahun uji untuk setiap lipatan.
+    LOYO: setiap tahun diuji sekali dengan model dari tahun lainnya.
+    Rolling-origin: latih pada tahun-tahun awal, uji tahun berikutnya (minimal separuh data untuk latih).
+    """
+    if skema == 'loyo':
+        return 1.0 - np.eye(n), np.arange(n)
+    min_latih = max(3, n // 2)
+    uji = np.arange(min_latih, n)
+    return (np.arange(n)[None, :] < uji[:, None]).astype(float), uji
+
+def prediksi_schaefer_lipatan(effort, cpue, bobot, uji):
+    """Regresi CPUE = a + bF untuk semua lipatan sekaligus (jumlahan berbobot, tanpa loop)"""
+    n = bobot.sum(axis=1)
+    sx, sy = bobot @ effort, bobot @ cpue
+    sxx, sxy = bobot @ (effort * effort), bobot @ (effort * cpue)
+    penyebut = n * sxx - sx ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        b = np.where(penyebut != 0, (n * sxy - sx * sy) / penyebut, np.nan)
+        a = (sy - b * sx) / n
+    # Prediksi produksi: C = F × (a + bF)
+    return effort[uji] * (a + b * effort[uji])
+
+def prediksi_schaefer_robust_lipatan(effort, cpue, bobot, uji, metode):
+    """Fit ulang garis Schaefer robust per lipatan (penduga robust tidak bisa dijumlahkan seperti OLS)"""
+    prediksi = np.full(len(uji), np.nan)
+    for k in range(len(uji)):
+        latih = bobot[k] > 0
+        if latih.sum() < 3:
+            continue
+        a, b, _ = regresi_garis(effort[latih], cpue[latih], metode)
+        prediksi[k] = effort[uji[k]] * (a + b * effort[uji[k]])
+    return prediksi
+
+def prediksi_fox_lipatan(effort, production, bobot, uji, p0):
+    """Fit ulang model Fox per lipatan secara paralel, warm-start dari parameter model data penuh"""
+    def fit_lipatan(k):
+        latih = bobot[k] > 0
+        try:
+            (a, b), _ = curve_fit(model_fox, effort[latih], production[latih], p0=p0, maxfev=2000)
+        except Exception:
+            return np.nan
+        return model_fox(effort[uji[k]], a, b)
+    
+    with ThreadPoolExecutor(max_workers=min(8, max(len(uji), 1))) as executor:
+        return np.fromiter(executor.map(fit_lipatan, range(len(uji))), dtype=float, count=len(uji))
+
+def hindcast_model_msy(standard_effort_total, cpue_standard_total, production_total, msy_results, skema='loyo'):
+    """
+    Uji daya prediksi model MSY di luar sampel. Semua model dibandingkan pada skala yang sama
+    (produksi tahunan, kg) dan pada lipatan yang sama: metrik dihitung hanya pada lipatan tempat
+    setiap model menghasilkan prediksi (mis. fit Fox gagal pada satu lipatan → lipatan itu tidak dinilai).
+    """
+    effort = np.asarray(standard_effort_total, dtype=float)
+    cpue = np.asarray(cpue_standard_total, dtype=float)
+    production = np.asarray(production_total, dtype=float)
+    if len(effort) < 4:
+        return None
+    
+    bobot, uji = lipatan_validasi(len(effort), skema)
+    hasil = {'skema': skema, 'indeks_uji': uji.tolist(), 'model': {}, 'model_terbaik': None,
+             'lipatan_bersama': [], 'n_lipatan': 0}
+    
+    prediksi_model = {}
+    for model_name, model_results in msy_results.items():
+        if not (model_results and model_results['success']):
+            continue
+        if model_name == 'Schaefer':
+            metode = model_results.get('metode_regresi', 'ols')
+            if metode == 'ols':
+                prediksi = prediksi_schaefer_lipatan(effort, cpue, bobot, uji)
+            else:
+                prediksi = prediksi_schaefer_robust_lipatan(effort, cpue, bobot, uji, metode)
+        elif model_name == 'Fox':
+            p0 = [model_results['a'], model_results['b']]
+            prediksi = prediksi_fox_lipatan(effort, production, bobot, uji, p0)
+        else:
+            continue
+        if np.isfinite(prediksi).any():
+            prediksi_model[model_name] = prediksi
+    
+    if not prediksi_model:
+        return hasil
+    bersama = np.logical_and.reduce([np.isfinite(prediksi) for prediksi in prediksi_model.values()])
+    hasil['lipatan_bersama'] = bersama.tolist()
+    hasil['n_lipatan'] = int(bersama.sum())
+    if not bersama.any():
+        return hasil
+    
+    aktual = production[uji][bersama]
+    nonzero = aktual != 0
+    for model_name, prediksi in prediksi_model.items():
+        galat = prediksi[bersama] - aktual
+        hasil['model'][model_name] = {
+            'prediksi': prediksi,
+            'rmse': float(np.sqrt(np.mean(galat ** 2))),
+            'mae': float(np.mean(np.abs(galat))),
+            'mape': float(np.mean(np.abs(galat[nonzero] / aktual[nonzero])) * 100) if nonzero.any() else np.nan,
+            'n_lipatan': hasil['n_lipatan'],
+            'lipatan_gagal': int((~np.isfinite(prediksi)).sum())
+        }
+    
+    if hasil['model']:
+        hasil['model_terbaik'] = min(hasil['model'], key=lambda nama: hasil['model'][nama]['rmse'])
+    return hasil
+
+# Larik per tahun observasi di hasil model yang harus sepanjang seluruh tahun data
+KUNCI_KURVA_PER_TAHUN = ('prediksi_produksi', 'residual_produksi', 'prediksi_cpue', 'residual_cpue')
+
+def sebar_ke_semua_tahun(nilai, indeks_fit, n, isi=np.nan):
+    """Tempatkan larik per tahun fit ke posisi tahunnya pada larik sepanjang n; tahun lain diisi `isi`"""
+    nilai = np.asarray(nilai)
+    penuh = np.full(n, isi, dtype=np.result_type(nilai, np.asarray(isi)))
+    penuh[indeks_fit] = nilai
+    return penuh
+
+def sejajarkan_hasil_fit(msy_results, hindcast, pakai_fit, years):
+    """
+    Sejajarkan hasil model yang di-fit pada sebagian tahun (tahun berimputasi dikecualikan) ke seluruh tahun data.
+    Tahun yang dipakai fit disimpan di 'tahun_fit'; prediksi/residual kurva dan diagnostik pengaruh
+    berisi NaN pada tahun yang dikecualikan; indeks uji hindcast dipetakan ke indeks tahun penuh.
+    """
+    n = len(pakai_fit)
+    indeks_fit = np.flatnonzero(pakai_fit)
+    tahun_fit = [years[i] for i in indeks_fit]
+    hasil = {}
+    for model_name, model_results in msy_results.items():
+        if not (model_results and model_results['success']):
+            hasil[model_name] = model_results
+            continue
+        model_results = dict(model_results, tahun_fit=tahun_fit)
+        if model_results.get('kurva') is not None:
+            model_results['kurva'] = dict(model_results['kurva'], **{
+                kunci: sebar_ke_semua_tahun(model_results['kurva'][kunci], indeks_fit, n)
+                for kunci in KUNCI_KURVA_PER_TAHUN
+            })
+        if model_results.get('diagnostik') is not None:
+            diagnostik = model_results['diagnostik']
+            model_results['diagnostik'] = dict(
+                diagnostik,
+                cook=sebar_ke_semua_tahun(diagnostik['cook'], indeks_fit, n),
+                bobot=sebar_ke_semua_tahun(diagnostik['bobot'], indeks_fit, n),
+                berpengaruh=sebar_ke_semua_tahun(diagnostik['berpengaruh'], indeks_fit, n, isi=False)
+            )
+        hasil[model_name] = model_results
+    if hindcast:
+        hindcast = dict(hindcast, indeks_uji=indeks_fit[np.asarray(hindcast['indeks_uji'], dtype=int)].tolist())
+    return hasil, hindcast
+
 # ==============================================
 # FUNGSI GRAFIK MSY DENGAN INFORMASI REFERENSI
 # ==============================================
@@ -1648,9 +2993,8 @@ def buat_grafik_msy_schaefer(ax, effort_data, cpue_data, model_results):
     
     ax.scatter(effort_data, cpue_data, color='blue', s=60, zorder=5, label='Data Observasi')
     
-    x_fit = np.linspace(0, max(effort_data) * 1.2, 100)
-    y_fit = model_results['a'] + model_results['b'] * x_fit
-    ax.plot(x_fit, y_fit, 'r-', linewidth=2, label='Model Schaefer')
+    kurva = ambil_kurva('Schaefer', model_results, effort_data, cpue=cpue_data)
+    ax.plot(kurva['upaya'], kurva['cpue'], 'r-', linewidth=2, label='Model Schaefer')
     
     msy_x = model_results['F_MSY']
     msy_y = model_results['U_MSY']
@@ -1680,9 +3024,8 @@ def buat_grafik_produksi_schaefer(ax, effort_data, production_data, model_result
     
     ax.scatter(effort_data, production_data, color='blue', s=60, zorder=5, label='Data Observasi')
     
-    x_fit = np.linspace(0, max(effort_data) * 1.2, 100)
-    y_fit = model_results['a'] * x_fit + model_results['b'] * (x_fit ** 2)
-    ax.plot(x_fit, y_fit, 'r-', linewidth=2, label='Kurva Produksi')
+    kurva = ambil_kurva('Schaefer', model_results, effort_data, production=production_data)
+    ax.plot(kurva['upaya'], kurva['produksi'], 'r-', linewidth=2, label='Kurva Produksi')
     
     msy_x = model_results['F_MSY']
     msy_y = model_results['C_MSY']
@@ -1711,9 +3054,8 @@ def buat_grafik_fox(ax, effort_data, production_data, model_results):
     
     ax.scatter(effort_data, production_data, color='blue', s=60, zorder=5, label='Data Observasi')
     
-    x_fit = np.linspace(0.1, max(effort_data) * 1.2, 100)
-    y_fit = model_fox(x_fit, model_results['a'], model_results['b'])
-    ax.plot(x_fit, y_fit, 'r-', linewidth=2, label='Model Fox')
+    kurva = ambil_kurva('Fox', model_results, effort_data, production=production_data)
+    ax.plot(kurva['upaya'], kurva['produksi'], 'r-', linewidth=2, label='Model Fox')
     
     msy_x = model_results['F_MSY']
     msy_y = model_results['C_MSY']
@@ -1744,18 +3086,15 @@ def buat_grafik_perbandingan_model(ax, effort_data, production_data, all_results
     
     for i, (model_name, results) in enumerate(all_results.items()):
         if results and results['success']:
-            x_fit = np.linspace(0.1, max(effort_data) * 1.2, 100)
-            
             if model_name == 'Schaefer':
-                y_fit = results['a'] * x_fit + results['b'] * (x_fit ** 2)
                 label = f"{model_name} (1954)"
             elif model_name == 'Fox':
-                y_fit = model_fox(x_fit, results['a'], results['b'])
                 label = f"{model_name} (1970)"
             else:
                 continue
-                
-            ax.plot(x_fit, y_fit, color=colors[i % len(colors)], 
+            
+            kurva = ambil_kurva(model_name, results, effort_data, production=production_data)
+            ax.plot(kurva['upaya'], kurva['produksi'], color=colors[i % len(colors)], 
                    linestyle=line_styles[i % len(line_styles)], 
                    linewidth=2, label=label)
             
@@ -1768,7 +3107,168 @@ def buat_grafik_perbandingan_model(ax, effort_data, production_data, all_results
     ax.legend()
     ax.grid(True, alpha=0.3)
 
-def render_grafik_msy_lengkap(effort_data, cpue_data, production_data, msy_results):
+# ==============================================
+# GRAFIK INTERAKTIF (VEGA-LITE, DIRENDER DI BROWSER)
+# ==============================================
+# Data dikirim sebagai JSON ringkas; zoom, geser, dan tooltip ditangani browser tanpa rerun server
+PARAM_ZOOM = [{'name': 'zoom', 'select': 'interval', 'bind': 'scales'}]
+DESIMAL_JSON = 4
+
+def rekam_ringkas(df, desimal=DESIMAL_JSON):
+    """DataFrame ke list record JSON ringkas: angka dibulatkan, NaN menjadi null"""
+    df = df.round(desimal)
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+def data_panjang(df, gears, display_names, nama_nilai):
+    """Ubah tabel lebar (Tahun × alat) ke format panjang (Tahun, Alat, nilai) untuk Vega-Lite"""
+    return df[['Tahun'] + list(gears)].rename(columns=dict(zip(gears, display_names))).melt(
+        id_vars='Tahun', var_name='Alat', value_name=nama_nilai
+    )
+
+def vega_cpue_per_alat(df_cpue, gears, display_names):
+    """Spesifikasi batang berkelompok CPUE per alat tangkap per tahun"""
+    return {
+        'title': 'CPUE per Alat Tangkap per Tahun',
+        'data': {'values': rekam_ringkas(data_panjang(df_cpue, gears, display_names, 'CPUE'))},
+        'mark': {'type': 'bar', 'tooltip': True},
+        'encoding': {
+            'x': {'field': 'Tahun', 'type': 'ordinal'},
+            'xOffset': {'field': 'Alat'},
+            'y': {'field': 'CPUE', 'type': 'quantitative', 'title': 'CPUE (kg/trip)'},
+            'color': {'field': 'Alat', 'type': 'nominal', 'title': 'Alat Tangkap'}
+        }
+    }
+
+def vega_trend_cpue(tren):
+    """Spesifikasi trend CPUE standar total (tren tersimpan) dengan garis Sen dan titik perubahan"""
+    sen, intersep = tren['garis_sen'][KOLOM_TREN_TOTAL]
+    data = tren['data']
+    tahun = urutan_waktu(data[tren['kolom_waktu']])
+    deret = pd.DataFrame({
+        'Tahun': tahun, 'Periode': data[tren['kolom_waktu']].astype(str), 'CPUE': data[KOLOM_TREN_TOTAL]
+    })
+    lapisan = [{
+        'data': {'values': rekam_ringkas(deret)},
+        'mark': {'type': 'line', 'point': True, 'tooltip': True},
+        'params': PARAM_ZOOM,
+        'encoding': {
+            'x': {'field': 'Tahun', 'type': 'quantitative', 'axis': {'format': 'd'}},
+            'y': {'field': 'CPUE', 'type': 'quantitative', 'title': 'CPUE Standar Total (kg/trip)'}
+        }
+    }]
+    if np.isfinite(sen):
+        garis = pd.DataFrame({'Tahun': tahun[[0, -1]], 'Sen': intersep + sen * tahun[[0, -1]]})
+        lapisan.append({
+            'data': {'values': rekam_ringkas(garis)},
+            'mark': {'type': 'line', 'color': 'green', 'strokeDash': [4, 4]},
+            'encoding': {'x': {'field': 'Tahun', 'type': 'quantitative'}, 'y': {'field': 'Sen', 'type': 'quantitative'}}
+        })
+    if tren['titik_perubahan'][KOLOM_TREN_TOTAL]:
+        lapisan.append({
+            'data': {'values': [{'Titik Perubahan': t} for t in posisi_titik_perubahan(data, tren)]},
+            'mark': {'type': 'rule', 'color': 'purple', 'strokeDash': [6, 3], 'tooltip': True},
+            'encoding': {'x': {'field': 'Titik Perubahan', 'type': 'quantitative'}}
+        })
+    return {'title': 'Trend CPUE Standar Total', 'layer': lapisan}
+
+def vega_cpue_vs_upaya(df_cpue, df_effort, gears, display_names):
+    """Spesifikasi facet CPUE vs Upaya untuk semua alat tangkap (skala tiap panel independen)"""
+    data = data_panjang(df_cpue, gears, display_names, 'CPUE')
+    data['Upaya'] = data_panjang(df_effort, gears, display_names, 'Upaya')['Upaya']
+    return {
+        'data': {'values': rekam_ringkas(data)},
+        'facet': {'field': 'Alat', 'type': 'nominal', 'title': None, 'sort': list(display_names)},
+        'columns': MAKS_KOLOM_FACET,
+        'spec': {
+            'width': 180, 'height': 140,
+            'mark': {'type': 'point', 'filled': True, 'size': 60, 'tooltip': True},
+            'params': PARAM_ZOOM,
+            'encoding': {
+                'x': {'field': 'Upaya', 'type': 'quantitative', 'title': 'Upaya (trip)'},
+                'y': {'field': 'CPUE', 'type': 'quantitative', 'title': 'CPUE (kg/trip)'},
+                'color': {'field': 'Tahun', 'type': 'quantitative', 'scale': {'scheme': 'viridis'},
+                          'legend': {'format': 'd'}}
+            }
+        },
+        'resolve': {'scale': {'x': 'independent', 'y': 'independent'}}
+    }
+
+def vega_cpue_perbandingan(df_cpue, gears, display_names):
+    """Spesifikasi batang rata-rata CPUE per alat tangkap, urut dari terbesar"""
+    rata = pd.DataFrame({'Alat': display_names, 'Rata-rata CPUE': df_cpue[gears].mean().to_numpy()})
+    return {
+        'title': 'Perbandingan Rata-rata CPUE Antar Alat Tangkap',
+        'data': {'values': rekam_ringkas(rata)},
+        'mark': {'type': 'bar', 'tooltip': True},
+        'encoding': {
+            'x': {'field': 'Alat', 'type': 'nominal', 'sort': '-y', 'title': 'Alat Tangkap'},
+            'y': {'field': 'Rata-rata CPUE', 'type': 'quantitative', 'title': 'Rata-rata CPUE (kg/trip)'},
+            'color': {'field': 'Rata-rata CPUE', 'type': 'quantitative', 'scale': {'scheme': 'viridis'}, 'legend': None}
+        }
+    }
+
+def vega_kurva_msy(effort_data, observasi, models, jenis='produksi', judul=None):
+    """
+    Spesifikasi kurva model MSY (satu atau beberapa model) beserta data observasi dan titik MSY.
+    `jenis` = 'produksi' (C vs F) atau 'cpue' (U vs F).
+    """
+    label_y = 'Produksi (C)' if jenis == 'produksi' else 'CPUE (U)'
+    kurva, titik = [], []
+    for model_name, results in models.items():
+        hasil_kurva = ambil_kurva(model_name, results, effort_data,
+                                  **({'production': observasi} if jenis == 'produksi' else {'cpue': observasi}))
+        kurva.append(pd.DataFrame({'Model': model_name, 'Upaya': hasil_kurva['upaya'], 'Nilai': hasil_kurva[jenis]}))
+        titik.append({'Model': f'MSY {model_name}', 'Upaya': hasil_kurva['titik_msy']['F'],
+                      'Nilai': hasil_kurva['titik_msy']['C' if jenis == 'produksi' else 'U']})
+    
+    sumbu = {'x': {'field': 'Upaya', 'type': 'quantitative', 'title': 'Upaya Penangkapan (F)'},
+             'y': {'field': 'Nilai', 'type': 'quantitative', 'title': label_y}}
+    return {
+        'title': judul or f'{label_y} vs Upaya',
+        'layer': [
+            {
+                'data': {'values': rekam_ringkas(pd.DataFrame({'Upaya': effort_data, 'Nilai': observasi}))},
+                'mark': {'type': 'point', 'filled': True, 'color': 'black', 'size': 70, 'tooltip': True},
+                'params': PARAM_ZOOM,
+                'encoding': sumbu
+            },
+            {
+                'data': {'values': rekam_ringkas(pd.concat(kurva, ignore_index=True))},
+                'mark': {'type': 'line', 'strokeWidth': 2},
+                'encoding': {**sumbu, 'color': {'field': 'Model', 'type': 'nominal'}}
+            },
+            {
+                'data': {'values': rekam_ringkas(pd.DataFrame(titik))},
+                'mark': {'type': 'point', 'shape': 'diamond', 'filled': True, 'size': 160, 'tooltip': True},
+                'encoding': {**sumbu, 'color': {'field': 'Model', 'type': 'nominal'}}
+            }
+        ]
+    }
+
+def tampilkan_grafik(kunci, pembuat_grafik, pembuat_vega=None):
+    """Tampilkan grafik interaktif Vega-Lite bila diaktifkan, selain itu PNG matplotlib dari cache"""
+    if pembuat_vega is not None and st.session_state.get('grafik_interaktif'):
+        st.vega_lite_chart(spec=ambil_cache_hasil(f'vega_{kunci}', pembuat_vega), use_container_width=True)
+    else:
+        tampilkan_grafik_cache(kunci, pembuat_grafik)
+
+def tahun_di_luar_fit(models, years):
+    """Tahun data yang tidak dipakai fit model mana pun (mis. tahun berimputasi yang dikecualikan)"""
+    tahun_fit = set()
+    for results in models.values():
+        tahun_fit.update(results.get('tahun_fit', years))
+    return [tahun for tahun in years if tahun not in tahun_fit]
+
+def tabel_residual_model(models, years, effort_data, production_data):
+    """Tabel prediksi dan residual produksi per tahun untuk tiap model, dari kurva tersimpan"""
+    tabel = pd.DataFrame({'Tahun': years, 'Upaya Standar': effort_data, 'Produksi Observasi': production_data})
+    for model_name, results in models.items():
+        kurva = ambil_kurva(model_name, results, effort_data, production=production_data)
+        tabel[f'Prediksi {model_name}'] = kurva['prediksi_produksi']
+        tabel[f'Residual {model_name}'] = kurva['residual_produksi']
+    return tabel
+
+def render_grafik_msy_lengkap(effort_data, cpue_data, production_data, msy_results, years=None):
     """Render grafik MSY yang lengkap"""
     st.header("📈 Grafik Analisis MSY")
     
@@ -1795,15 +3295,19 @@ def render_grafik_msy_lengkap(effort_data, cpue_data, production_data, msy_resul
         
         for i, (model_name, results) in enumerate(successful_models.items()):
             with cols[i]:
-                fig, ax = plt.subplots(figsize=(6, 4))
-                
-                if model_name == 'Schaefer':
-                    buat_grafik_msy_schaefer(ax, effort_data, cpue_data, results)
-                elif model_name == 'Fox':
-                    buat_grafik_fox(ax, effort_data, production_data, results)
+                def buat_grafik(model_name=model_name, results=results):
+                    fig, ax = plt.subplots(figsize=(6, 4))
+                    if model_name == 'Schaefer':
+                        buat_grafik_msy_schaefer(ax, effort_data, cpue_data, results)
+                    elif model_name == 'Fox':
+                        buat_grafik_fox(ax, effort_data, production_data, results)
+                    return fig
                 
-                st.pyplot(fig)
-                plt.close()
+                jenis = 'cpue' if model_name == 'Schaefer' else 'produksi'
+                tampilkan_grafik(f'msy_individual_{model_name}', buat_grafik, lambda model_name=model_name, results=results, jenis=jenis: vega_kurva_msy(
+                    effort_data, cpue_data if jenis == 'cpue' else production_data, {model_name: results}, jenis,
+                    f"Model {model_name} (r = {results['r']:.3f})"
+                ))
     
     with tab2:
         st.subheader("Grafik Produksi vs Upaya")
@@ -1812,27 +3316,33 @@ def render_grafik_msy_lengkap(effort_data, cpue_data, production_data, msy_resul
         
         for i, (model_name, results) in enumerate(successful_models.items()):
             with cols[i]:
-                fig, ax = plt.subplots(figsize=(6, 4))
+                def buat_grafik(model_name=model_name, results=results):
+                    fig, ax = plt.subplots(figsize=(6, 4))
+                    if model_name == 'Schaefer':
+                        buat_grafik_produksi_schaefer(ax, effort_data, production_data, results)
+                    elif model_name == 'Fox':
+                        buat_grafik_fox(ax, effort_data, production_data, results)
+                    return fig
                 
-                if model_name == 'Schaefer':
-                    buat_grafik_produksi_schaefer(ax, effort_data, production_data, results)
-                elif model_name == 'Fox':
-                    buat_grafik_fox(ax, effort_data, production_data, results)
-                
-                st.pyplot(fig)
-                plt.close()
+                tampilkan_grafik(f'msy_produksi_{model_name}', buat_grafik, lambda model_name=model_name, results=results: vega_kurva_msy(
+                    effort_data, production_data, {model_name: results}, 'produksi',
+                    f"Model {model_name}: Produksi vs Upaya (K = {results.get('K', 0):,.0f} kg)"
+                ))
     
     with tab3:
         st.subheader("Perbandingan Model Schaefer vs Fox")
-        fig, ax = plt.subplots(figsize=(10, 6))
-        buat_grafik_perbandingan_model(ax, effort_data, production_data, successful_models)
-        
-        # Tambahkan referensi di grafik
-        fig.text(0.02, 0.02, 'Sumber: Schaefer (1954), Fox (1970), Gulland (1971)', 
-                 fontsize=8, style='italic', color='gray')
+        def buat_grafik():
+            fig, ax = plt.subplots(figsize=(10, 6))
+            buat_grafik_perbandingan_model(ax, effort_data, production_data, successful_models)
+            
+            # Tambahkan referensi di grafik
+            fig.text(0.02, 0.02, 'Sumber: Schaefer (1954), Fox (1970), Gulland (1971)', 
+                     fontsize=8, style='italic', color='gray')
+            return fig
         
-        st.pyplot(fig)
-        plt.close()
+        tampilkan_grafik('msy_perbandingan', buat_grafik, lambda: vega_kurva_msy(
+            effort_data, production_data, successful_models, 'produksi', 'Perbandingan Model MSY'
+        ))
         
         st.subheader("📋 Tabel Perbandingan Model")
         comparison_data = []
@@ -1850,17 +3360,125 @@ def render_grafik_msy_lengkap(effort_data, cpue_data, production_data, msy_resul
             })
         
         st.dataframe(pd.DataFrame(comparison_data), use_container_width=True)
+        
+        if years is not None:
+            with st.expander("📋 Prediksi dan Residual Produksi per Tahun"):
+                residual = tabel_residual_model(successful_models, years, effort_data, production_data)
+                st.dataframe(residual.style.format({
+                    kolom: '{:,.1f}' for kolom in residual.columns if kolom != 'Tahun'
+                }, na_rep='—'), use_container_width=True, hide_index=True)
+                dikecualikan = tahun_di_luar_fit(successful_models, years)
+                if dikecualikan:
+                    st.caption(f"Tahun {', '.join(map(str, dikecualikan))} dikecualikan dari fit model "
+                               "(sel berimputasi); prediksi dan residualnya dikosongkan.")
 
 # ==============================================
 # ANALISIS STATUS STOK DAN REKOMENDASI DENGAN REFERENSI
 # ==============================================
-def analisis_status_stok(msy_results, production_values, effort_values, years):
-    """Analisis status stok berdasarkan hasil MSY"""
+# Kriteria status stok berdasarkan FAO (2014): rasio produksi terhadap JTB (%)
+BATAS_STATUS_STOK = (80, 100)
+KELAS_STATUS_STOK = {
+    'UNDERFISHING': ("green", "🟢", "Stok belum tereksploitasi optimal",
+                     "Tingkatkan upaya penangkapan secara bertahap hingga mencapai F_MSY"),
+    'FULLY EXPLOITED': ("orange", "🟡", "Stok sudah dieksploitasi optimal",
+                        "Pertahankan upaya penangkapan pada level F_MSY"),
+    'OVERFISHING': ("red", "🔴", "Stok mengalami tekanan berlebih",
+                    "Kurangi upaya penangkapan segera")
+}
+
+def kemiringan_baris(y):
+    """Kemiringan regresi linier tiap baris matriks (kolom = tahun berurutan); NaN diabaikan"""
+    y = np.asarray(y, dtype=float)
+    valid = np.isfinite(y)
+    x = np.broadcast_to(np.arange(y.shape[1], dtype=float), y.shape)
+    n = valid.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_rata = np.where(valid, x, 0).sum(axis=1) / n
+        y_rata = np.where(valid, y, 0).sum(axis=1) / n
+        dx = np.where(valid, x - x_rata[:, None], 0)
+        dy = np.where(valid, y - y_rata[:, None], 0)
+        return np.where(n >= 2, (dx * dy).sum(axis=1) / (dx * dx).sum(axis=1), np.nan)
+
+def klasifikasi_status_massal(msy, f_msy, produksi_kini, upaya_kini, r=None, produksi_terakhir=None):
+    """
+    Klasifikasi status stok, tren produksi, dan penyesuaian upaya untuk banyak stok sekaligus.
+    Semua argumen berupa array sepanjang jumlah stok; `produksi_terakhir` berupa matriks
+    (stok × 3 tahun terakhir, NaN bila tidak ada). Kembalikan DataFrame satu baris per stok.
+    """
+    msy = np.asarray(msy, dtype=float)
+    f_msy = np.asarray(f_msy, dtype=float)
+    produksi_kini = np.asarray(produksi_kini, dtype=float)
+    upaya_kini = np.asarray(upaya_kini, dtype=float)
+    r = np.zeros_like(msy) if r is None else np.asarray(r, dtype=float)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rasio = np.where(msy > 0, produksi_kini / msy * 100, 0.0)
+    
+    status = np.select(
+        [rasio <= BATAS_STATUS_STOK[0], rasio <= BATAS_STATUS_STOK[1]],
+        ['UNDERFISHING', 'FULLY EXPLOITED'],
+        'OVERFISHING'
+    )
+    df = pd.DataFrame({'status_stok': status, 'production_ratio': rasio})
+    for i, kolom in enumerate(['status_color', 'status_icon', 'kategori', 'rekomendasi']):
+        df[kolom] = df['status_stok'].map({nama: nilai[i] for nama, nilai in KELAS_STATUS_STOK.items()})
+    
+    # Tren produksi: kemiringan regresi linier pada 3 tahun terakhir
+    if produksi_terakhir is None:
+        kemiringan = np.full(len(msy), np.nan)
+    else:
+        produksi_terakhir = np.asarray(produksi_terakhir, dtype=float)
+        kemiringan = np.where(np.isfinite(produksi_terakhir).sum(axis=1) >= 3,
+                              kemiringan_baris(produksi_terakhir), np.nan)
+    df['trend_slope'] = kemiringan
+    df['trend_status'] = np.select(
+        [kemiringan > 0, kemiringan < 0, kemiringan == 0],
+        ["📈 Meningkat", "📉 Menurun", "➡ Stabil"], "📊 Data tidak cukup"
+    )
+    df['trend_direction'] = np.select(
+        [kemiringan > 0, kemiringan < 0, kemiringan == 0],
+        ["positif", "negatif", "stabil"], "tidak diketahui"
+    )
+    
+    # Rekomendasi kuantitatif: selisih upaya terhadap F_MSY (arah sesuai status)
+    selisih = np.where(status == 'OVERFISHING', upaya_kini - f_msy, f_msy - upaya_kini)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        persen = np.where(upaya_kini > 0, selisih / upaya_kini * 100, 0.0)
+    df['penyesuaian_upaya'] = np.where(status == 'FULLY EXPLOITED', 0.0, f_msy - upaya_kini)
+    angka = pd.Series(selisih).map('{:,.0f}'.format) + " trip (" + pd.Series(persen).map('{:.1f}'.format) + "%)"
+    df['aksi_khusus'] = np.select(
+        [status == 'OVERFISHING', status == 'UNDERFISHING'],
+        ["Kurangi " + angka, "Tingkatkan " + angka], "Pertahankan status saat ini"
+    )
+    
+    # Estimasi waktu pemulihan untuk stok overfishing: ln(2) / r
+    with np.errstate(divide='ignore'):
+        pemulihan = np.where(r > 0, np.log(2) / r, 0.0)
+    df['waktu_pemulihan'] = np.where(
+        (status == 'OVERFISHING') & (r > 0),
+        pd.Series(pemulihan).map('{:.1f} tahun'.format), "Tidak diperlukan"
+    )
+    return df
+
+def analisis_status_stok(msy_results, production_values, effort_values, years, skor_model=None, tren_cpue=None):
+    """
+    Analisis status stok berdasarkan hasil MSY.
+    `skor_model` (galat prediksi di luar sampel per model) bila ada dipakai untuk memilih model terbaik;
+    tanpa skor, model dipilih dari R² in-sample. `tren_cpue` (ringkas_tren_cpue) menambahkan
+    peringatan kehati-hatian bila indeks kelimpahan menurun signifikan.
+    """
     successful_models = {k: v for k, v in msy_results.items() if v and v['success']}
     if not successful_models:
         return None
     
-    best_model_name, best_model = max(successful_models.items(), key=lambda x: x[1]['r_squared'])
+    skor_valid = {k: v for k, v in (skor_model or {}).items() if k in successful_models and np.isfinite(v)}
+    if skor_valid:
+        best_model_name = min(skor_valid, key=skor_valid.get)
+        best_model = successful_models[best_model_name]
+        dasar_pemilihan = "Galat prediksi di luar sampel (RMSE hindcast) terkecil"
+    else:
+        best_model_name, best_model = max(successful_models.items(), key=lambda x: x[1]['r_squared'])
+        dasar_pemilihan = "R² in-sample tertinggi"
     
     current_year = years[-1] if years else None
     current_production = production_values[-1] if len(production_values) > 0 else 0
@@ -1870,62 +3488,30 @@ def analisis_status_stok(msy_results, production_values, effort_values, years):
     f_msy_value = best_model['F_MSY']
     r_value = best_model['r']
     
-    production_ratio = (current_production / jtb_value) * 100 if jtb_value > 0 else 0
-    
-    # Kriteria status stok berdasarkan FAO (2014)
-    if production_ratio <= 80:
-        status_stok = "UNDERFISHING"
-        status_color = "green"
-        status_icon = "🟢"
-        kategori = "Stok belum tereksploitasi optimal"
-        rekomendasi = "Tingkatkan upaya penangkapan secara bertahap hingga mencapai F_MSY"
-    elif 80 < production_ratio <= 100:
-        status_stok = "FULLY EXPLOITED"
-        status_color = "orange"
-        status_icon = "🟡"
-        kategori = "Stok sudah dieksploitasi optimal"
-        rekomendasi = "Pertahankan upaya penangkapan pada level F_MSY"
-    else:
-        status_stok = "OVERFISHING"
-        status_color = "red"
-        status_icon = "🔴"
-        kategori = "Stok mengalami tekanan berlebih"
-        rekomendasi = "Kurangi upaya penangkapan segera"
-    
-    # Analisis trend produksi
-    if len(production_values) >= 3:
-        trend = np.polyfit(range(len(production_values[-3:])), production_values[-3:], 1)[0]
-        if trend > 0:
-            trend_status = "📈 Meningkat"
-            trend_direction = "positif"
-        elif trend < 0:
-            trend_status = "📉 Menurun"
-            trend_direction = "negatif"
-        else:
-            trend_status = "➡ Stabil"
-            trend_direction = "stabil"
-    else:
-        trend_status = "📊 Data tidak cukup"
-        trend_direction = "tidak diketahui"
-    
-    # Rekomendasi kuantitatif
-    if status_stok == "OVERFISHING":
-        target_pengurangan = current_effort - f_msy_value
-        persentase_pengurangan = (target_pengurangan / current_effort * 100) if current_effort > 0 else 0
-        aksi_khusus = f"Kurangi {target_pengurangan:,.0f} trip ({persentase_pengurangan:.1f}%)"
-    elif status_stok == "UNDERFISHING":
-        target_peningkatan = f_msy_value - current_effort
-        persentase_peningkatan = (target_peningkatan / current_effort * 100) if current_effort > 0 else 0
-        aksi_khusus = f"Tingkatkan {target_peningkatan:,.0f} trip ({persentase_peningkatan:.1f}%)"
-    else:
-        aksi_khusus = "Pertahankan status saat ini"
-    
-    # Estimasi waktu pemulihan
-    if status_stok == "OVERFISHING" and r_value > 0:
-        waktu_pemulihan = np.log(2) / r_value if r_value > 0 else 0
-        waktu_pemulihan_text = f"{waktu_pemulihan:.1f} tahun"
-    else:
-        waktu_pemulihan_text = "Tidak diperlukan"
+    status = klasifikasi_status_massal(
+        [jtb_value], [f_msy_value], [current_production], [current_effort], [r_value],
+        produksi_terakhir=np.asarray(production_values, dtype=float)[None, -3:] if len(production_values) >= 3 else None
+    ).iloc[0]
+    
+    rekomendasi = status['rekomendasi']
+    peringatan_tren = []
+    total_menurun = bool(tren_cpue and tren_cpue['signifikan'] and tren_cpue['kemiringan_sen'] < 0)
+    alat_menurun = [
+        alat['alat'] for alat in (tren_cpue or {}).get('per_alat', [])
+        if alat['signifikan'] and alat['kemiringan_sen'] < 0
+    ]
+    if total_menurun:
+        peringatan_tren.append(
+            f"CPUE standar menurun signifikan (Mann-Kendall p = {tren_cpue['p_value']:.3f}, "
+            f"perubahan Sen {tren_cpue['perubahan_persen']:.1f}%): indikasi penurunan kelimpahan stok"
+        )
+    if alat_menurun:
+        peringatan_tren.append(f"CPUE nominal menurun signifikan pada alat tangkap: {', '.join(alat_menurun)}")
+    if status['status_stok'] != 'OVERFISHING':
+        if total_menurun:
+            rekomendasi += "; terapkan pendekatan kehati-hatian karena CPUE menurun signifikan"
+        elif alat_menurun:
+            rekomendasi += "; pantau upaya pada alat tangkap dengan CPUE menurun signifikan"
     
     return {
         'best_model': best_model_name,
@@ -1938,19 +3524,22 @@ def analisis_status_stok(msy_results, production_values, effort_values, years):
         'r_value': r_value,
         'K': best_model.get('K', 0),
         'jtb': jtb_value,
-        'production_ratio': production_ratio,
-        'status_stok': status_stok,
-        'status_color': status_color,
-        'status_icon': status_icon,
-        'kategori': kategori,
+        'production_ratio': status['production_ratio'],
+        'status_stok': status['status_stok'],
+        'status_color': status['status_color'],
+        'status_icon': status['status_icon'],
+        'kategori': status['kategori'],
         'rekomendasi': rekomendasi,
-        'trend_status': trend_status,
-        'trend_direction': trend_direction,
-        'aksi_khusus': aksi_khusus,
-        'waktu_pemulihan': waktu_pemulihan_text,
+        'trend_status': status['trend_status'],
+        'trend_direction': status['trend_direction'],
+        'aksi_khusus': status['aksi_khusus'],
+        'waktu_pemulihan': status['waktu_pemulihan'],
         'tahun_data': years,
         'model_reference': best_model.get('reference', ''),
-        'model_formula': best_model.get('formula', '')
+        'model_formula': best_model.get('formula', ''),
+        'dasar_pemilihan': dasar_pemilihan,
+        'tren_cpue': tren_cpue,
+        'peringatan_tren': "; ".join(peringatan_tren) or None
     }
 
 def render_rekomendasi(recommendations, production_data, years):
@@ -1991,33 +3580,54 @@ def render_rekomendasi(recommendations, production_data, years):
     """)
     
     st.subheader("📈 PERBANDINGAN PRODUKSI DAN JTB")
-    fig, ax = plt.subplots(figsize=(12, 6))
-    production_values = [d['Jumlah'] for d in production_data]
-    
-    ax.plot(years, production_values, 'bo-', linewidth=2, markersize=8, label='Produksi Aktual')
-    ax.axhline(y=recommendations['msy'], color='red', linestyle='--', linewidth=2, label='JTB (MSY)')
-    
-    if recommendations['status_stok'] == "OVERFISHING":
-        ax.fill_between(years, recommendations['msy'], max(production_values + [recommendations['msy']]), 
-                       color='red', alpha=0.2, label='Area Overfishing')
-    elif recommendations['status_stok'] == "UNDERFISHING":
-        ax.fill_between(years, 0, recommendations['msy'], 
-                       color='green', alpha=0.2, label='Area Underfishing')
-    else:
-        ax.fill_between(years, 0.9*recommendations['msy'], 1.1*recommendations['msy'], 
-                       color='orange', alpha=0.2, label='Area Optimal')
-    
-    ax.set_xlabel('Tahun')
-    ax.set_ylabel('Produksi (kg)')
-    ax.set_title(f'Produksi vs JTB\n(Model: {recommendations["best_model"]}, r = {recommendations["r_value"]:.3f})')
-    ax.legend()
-    ax.grid(True, alpha=0.3)
+    def buat_grafik():
+        fig, ax = plt.subplots(figsize=(12, 6))
+        production_values = [d['Jumlah'] for d in production_data]
+        
+        ax.plot(years, production_values, 'bo-', linewidth=2, markersize=8, label='Produksi Aktual')
+        ax.axhline(y=recommendations['msy'], color='red', linestyle='--', linewidth=2, label='JTB (MSY)')
+        
+        if recommendations['status_stok'] == "OVERFISHING":
+            ax.fill_between(years, recommendations['msy'], max(production_values + [recommendations['msy']]), 
+                           color='red', alpha=0.2, label='Area Overfishing')
+        elif recommendations['status_stok'] == "UNDERFISHING":
+            ax.fill_between(years, 0, recommendations['msy'], 
+                           color='green', alpha=0.2, label='Area Underfishing')
+        else:
+            ax.fill_between(years, 0.9*recommendations['msy'], 1.1*recommendations['msy'], 
+                           color='orange', alpha=0.2, label='Area Optimal')
+        
+        ax.set_xlabel('Tahun')
+        ax.set_ylabel('Produksi (kg)')
+        ax.set_title(f'Produksi vs JTB\n(Model: {recommendations["best_model"]}, r = {recommendations["r_value"]:.3f})')
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+        return fig
     
-    st.pyplot(fig)
+    tampilkan_grafik_cache('produksi_vs_jtb', buat_grafik)
     
     st.subheader("📋 REKOMENDASI PENGELOLAAN")
     st.info(f"**{recommendations['rekomendasi']}**")
     st.write(f"**Aksi Khusus:** {recommendations['aksi_khusus']}")
+    if recommendations.get('tren_cpue'):
+        tren_cpue = recommendations['tren_cpue']
+        st.write(
+            f"**Tren CPUE Standar:** {tren_cpue['arah']} (kemiringan Sen {tren_cpue['kemiringan_sen']:.4f}/tahun; "
+            f"titik perubahan: {', '.join(map(str, tren_cpue['titik_perubahan'])) or '-'})"
+        )
+        if tren_cpue.get('per_alat'):
+            with st.expander("📉 Tren CPUE nominal per alat tangkap"):
+                st.dataframe(pd.DataFrame(tren_cpue['per_alat']).rename(columns={
+                    'alat': 'Alat Tangkap', 'arah': 'Arah', 'p_value': 'p-value',
+                    'kemiringan_sen': 'Kemiringan Sen (/tahun)', 'perubahan_persen': 'Perubahan Sen (%)',
+                    'signifikan': 'Signifikan'
+                }).style.format({'p-value': '{:.3f}', 'Kemiringan Sen (/tahun)': '{:.4f}',
+                                 'Perubahan Sen (%)': '{:.1f}'}, na_rep='-'),
+                    use_container_width=True, hide_index=True)
+                if tren_cpue.get('resolusi', 'Tahun') != 'Tahun':
+                    st.caption(f"Tren diuji pada resolusi data asli (kolom '{tren_cpue['resolusi']}').")
+    if recommendations.get('peringatan_tren'):
+        st.warning(f"⚠️ {recommendations['peringatan_tren']}")
     
     st.subheader("🎯 RENCANA AKSI BERDASARKAN STATUS")
     if recommendations['status_stok'] == "OVERFISHING":
@@ -2083,102 +3693,349 @@ def render_rekomendasi(recommendations, production_data, years):
 # ==============================================
 # FUNGSI PERHITUNGAN CPUE, FPI, dll.
 # ==============================================
-def hitung_cpue(produksi_df, upaya_df, gears):
+def _waktu_ke_tanggal(waktu):
+    """Kolom waktu non-angka → tanggal awal periode; label kuartal ('2021Q2') dibaca sebagai periode"""
+    waktu = pd.Series(waktu).reset_index(drop=True)
+    if isinstance(waktu.dtype, pd.PeriodDtype):
+        return waktu.dt.to_timestamp()
+    if pd.api.types.is_datetime64_any_dtype(waktu):
+        return waktu
+    teks = waktu.astype(str).str.upper()
+    if teks.str.contains('Q').all():
+        return pd.Series(pd.PeriodIndex(teks, freq='Q').to_timestamp())
+    return pd.to_datetime(teks)
+
+def tahun_dari_waktu(waktu):
+    """Tahun dari kolom waktu: angka tahun, tanggal, atau label periode ('2021-03', '2021Q2')"""
+    if pd.api.types.is_numeric_dtype(pd.Series(waktu)):
+        return np.asarray(waktu, dtype=float).astype(int)
+    return _waktu_ke_tanggal(waktu).dt.year.to_numpy()
+
+def bulan_dari_waktu(waktu):
+    """Bulan awal periode (None untuk data tahunan)"""
+    if pd.api.types.is_numeric_dtype(pd.Series(waktu)):
+        return None
+    return _waktu_ke_tanggal(waktu).dt.month.to_numpy()
+
+def urutan_waktu(waktu):
+    """Posisi kolom waktu dalam satuan tahun (desimal untuk periode sub-tahunan)"""
+    if pd.api.types.is_numeric_dtype(pd.Series(waktu)):
+        return np.asarray(waktu, dtype=float)
+    tanggal = _waktu_ke_tanggal(waktu)
+    if (tanggal.dt.day == 1).all():
+        # Periode bulanan/kuartalan: indeks bulan ordinal / 12 sehingga jarak antarperiode seragam
+        return ((tanggal.dt.year * 12 + tanggal.dt.month - 1) / 12).to_numpy(dtype=float)
+    return (tanggal.dt.year + (tanggal.dt.dayofyear - 1) / 365.25).to_numpy()
+
+def urutkan_waktu(df, kolom_waktu='Tahun', kolom_grup=None):
+    """Urutkan tabel menurut (grup,) waktu secara kronologis, bukan urutan teks label periode"""
+    kunci = ([kolom_grup] if kolom_grup else []) + ['_urutan_waktu']
+    return (df.assign(_urutan_waktu=urutan_waktu(df[kolom_waktu]))
+              .sort_values(kunci, kind='stable')
+              .drop(columns='_urutan_waktu')
+              .reset_index(drop=True))
+
+def _label_waktu(waktu):
+    """Nilai kolom waktu untuk tabel hasil; tahun float bulat dijadikan integer"""
+    waktu = np.asarray(waktu)
+    if waktu.dtype.kind == 'f' and np.all(np.mod(waktu, 1) == 0):
+        return waktu.astype(int)
+    return waktu
+
+def _sejajarkan(df, acuan, kolom_waktu, kolom):
+    """Matriks `kolom` dari df pada urutan periode tabel `acuan` (baris pertama bila periode ganda)"""
+    return (df.drop_duplicates(kolom_waktu)
+              .set_index(kolom_waktu)[kolom]
+              .reindex(acuan[kolom_waktu].to_numpy())
+              .to_numpy(dtype=float))
+
+def _tabel_waktu(waktu, nilai, kolom, kolom_waktu):
+    """DataFrame hasil dengan kolom waktu di depan"""
+    df = pd.DataFrame(nilai, columns=kolom)
+    df.insert(0, kolom_waktu, _label_waktu(waktu))
+    return df
+
+def hitung_cpue(produksi_df, upaya_df, gears, kolom_waktu='Tahun'):
+    """
+    Hitung CPUE untuk setiap alat tangkap pada resolusi waktu data (tahunan, kuartalan, bulanan, ...)
+    """
+    produksi = produksi_df[gears].to_numpy(dtype=float)
+    upaya = _sejajarkan(upaya_df, produksi_df, kolom_waktu, gears)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cpue = np.where(upaya > 0, produksi / upaya, 0.0)
+    
+    df = _tabel_waktu(produksi_df[kolom_waktu], cpue, gears, kolom_waktu)
+    df['Jumlah'] = cpue.sum(axis=1)
+    return df
+
+def hitung_fpi_per_tahun(cpue_df, gears, standard_gear, kolom_waktu='Tahun'):
+    """
+    Hitung FPI per periode - FPI diambil dari nilai CPUE tertinggi = 1
+    """
+    cpue = cpue_df[gears].to_numpy(dtype=float)
+    maks = cpue.max(axis=1, keepdims=True) if gears else np.ones((len(cpue), 1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fpi = np.where(maks > 0, cpue / maks, 0.0)
+    
+    df = _tabel_waktu(cpue_df[kolom_waktu], fpi, gears, kolom_waktu)
+    df['Jumlah'] = fpi.sum(axis=1)
+    return df
+
+def hitung_upaya_standar(upaya_df, fpi_df, gears, kolom_waktu='Tahun'):
+    """
+    Hitung upaya standar
+    """
+    upaya_standar = upaya_df[gears].to_numpy(dtype=float) * _sejajarkan(fpi_df, upaya_df, kolom_waktu, gears)
+    
+    df = _tabel_waktu(upaya_df[kolom_waktu], upaya_standar, gears, kolom_waktu)
+    df['Jumlah'] = upaya_standar.sum(axis=1)
+    return df
+
+def hitung_cpue_standar(produksi_df, standard_effort_df, gears, kolom_waktu='Tahun'):
+    """
+    Hitung CPUE standar per alat tangkap dan total
+    """
+    produksi = produksi_df[gears].to_numpy(dtype=float)
+    upaya_standar = _sejajarkan(standard_effort_df, produksi_df, kolom_waktu, gears + ['Jumlah'])
+    total_produksi = produksi_df['Jumlah'].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cpue = np.where(upaya_standar[:, :-1] > 0, produksi / upaya_standar[:, :-1], 0.0)
+        cpue_total = np.where(upaya_standar[:, -1] > 0, total_produksi / upaya_standar[:, -1], 0.0)
+        # Upaya standar tidak terestimasi (NaN) tetap NaN, bukan CPUE 0
+        cpue_total[np.isnan(upaya_standar[:, -1])] = np.nan
+        ln_cpue = np.where(cpue_total > 0, np.log(cpue_total), np.where(np.isnan(cpue_total), np.nan, 0.0))
+    
+    df = _tabel_waktu(produksi_df[kolom_waktu], cpue, [f'{gear}_Std_CPUE' for gear in gears], kolom_waktu)
+    df['CPUE_Standar_Total'] = cpue_total
+    df['Ln_CPUE'] = ln_cpue
+    return df
+
+def agregasi_tahunan(df, gears, kolom_waktu='Tahun'):
+    """Jumlahkan tabel periode (alat + Jumlah) menjadi total per tahun untuk fit model produksi surplus"""
+    kolom = [k for k in gears + ['Jumlah'] if k in df]
+    hasil = df[kolom].groupby(tahun_dari_waktu(df[kolom_waktu])).sum(min_count=1)
+    hasil.index.name = 'Tahun'
+    return hasil.reset_index()
+
+# ==============================================
+# STANDARDISASI CPUE BERBASIS GLM
+# ==============================================
+METODE_STANDARDISASI = {
+    'fpi': 'FPI per tahun (CPUE tertinggi = 1)',
+    'daya_tangkap': 'Daya tangkap tetap (konfigurasi alat tangkap)',
+    'fpi_alat_standar': 'FPI tetap relatif alat standar',
+    'glm_lognormal': 'GLM log-normal (Tahun + Alat, + Bulan untuk data sub-tahunan)',
+    'glm_tweedie': 'GLM Tweedie (Tahun + Alat, + Bulan untuk data sub-tahunan)'
+}
+
+# Tabel input berupa agregat periode × alat, sehingga tidak ada kolom Kapal yang bisa dipakai sebagai faktor
+FAKTOR_GLM = ('Tahun', 'Alat', 'Bulan')
+
+def matriks_desain_sparse(df, faktor, referensi=None):
+    """
+    Matriks desain one-hot (treatment coding) dalam format CSR.
+    Level pertama tiap faktor (atau level di `referensi`) menjadi baseline.
+    """
+    referensi = referensi or {}
+    n = len(df)
+    blok, nama_kolom, level = [], [], {}
+    
+    for nama_faktor in faktor:
+        kode, uniques = pd.factorize(df[nama_faktor], sort=True)
+        uniques = list(uniques)
+        if nama_faktor in referensi and referensi[nama_faktor] in uniques:
+            # Pindahkan level referensi ke posisi 0
+            idx_ref = uniques.index(referensi[nama_faktor])
+            urutan = [idx_ref] + [i for i in range(len(uniques)) if i != idx_ref]
+            peta = np.empty(len(uniques), dtype=np.int64)
+            peta[urutan] = np.arange(len(uniques))
+            kode = peta[kode]
+            uniques = [uniques[i] for i in urutan]
+        
+        level[nama_faktor] = uniques
+        baris = np.flatnonzero(kode > 0)
+        blok.append(sparse.csr_matrix(
+            (np.ones(len(baris)), (baris, kode[baris] - 1)),
+            shape=(n, len(uniques) - 1)
+        ))
+        nama_kolom += [(nama_faktor, u) for u in uniques[1:]]
+    
+    return sparse.hstack(blok, format='csr'), nama_kolom, level
+
+def standardisasi_cpue_glm(df_record, distribusi='lognormal', referensi=None, faktor=FAKTOR_GLM):
     """
-    Hitung CPUE untuk setiap alat tangkap
+    Standardisasi CPUE dengan GLM: log(CPUE) ~ Tahun + faktor lain di `faktor` yang tersedia.
+    
+    df_record: satu baris per trip/sel dengan kolom Produksi, Upaya, dan faktor yang tersedia.
+    Faktor yang tidak ada di data atau hanya punya satu level tidak di-fit dan dicatat di 'faktor_tidak_dipakai'.
+    Level referensi yang benar-benar dipakai (bisa berbeda dari `referensi` bila level itu tidak punya
+    record yang memenuhi syarat) dicatat di 'referensi'.
+    - 'lognormal': regresi kuadrat terkecil sparse (LSQR) pada log(CPUE), hanya tangkapan > 0
+    - 'tweedie'  : GLM Tweedie (power 1.5, link log) berbobot upaya, tangkapan nol tetap dipakai
+    Indeks tahunan = CPUE prediksi pada level referensi faktor lain (mis. alat standar).
     """
-    cpue_data = []
-    years = produksi_df['Tahun'].values
+    df = df_record[(df_record['Upaya'] > 0) & df_record['Produksi'].notna()]
+    if distribusi == 'lognormal':
+        df = df[df['Produksi'] > 0]
+    diminta = list(faktor)
+    faktor = [f for f in diminta if f == 'Tahun' or (f in df.columns and df[f].nunique() > 1)]
+    
+    X, nama_kolom, level = matriks_desain_sparse(df, faktor, referensi)
+    cpue = (df['Produksi'] / df['Upaya']).to_numpy(dtype=float)
+    
+    if distribusi == 'lognormal':
+        X1 = sparse.hstack([sparse.csr_matrix(np.ones((X.shape[0], 1))), X], format='csr')
+        y = np.log(cpue)
+        solusi = lsqr(X1, y, atol=1e-12, btol=1e-12, iter_lim=10 * X1.shape[1] + 100)[0]
+        intercept, koef = solusi[0], solusi[1:]
+        residual = y - X1 @ solusi
+        derajat_bebas = max(X1.shape[0] - X1.shape[1], 1)
+        # Koreksi bias retransformasi log-normal: exp(sigma^2 / 2)
+        koreksi = np.exp(np.sum(residual ** 2) / derajat_bebas / 2)
+    else:
+        model = TweedieRegressor(power=1.5, link='log', alpha=0.0, max_iter=1000, tol=1e-8)
+        model.fit(X, cpue, sample_weight=df['Upaya'].to_numpy(dtype=float))
+        intercept, koef = model.intercept_, model.coef_
+        koreksi = 1.0
     
-    for year in years:
-        clean_year = int(year) if isinstance(year, float) and year.is_integer() else year
-        year_data = {'Tahun': clean_year}
-        for gear in gears:
-            prod = produksi_df[produksi_df['Tahun'] == year][gear].values[0]
-            eff = upaya_df[upaya_df['Tahun'] == year][gear].values[0]
-            cpue = prod / eff if eff > 0 else 0
-            year_data[gear] = cpue
-        
-        year_data['Jumlah'] = sum([year_data[gear] for gear in gears])
-        cpue_data.append(year_data)
+    efek = {f: {level[f][0]: 0.0} for f in faktor}
+    for (nama_faktor, lvl), nilai in zip(nama_kolom, koef):
+        efek[nama_faktor][lvl] = nilai
+    
+    tahun = np.array(level['Tahun'])
+    indeks = np.exp(intercept + np.array([efek['Tahun'][t] for t in tahun])) * koreksi
     
-    return pd.DataFrame(cpue_data)
+    return {
+        'distribusi': distribusi,
+        'faktor': faktor,
+        'faktor_tidak_dipakai': [f for f in diminta if f not in faktor],
+        'referensi': {f: level[f][0] for f in faktor if f != 'Tahun'},
+        'n_record': int(X.shape[0]),
+        'indeks_tahun': pd.DataFrame({'Tahun': tahun, 'CPUE_Standar': indeks}),
+        'daya_relatif': {lvl: float(np.exp(v)) for lvl, v in efek.get('Alat', {}).items()},
+        'efek': efek
+    }
 
-def hitung_fpi_per_tahun(cpue_df, gears, standard_gear):
+def tabel_ke_record(df_production, df_effort, gears, kolom_waktu='Tahun'):
     """
-    Hitung FPI per tahun - FPI diambil dari nilai CPUE tertinggi = 1
+    Ubah tabel periode × alat menjadi format panjang (satu baris per sel) untuk GLM.
+    Data sub-tahunan dipecah menjadi faktor Tahun dan Bulan (musim).
     """
-    fpi_data = []
-    years = cpue_df['Tahun'].values
-    
-    for year in years:
-        clean_year = int(year) if isinstance(year, float) and year.is_integer() else year
-        year_data = {'Tahun': clean_year}
-        
-        cpue_values = [cpue_df[cpue_df['Tahun'] == year][gear].values[0] for gear in gears]
-        max_cpue = max(cpue_values) if cpue_values else 1
-        
-        for gear in gears:
-            cpue_gear = cpue_df[cpue_df['Tahun'] == year][gear].values[0]
-            fpi = cpue_gear / max_cpue if max_cpue > 0 else 0
-            year_data[gear] = fpi
-        
-        year_data['Jumlah'] = sum([year_data[gear] for gear in gears])
-        fpi_data.append(year_data)
-    
-    return pd.DataFrame(fpi_data)
+    prod = df_production.melt(id_vars=kolom_waktu, value_vars=gears, var_name='Alat', value_name='Produksi')
+    eff = df_effort.melt(id_vars=kolom_waktu, value_vars=gears, var_name='Alat', value_name='Upaya')
+    record = prod.merge(eff, on=[kolom_waktu, 'Alat'])
+    if kolom_waktu != 'Tahun':
+        bulan = bulan_dari_waktu(record[kolom_waktu])
+        record['Tahun'] = tahun_dari_waktu(record[kolom_waktu])
+        if bulan is not None:
+            record['Bulan'] = bulan
+        record = record.drop(columns=kolom_waktu)
+    return record
 
-def hitung_upaya_standar(upaya_df, fpi_df, gears):
+def daya_relatif_alat_standar(df_production, df_effort, gears, standard_gear):
+    """FPI konstan per alat = CPUE gabungan seluruh tahun alat tersebut / CPUE gabungan alat standar"""
+    produksi = df_production[gears].to_numpy(dtype=float).sum(axis=0)
+    upaya = df_effort[gears].to_numpy(dtype=float).sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cpue = np.where(upaya > 0, produksi / upaya, 0.0)
+    acuan = cpue[gears.index(standard_gear)] if standard_gear in gears else cpue.max()
+    return dict(zip(gears, (cpue / acuan if acuan > 0 else np.ones(len(gears))).tolist()))
+
+def standardisasi_daya_tetap(df_production, df_effort, gears, daya, kolom_waktu='Tahun'):
     """
-    Hitung upaya standar
+    Upaya standar dengan daya tangkap konstan per alat: satu perkalian matriks (tahun × alat) · (alat)
+    untuk seluruh tahun, tanpa tahap FPI per tahun. Kolom keluaran sama dengan jalur FPI per tahun.
     """
-    standard_effort_data = []
-    years = upaya_df['Tahun'].values
-    
-    for year in years:
-        clean_year = int(year) if isinstance(year, float) and year.is_integer() else year
-        year_data = {'Tahun': clean_year}
-        total_standard_effort = 0
-        
-        for gear in gears:
-            eff = upaya_df[upaya_df['Tahun'] == year][gear].values[0]
-            fpi = fpi_df[fpi_df['Tahun'] == year][gear].values[0]
-            standard_effort = eff * fpi
-            year_data[gear] = standard_effort
-            total_standard_effort += standard_effort
-        
-        year_data['Jumlah'] = total_standard_effort
-        standard_effort_data.append(year_data)
-    
-    return pd.DataFrame(standard_effort_data)
+    vektor = np.array([daya.get(gear, 1.0) for gear in gears], dtype=float)
+    produksi = df_production[gears].to_numpy(dtype=float)
+    upaya = _sejajarkan(df_effort, df_production, kolom_waktu, gears)
+    tahun = _label_waktu(df_production[kolom_waktu])
+    
+    upaya_standar = upaya * vektor
+    total_upaya = upaya @ vektor
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cpue_alat = np.where(upaya_standar > 0, produksi / upaya_standar, 0.0)
+        cpue_total = np.where(total_upaya > 0, df_production['Jumlah'].to_numpy(dtype=float) / total_upaya, 0.0)
+    
+    df_fpi = pd.DataFrame(np.broadcast_to(vektor, upaya.shape), columns=gears)
+    df_fpi.insert(0, kolom_waktu, tahun)
+    df_fpi['Jumlah'] = vektor.sum()
+    
+    df_standard_effort = pd.DataFrame(upaya_standar, columns=gears)
+    df_standard_effort.insert(0, kolom_waktu, tahun)
+    df_standard_effort['Jumlah'] = total_upaya
+    
+    df_standard_cpue = pd.DataFrame(cpue_alat, columns=[f'{gear}_Std_CPUE' for gear in gears])
+    df_standard_cpue.insert(0, kolom_waktu, tahun)
+    df_standard_cpue['CPUE_Standar_Total'] = cpue_total
+    with np.errstate(divide='ignore'):
+        df_standard_cpue['Ln_CPUE'] = np.where(cpue_total > 0, np.log(cpue_total), 0.0)
+    
+    return df_fpi, df_standard_effort, df_standard_cpue
 
-def hitung_cpue_standar(produksi_df, standard_effort_df, gears):
+def standardisasi_upaya(df_production, df_effort, df_cpue, gears, standard_gear, metode='fpi', daya_tangkap=None,
+                        kolom_waktu='Tahun'):
     """
-    Hitung CPUE standar per alat tangkap dan total
+    Hitung FPI, upaya standar, dan CPUE standar sesuai metode standardisasi, pada resolusi `kolom_waktu`.
+    `daya_tangkap` ({kode alat: daya relatif}, dari konfigurasi lanjutan) dipakai metode 'daya_tangkap'
+    dan diskalakan sehingga alat standar bernilai 1.
+    Kembalikan (df_fpi, df_standard_effort, df_standard_cpue, info_standardisasi).
     """
-    standard_cpue_data = []
-    years = produksi_df['Tahun'].values
+    if metode in ('daya_tangkap', 'fpi_alat_standar'):
+        if metode == 'daya_tangkap':
+            daya = {gear: float((daya_tangkap or {}).get(gear) or 1.0) for gear in gears}
+            acuan = daya.get(standard_gear, 1.0)
+            daya = {gear: nilai / acuan for gear, nilai in daya.items()}
+        else:
+            daya = daya_relatif_alat_standar(df_production, df_effort, gears, standard_gear)
+        tabel = standardisasi_daya_tetap(df_production, df_effort, gears, daya, kolom_waktu)
+        return (*tabel, {'daya_relatif': daya, 'alat_standar': standard_gear})
+    
+    if metode == 'fpi':
+        df_fpi = hitung_fpi_per_tahun(df_cpue, gears, standard_gear, kolom_waktu)
+        df_standard_effort = hitung_upaya_standar(df_effort, df_fpi, gears, kolom_waktu)
+        df_standard_cpue = hitung_cpue_standar(df_production, df_standard_effort, gears, kolom_waktu)
+        return df_fpi, df_standard_effort, df_standard_cpue, None
+    
+    distribusi = 'lognormal' if metode == 'glm_lognormal' else 'tweedie'
+    glm = dict(standardisasi_cpue_glm(
+        tabel_ke_record(df_production, df_effort, gears, kolom_waktu),
+        distribusi=distribusi,
+        referensi={'Alat': standard_gear}
+    ))
+    glm['alat_standar'] = standard_gear
+    glm['peringatan'] = []
+    alat_referensi = glm['referensi'].get('Alat', standard_gear)
+    if alat_referensi != standard_gear:
+        glm['peringatan'].append(
+            f"Alat standar '{standard_gear}' tidak punya record "
+            f"{'dengan tangkapan positif' if distribusi == 'lognormal' else 'dengan upaya'} sehingga tidak ikut fit GLM; "
+            f"daya relatif dan indeks dinyatakan terhadap '{alat_referensi}'"
+        )
     
-    for year in years:
-        clean_year = int(year) if isinstance(year, float) and year.is_integer() else year
-        year_data = {'Tahun': clean_year}
-        
-        for gear in gears:
-            prod = produksi_df[produksi_df['Tahun'] == year][gear].values[0]
-            std_eff = standard_effort_df[standard_effort_df['Tahun'] == year][gear].values[0]
-            cpue_standar = prod / std_eff if std_eff > 0 else 0
-            year_data[f'{gear}_Std_CPUE'] = cpue_standar
-        
-        total_production = produksi_df[produksi_df['Tahun'] == year]['Jumlah'].values[0]
-        total_standard_effort = standard_effort_df[standard_effort_df['Tahun'] == year]['Jumlah'].values[0]
-        
-        cpue_standar_total = total_production / total_standard_effort if total_standard_effort > 0 else 0
-        year_data['CPUE_Standar_Total'] = cpue_standar_total
-        year_data['Ln_CPUE'] = np.log(cpue_standar_total) if cpue_standar_total > 0 else 0
-        
-        standard_cpue_data.append(year_data)
+    # FPI = daya tangkap relatif terhadap alat standar (konstan antar tahun)
+    df_fpi = pd.DataFrame({kolom_waktu: df_cpue[kolom_waktu].values})
+    for gear in gears:
+        df_fpi[gear] = glm['daya_relatif'].get(gear, 0.0)
+    df_fpi['Jumlah'] = df_fpi[gears].sum(axis=1)
+    
+    df_standard_effort = hitung_upaya_standar(df_effort, df_fpi, gears, kolom_waktu)
+    
+    # Upaya standar total = Produksi / indeks GLM, sehingga CPUE standar total = indeks GLM.
+    # Tahun tanpa indeks (tidak ada record yang memenuhi syarat) bernilai NaN, bukan 0, dan tidak ikut fit MSY
+    tahun = pd.DataFrame({'Tahun': tahun_dari_waktu(df_standard_effort[kolom_waktu])})
+    indeks = tahun.merge(glm['indeks_tahun'], on='Tahun', how='left')['CPUE_Standar'].to_numpy()
+    produksi_total = _sejajarkan(df_production, df_standard_effort, kolom_waktu, ['Jumlah'])[:, 0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        df_standard_effort['Jumlah'] = np.where(indeks > 0, produksi_total / indeks, np.nan)
+    glm['tahun_tanpa_indeks'] = sorted(set(tahun['Tahun'][~(indeks > 0)].tolist()))
+    if glm['tahun_tanpa_indeks']:
+        glm['peringatan'].append(
+            f"Indeks GLM tidak terestimasi untuk tahun {glm['tahun_tanpa_indeks']}; tahun tersebut tidak dipakai pada fit MSY"
+        )
+    df_standard_cpue = hitung_cpue_standar(df_production, df_standard_effort, gears, kolom_waktu)
     
-    return pd.DataFrame(standard_cpue_data)
+    return df_fpi, df_standard_effort, df_standard_cpue, glm
 
 # ==============================================
 # FUNGSI EKSPOR HASIL ANALISIS KE EXCEL
@@ -2194,16 +4051,16 @@ def ekspor_hasil_analisis():
         output = io.BytesIO()
         with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
             # Data dasar
-            results['df_production'].to_excel(writer, sheet_name='Data Produksi', index=False)
-            results['df_effort'].to_excel(writer, sheet_name='Data Upaya', index=False)
-            results['df_cpue'].to_excel(writer, sheet_name='CPUE Data', index=False)
-            results['df_fpi'].to_excel(writer, sheet_name='FPI Data', index=False)
-            results['df_standard_effort'].to_excel(writer, sheet_name='Upaya Standar', index=False)
-            results['df_standard_cpue'].to_excel(writer, sheet_name='CPUE Standar', index=False)
+            results.df_production.to_excel(writer, sheet_name='Data Produksi', index=False)
+            results.df_effort.to_excel(writer, sheet_name='Data Upaya', index=False)
+            results.df_cpue.to_excel(writer, sheet_name='CPUE Data', index=False)
+            results.df_fpi.to_excel(writer, sheet_name='FPI Data', index=False)
+            results.df_standard_effort.to_excel(writer, sheet_name='Upaya Standar', index=False)
+            results.df_standard_cpue.to_excel(writer, sheet_name='CPUE Standar', index=False)
             
             # Hasil MSY
             msy_data = []
-            for model_name, model_results in results['msy_results'].items():
+            for model_name, model_results in results.msy_results.items():
                 if model_results and model_results['success']:
                     msy_data.append({
                         'Model': model_name,
@@ -2236,9 +4093,28 @@ def ekspor_hasil_analisis():
             df_msy = pd.DataFrame(msy_data)
             df_msy.to_excel(writer, sheet_name='Hasil MSY', index=False)
             
+            # Kurva dan residual model (array tersimpan di hasil model)
+            models_valid = {k: v for k, v in results.msy_results.items() if v and v['success']}
+            if models_valid:
+                effort_std = results.total('upaya_standar')
+                production_total = results.total('produksi')
+                pd.concat([
+                    pd.DataFrame({
+                        'Model': model_name,
+                        'Upaya': kurva['upaya'], 'CPUE': kurva['cpue'], 'Produksi': kurva['produksi']
+                    })
+                    for model_name, kurva in (
+                        (nama, ambil_kurva(nama, hasil, effort_std, production=production_total))
+                        for nama, hasil in models_valid.items()
+                    )
+                ], ignore_index=True).to_excel(writer, sheet_name='Kurva Model', index=False)
+                tabel_residual_model(models_valid, results.years, effort_std, production_total).to_excel(
+                    writer, sheet_name='Residual Model', index=False
+                )
+            
             # Rekomendasi
-            if 'recommendations' in results:
-                rec = results['recommendations']
+            if results.recommendations is not None:
+                rec = results.recommendations
                 
                 summary_data = pd.DataFrame({
                     'Parameter': [
@@ -2291,7 +4167,7 @@ def render_ekspor_excel_section():
         """)
     
     with col2:
-        export_data = ekspor_hasil_analisis()
+        export_data = ambil_cache_hasil('ekspor_excel', ekspor_hasil_analisis)
         if export_data is not None:
             st.download_button(
                 label="📥 Download Hasil Analisis (Excel)",
@@ -2378,8 +4254,8 @@ def generate_pdf_report(results, r_value):
         cover_info = [
             ["Lokasi:", "Pelabuhan Perikanan Nusantara (PPN) Karangantu, Banten"],
             ["Jenis Analisis:", "Maximum Sustainable Yield (MSY) dan JTB"],
-            ["Periode Data:", f"{min(results['years'])} - {max(results['years'])}"],
-            ["Jumlah Alat Tangkap:", str(len(results['gears']))],
+            ["Periode Data:", f"{min(results.years)} - {max(results.years)}"],
+            ["Jumlah Alat Tangkap:", str(len(results.gears))],
             ["Parameter r:", f"{r_value:.3f} (FishBase)"],
             ["Tanggal Analisis:", pd.Timestamp.now().strftime('%d %B %Y')],
             ["Dokumen ini berisi:", "Hasil analisis, rekomendasi, dan referensi ilmiah"]
@@ -2403,6 +4279,12 @@ def generate_pdf_report(results, r_value):
         story.append(Spacer(1, 36))
         
         # Logo atau placeholder
+        gambar_pdf = gambar_kurisi('pdf')
+        if gambar_pdf:
+            lebar_gambar = 3 * inch
+            story.append(Image(BytesIO(gambar_pdf), width=lebar_gambar,
+                               height=lebar_gambar * load_kurisi_image()['rasio']))
+            story.append(Spacer(1, 12))
         story.append(Paragraph("🐟 SISTEM ANALISIS PERIKANAN BERKELANJUTAN", subtitle_style))
         story.append(Spacer(1, 24))
         
@@ -2423,8 +4305,8 @@ def generate_pdf_report(results, r_value):
         story.append(Paragraph("RINGKASAN EKSEKUTIF", title_style))
         story.append(Spacer(1, 12))
         
-        if 'recommendations' in results and results['recommendations']:
-            rec = results['recommendations']
+        if results.recommendations:
+            rec = results.recommendations
             
             # Status stok box
             status_box = []
@@ -2469,8 +4351,8 @@ def generate_pdf_report(results, r_value):
         # Rekomendasi utama
         story.append(Paragraph("<b>REKOMENDASI UTAMA:</b>", heading_style))
         
-        if 'recommendations' in results and results['recommendations']:
-            rec = results['recommendations']
+        if results.recommendations:
+            rec = results.recommendations
             
             rekomendasi_list = [
                 f"1. {rec['aksi_khusus']}",
@@ -2491,10 +4373,10 @@ def generate_pdf_report(results, r_value):
         param_data = [
             ["Parameter", "Nilai", "Sumber"],
             ["r (laju pertumbuhan)", f"{r_value:.3f}", "FishBase"],
-            ["K (daya dukung)", f"{rec.get('K', 0):,.0f} kg" if 'recommendations' in results else "N/A", "Formula Gulland"],
-            ["MSY/JTB", f"{rec['jtb']:,.1f} kg" if 'recommendations' in results else "N/A", "Model MSY"],
-            ["F_MSY", f"{rec['f_msy']:,.1f} trip" if 'recommendations' in results else "N/A", "Model MSY"],
-            ["U_MSY", f"{rec['u_msy']:.3f} kg/trip" if 'recommendations' in results else "N/A", "Model MSY"]
+            ["K (daya dukung)", f"{rec.get('K', 0):,.0f} kg" if results.recommendations is not None else "N/A", "Formula Gulland"],
+            ["MSY/JTB", f"{rec['jtb']:,.1f} kg" if results.recommendations is not None else "N/A", "Model MSY"],
+            ["F_MSY", f"{rec['f_msy']:,.1f} trip" if results.recommendations is not None else "N/A", "Model MSY"],
+            ["U_MSY", f"{rec['u_msy']:.3f} kg/trip" if results.recommendations is not None else "N/A", "Model MSY"]
         ]
         
         param_table = Table(param_data, colWidths=[150, 150, 200])
@@ -2523,13 +4405,13 @@ def generate_pdf_report(results, r_value):
         story.append(Paragraph("<b>DATA PRODUKSI (kg):</b>", heading_style))
         
         # Siapkan data produksi untuk tabel
-        prod_data = [["Tahun"] + results['display_names'] + ["Jumlah"]]
+        prod_data = [["Tahun"] + results.display_names + ["Jumlah"]]
         
-        for _, row in results['df_production'].iterrows():
+        for _, row in results.df_production.iterrows():
             year = int(row['Tahun'])
             row_data = [str(year)]
             
-            for gear in results['gears']:
+            for gear in results.gears:
                 value = row[gear]
                 row_data.append(f"{value:,.0f}")
             
@@ -2538,14 +4420,14 @@ def generate_pdf_report(results, r_value):
         
         # Tambahkan rata-rata
         avg_row = ["Rata-rata"]
-        for gear in results['gears']:
-            avg = results['df_production'][gear].mean()
+        for gear in results.gears:
+            avg = results.df_production[gear].mean()
             avg_row.append(f"{avg:,.0f}")
         
-        avg_row.append(f"{results['df_production']['Jumlah'].mean():,.0f}")
+        avg_row.append(f"{results.df_production['Jumlah'].mean():,.0f}")
         prod_data.append(avg_row)
         
-        prod_table = Table(prod_data, colWidths=[50] + [80] * len(results['gears']) + [80])
+        prod_table = Table(prod_data, colWidths=[50] + [80] * len(results.gears) + [80])
         prod_table.setStyle(TableStyle([
             ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1E3A8A')),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
@@ -2567,13 +4449,13 @@ def generate_pdf_report(results, r_value):
         story.append(Paragraph("<b>DATA UPAYA PENANGKAPAN (trip):</b>", heading_style))
         
         # Siapkan data upaya untuk tabel
-        eff_data = [["Tahun"] + results['display_names'] + ["Jumlah"]]
+        eff_data = [["Tahun"] + results.display_names + ["Jumlah"]]
         
-        for _, row in results['df_effort'].iterrows():
+        for _, row in results.df_effort.iterrows():
             year = int(row['Tahun'])
             row_data = [str(year)]
             
-            for gear in results['gears']:
+            for gear in results.gears:
                 value = row[gear]
                 row_data.append(f"{value:,.0f}")
             
@@ -2582,14 +4464,14 @@ def generate_pdf_report(results, r_value):
         
         # Tambahkan rata-rata
         avg_row = ["Rata-rata"]
-        for gear in results['gears']:
-            avg = results['df_effort'][gear].mean()
+        for gear in results.gears:
+            avg = results.df_effort[gear].mean()
             avg_row.append(f"{avg:,.0f}")
         
-        avg_row.append(f"{results['df_effort']['Jumlah'].mean():,.0f}")
+        avg_row.append(f"{results.df_effort['Jumlah'].mean():,.0f}")
         eff_data.append(avg_row)
         
-        eff_table = Table(eff_data, colWidths=[50] + [80] * len(results['gears']) + [80])
+        eff_table = Table(eff_data, colWidths=[50] + [80] * len(results.gears) + [80])
         eff_table.setStyle(TableStyle([
             ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1E3A8A')),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
@@ -2617,20 +4499,20 @@ def generate_pdf_report(results, r_value):
         # CPUE Table
         story.append(Paragraph("<b>CPUE (Catch Per Unit Effort) - kg/trip:</b>", heading_style))
         
-        cpue_data = [["Tahun"] + results['display_names'] + ["Total"]]
+        cpue_data = [["Tahun"] + results.display_names + ["Total"]]
         
-        for _, row in results['df_cpue'].iterrows():
+        for _, row in results.df_cpue.iterrows():
             year = int(row['Tahun'])
             row_data = [str(year)]
             
-            for gear in results['gears']:
+            for gear in results.gears:
                 value = row[gear]
                 row_data.append(f"{value:.3f}")
             
             row_data.append(f"{row['Jumlah']:.3f}")
             cpue_data.append(row_data)
         
-        cpue_table = Table(cpue_data, colWidths=[50] + [80] * len(results['gears']) + [80])
+        cpue_table = Table(cpue_data, colWidths=[50] + [80] * len(results.gears) + [80])
         cpue_table.setStyle(TableStyle([
             ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#059669')),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
@@ -2650,20 +4532,20 @@ def generate_pdf_report(results, r_value):
         story.append(Paragraph("<b>Fishing Power Index (FPI):</b>", heading_style))
         story.append(Paragraph("Indeks daya tangkap relatif (nilai tertinggi = 1)", styles['Italic']))
         
-        fpi_data = [["Tahun"] + results['display_names'] + ["Total"]]
+        fpi_data = [["Tahun"] + results.display_names + ["Total"]]
         
-        for _, row in results['df_fpi'].iterrows():
+        for _, row in results.df_fpi.iterrows():
             year = int(row['Tahun'])
             row_data = [str(year)]
             
-            for gear in results['gears']:
+            for gear in results.gears:
                 value = row[gear]
                 row_data.append(f"{value:.3f}")
             
             row_data.append(f"{row['Jumlah']:.3f}")
             fpi_data.append(row_data)
         
-        fpi_table = Table(fpi_data, colWidths=[50] + [80] * len(results['gears']) + [80])
+        fpi_table = Table(fpi_data, colWidths=[50] + [80] * len(results.gears) + [80])
         fpi_table.setStyle(TableStyle([
             ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#7C3AED')),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
@@ -2684,8 +4566,8 @@ def generate_pdf_report(results, r_value):
         
         # Hitung rata-rata CPUE per alat
         ranking_data = []
-        for gear, display_name in zip(results['gears'], results['display_names']):
-            avg_cpue = results['df_cpue'][gear].mean()
+        for gear, display_name in zip(results.gears, results.display_names):
+            avg_cpue = results.df_cpue[gear].mean()
             ranking_data.append({
                 'Alat Tangkap': display_name,
                 'Rata-rata CPUE': avg_cpue
@@ -2728,7 +4610,7 @@ def generate_pdf_report(results, r_value):
         
         story.append(Paragraph(f"<b>Parameter r yang digunakan:</b> {r_value:.3f} (sumber: FishBase)", heading_style))
         
-        successful_models = {k: v for k, v in results['msy_results'].items() 
+        successful_models = {k: v for k, v in results.msy_results.items() 
                            if v and v['success']}
         
         if successful_models:
@@ -2779,8 +4661,12 @@ def generate_pdf_report(results, r_value):
             story.append(msy_comp_table)
             story.append(Spacer(1, 12))
             
-            # Model terbaik
-            best_model_name, best_model_results = max(successful_models.items(), key=lambda x: x[1]['r_squared'])
+            # Model terbaik (sama dengan yang dipakai rekomendasi)
+            if results.recommendations and results.recommendations['best_model'] in successful_models:
+                best_model_name = results.recommendations['best_model']
+                best_model_results = successful_models[best_model_name]
+            else:
+                best_model_name, best_model_results = max(successful_models.items(), key=lambda x: x[1]['r_squared'])
             
             story.append(Paragraph(f"<b>MODEL TERBAIK: {best_model_name} (R² = {best_model_results['r_squared']:.3f})</b>", heading_style))
             
@@ -2812,6 +4698,36 @@ def generate_pdf_report(results, r_value):
             ]))
             
             story.append(best_model_table)
+            story.append(Spacer(1, 12))
+            
+            story.append(Paragraph(f"<b>PREDIKSI DAN RESIDUAL PRODUKSI ({best_model_name}):</b>", heading_style))
+            residual = tabel_residual_model(
+                {best_model_name: best_model_results}, results.years,
+                results.total('upaya_standar'), results.total('produksi')
+            )
+            residual_data = [["Tahun", "Upaya Standar", "Observasi (kg)", "Prediksi (kg)", "Residual (kg)"]]
+            for baris in residual.itertuples(index=False):
+                residual_data.append([str(baris[0])] + [
+                    f"{nilai:,.1f}" if np.isfinite(nilai) else "—" for nilai in baris[1:]
+                ])
+            
+            residual_table = Table(residual_data, colWidths=[60, 100, 110, 110, 110])
+            residual_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1E3A8A')),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, -1), 8),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+                ('TOPPADDING', (0, 0), (-1, -1), 4),
+                ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#D1D5DB'))
+            ]))
+            story.append(residual_table)
+            dikecualikan = tahun_di_luar_fit({best_model_name: best_model_results}, results.years)
+            if dikecualikan:
+                story.append(Spacer(1, 6))
+                story.append(Paragraph(f"Tahun {', '.join(map(str, dikecualikan))} dikecualikan dari fit model "
+                                       "(sel berimputasi); prediksi dan residualnya dikosongkan.", normal_style))
         else:
             story.append(Paragraph("Tidak ada model yang berhasil dihitung", heading_style))
         
@@ -2823,8 +4739,8 @@ def generate_pdf_report(results, r_value):
         story.append(Paragraph("REKOMENDASI PENGELOLAAN PERIKANAN", title_style))
         story.append(Spacer(1, 12))
         
-        if 'recommendations' in results and results['recommendations']:
-            rec = results['recommendations']
+        if results.recommendations:
+            rec = results.recommendations
             
             # Rencana aksi berdasarkan status
             story.append(Paragraph("<b>RENCANA AKSI PENGELOLAAN:</b>", heading_style))
@@ -3048,16 +4964,20 @@ def render_ekspor_pdf_section():
         """)
     
     with col2:
-        if st.button("📄 Buat Laporan PDF", type="primary", use_container_width=True):
+        kunci_pdf = f"laporan_pdf_{st.session_state.r_value}"
+        if st.button("📄 Buat Laporan PDF", type="primary", use_container_width=True) or ada_cache_hasil(kunci_pdf):
             with st.spinner("Membuat laporan PDF..."):
-                pdf_buffer = generate_pdf_report(
-                    st.session_state.analysis_results, 
-                    st.session_state.r_value
-                )
+                def buat_pdf():
+                    pdf_buffer = generate_pdf_report(
+                        st.session_state.analysis_results, 
+                        st.session_state.r_value
+                    )
+                    return pdf_buffer.read() if pdf_buffer else None
+                pdf_bytes = ambil_cache_hasil(kunci_pdf, buat_pdf)
                 
-                if pdf_buffer:
+                if pdf_bytes:
                     # Encode PDF untuk download
-                    b64 = base64.b64encode(pdf_buffer.read()).decode()
+                    b64 = base64.b64encode(pdf_bytes).decode()
                     
                     # Tombol download
                     current_date = pd.Timestamp.now().strftime('%Y%m%d_%H%M')
@@ -3100,6 +5020,608 @@ def render_ekspor_pdf_section():
         5. Dapat dibuka di **semua perangkat**
         """)
 
+# ==============================================
+# PENYIMPANAN PROYEK ANALISIS (SQLITE)
+# ==============================================
+DB_PATH = os.environ.get('KURISI_DB_PATH', 'analisis_kurisi.db')
+
+# State sesi yang membentuk dataset + konfigurasi sebuah proyek
+KUNCI_STATE_PROYEK = (
+    'gear_config', 'data_tables', 'metadata', 'conversion_factors',
+    'advanced_gears_config', 'selected_models', 'r_value', 'metode_standardisasi', 'metode_validasi',
+    'metode_regresi', 'metode_imputasi', 'perlakuan_imputasi'
+)
+
+SKEMA_DATABASE = """
+CREATE TABLE IF NOT EXISTS proyek (
+    id INTEGER PRIMARY KEY,
+    nama TEXT NOT NULL UNIQUE,
+    dibuat TEXT NOT NULL,
+    diperbarui TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS analisis (
+    id INTEGER PRIMARY KEY,
+    proyek_id INTEGER NOT NULL REFERENCES proyek(id) ON DELETE CASCADE,
+    lokasi TEXT,
+    spesies TEXT,
+    tahun_awal INTEGER,
+    tahun_akhir INTEGER,
+    disimpan TEXT NOT NULL,
+    status_stok TEXT,
+    jtb REAL,
+    data_blob BLOB NOT NULL,
+    hasil_blob BLOB
+);
+CREATE INDEX IF NOT EXISTS idx_analisis_lokasi_spesies ON analisis(lokasi, spesies, disimpan);
+CREATE INDEX IF NOT EXISTS idx_analisis_spesies ON analisis(spesies, disimpan);
+CREATE INDEX IF NOT EXISTS idx_analisis_tahun ON analisis(tahun_awal, tahun_akhir);
+CREATE INDEX IF NOT EXISTS idx_analisis_proyek ON analisis(proyek_id, disimpan);
+CREATE TABLE IF NOT EXISTS job_analisis (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    progres REAL NOT NULL DEFAULT 0,
+    log TEXT NOT NULL DEFAULT '',
+    pid INTEGER,
+    dibuat TEXT NOT NULL,
+    diperbarui TEXT NOT NULL,
+    parameter_blob BLOB NOT NULL,
+    hasil_blob BLOB,
+    error TEXT,
+    kunci TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_job_status ON job_analisis(status, dibuat);
+"""
+
+@st.cache_resource
+def siapkan_skema_database(path):
+    """Buat tabel dan indeks sekali per proses"""
+    with closing(sqlite3.connect(path, timeout=30)) as conn:
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.executescript(SKEMA_DATABASE)
+        # Migrasi database lama: kolom kunci (hash parameter) pada job_analisis
+        kolom_job = {row[1] for row in conn.execute("PRAGMA table_info(job_analisis)")}
+        if 'kunci' not in kolom_job:
+            conn.execute("ALTER TABLE job_analisis ADD COLUMN kunci TEXT")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_job_kunci ON job_analisis(kunci, dibuat)")
+    return True
+
+def buka_database(path=DB_PATH):
+    """Buka koneksi SQLite (satu koneksi per operasi agar aman dipakai lintas thread)"""
+    siapkan_skema_database(path)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    return conn
+
+def kemas_blob(obj):
+    """Serialisasi objek Python ke blob biner terkompresi"""
+    return zlib.compress(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL), 6)
+
+def buka_blob(blob):
+    return pickle.loads(zlib.decompress(blob)) if blob is not None else None
+
+def simpan_analisis_proyek(nama_proyek, state_proyek, analysis_results, path=DB_PATH):
+    """Simpan dataset, konfigurasi, dan hasil analisis sebagai snapshot baru di bawah nama proyek"""
+    sekarang = pd.Timestamp.now().isoformat(timespec='seconds')
+    metadata = state_proyek.get('metadata', {})
+    years = state_proyek['gear_config']['years']
+    rec = (analysis_results.recommendations if analysis_results is not None else None) or {}
+    
+    with closing(buka_database(path)) as conn, conn:
+        conn.execute(
+            "INSERT INTO proyek (nama, dibuat, diperbarui) VALUES (?, ?, ?) "
+            "ON CONFLICT(nama) DO UPDATE SET diperbarui = excluded.diperbarui",
+            (nama_proyek, sekarang, sekarang)
+        )
+        proyek_id = conn.execute("SELECT id FROM proyek WHERE nama = ?", (nama_proyek,)).fetchone()['id']
+        cursor = conn.execute(
+            "INSERT INTO analisis (proyek_id, lokasi, spesies, tahun_awal, tahun_akhir, disimpan, "
+            "status_stok, jtb, data_blob, hasil_blob) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                proyek_id, metadata.get('lokasi'), metadata.get('spesies'),
+                int(min(years)), int(max(years)), sekarang,
+                rec.get('status_stok'), rec.get('jtb'),
+                kemas_blob(state_proyek),
+                analysis_results.ke_bytes() if analysis_results is not None else None
+            )
+        )
+        return cursor.lastrowid
+
+def daftar_analisis_tersimpan(lokasi=None, spesies=None, dari=None, sampai=None, batas=100, path=DB_PATH):
+    """Daftar snapshot analisis (tanpa blob), difilter lewat indeks lokasi/spesies/tanggal"""
+    kondisi, parameter = [], []
+    if lokasi:
+        kondisi.append("a.lokasi = ?")
+        parameter.append(lokasi)
+    if spesies:
+        kondisi.append("a.spesies = ?")
+        parameter.append(spesies)
+    if dari:
+        kondisi.append("a.disimpan >= ?")
+        parameter.append(str(dari))
+    if sampai:
+        kondisi.append("a.disimpan <= ?")
+        parameter.append(str(sampai))
+    where = f"WHERE {' AND '.join(kondisi)}" if kondisi else ""
+    
+    with closing(buka_database(path)) as conn:
+        rows = conn.execute(
+            "SELECT a.id, p.nama AS proyek, a.lokasi, a.spesies, a.tahun_awal, a.tahun_akhir, "
+            "a.disimpan, a.status_stok, a.jtb, a.hasil_blob IS NOT NULL AS ada_hasil "
+            f"FROM analisis a JOIN proyek p ON p.id = a.proyek_id {where} "
+            "ORDER BY a.disimpan DESC, a.id DESC LIMIT ?",
+            (*parameter, batas)
+        ).fetchall()
+    return pd.DataFrame([dict(row) for row in rows])
+
+def nilai_unik_tersimpan(kolom, path=DB_PATH):
+    """Nilai unik lokasi/spesies untuk filter (dibaca langsung dari indeks)"""
+    assert kolom in ('lokasi', 'spesies')
+    with closing(buka_database(path)) as conn:
+        rows = conn.execute(f"SELECT DISTINCT {kolom} FROM analisis WHERE {kolom} IS NOT NULL ORDER BY {kolom}").fetchall()
+    return [row[0] for row in rows]
+
+def muat_analisis_tersimpan(analisis_id, dengan_hasil=True, path=DB_PATH):
+    """Muat snapshot: (state proyek, hasil analisis) tanpa perhitungan ulang"""
+    kolom = "data_blob, hasil_blob" if dengan_hasil else "data_blob, NULL AS hasil_blob"
+    with closing(buka_database(path)) as conn:
+        row = conn.execute(f"SELECT {kolom} FROM analisis WHERE id = ?", (int(analisis_id),)).fetchone()
+    if row is None:
+        return None, None
+    hasil = HasilAnalisis.dari_bytes(row['hasil_blob']) if row['hasil_blob'] is not None else None
+    return buka_blob(row['data_blob']), hasil
+
+def render_proyek_tersimpan():
+    """Simpan dan muat ulang sesi analisis dari penyimpanan SQLite"""
+    with st.expander("💾 PROYEK TERSIMPAN", expanded=False):
+        nama_proyek = st.text_input(
+            "Nama proyek",
+            value=st.session_state.metadata.get('lokasi', ''),
+            key="nama_proyek_simpan"
+        )
+        if st.button("💾 Simpan Sesi", use_container_width=True, disabled=not nama_proyek.strip()):
+            state_proyek = {kunci: st.session_state[kunci] for kunci in KUNCI_STATE_PROYEK if kunci in st.session_state}
+            simpan_analisis_proyek(nama_proyek.strip(), state_proyek, st.session_state.analysis_results)
+            st.success(f"✅ Disimpan ke proyek '{nama_proyek.strip()}'")
+        
+        st.markdown("---")
+        filter_lokasi = st.selectbox("Filter lokasi", [""] + nilai_unik_tersimpan('lokasi'), key="filter_lokasi_proyek")
+        filter_spesies = st.selectbox("Filter spesies", [""] + nilai_unik_tersimpan('spesies'), key="filter_spesies_proyek")
+        
+        df_tersimpan = daftar_analisis_tersimpan(lokasi=filter_lokasi or None, spesies=filter_spesies or None)
+        if df_tersimpan.empty:
+            st.caption("Belum ada analisis tersimpan")
+            return
+        
+        label = {
+            row.id: f"{row.proyek} | {row.tahun_awal}-{row.tahun_akhir} | {row.disimpan}"
+                    + (f" | {row.status_stok}" if row.status_stok else "")
+            for row in df_tersimpan.itertuples()
+        }
+        analisis_id = st.selectbox("Pilih analisis", list(label), format_func=label.get, key="pilih_analisis_tersimpan")
+        
+        if st.button("📂 Muat Analisis", use_container_width=True):
+            state_proyek, analysis_results = muat_analisis_tersimpan(analisis_id)
+            if state_proyek is None:
+                st.error("❌ Analisis tidak ditemukan")
+                return
+            for kunci, nilai in state_proyek.items():
+                st.session_state[kunci] = nilai
+            st.session_state.analysis_results = analysis_results
+            st.success("✅ Analisis dimuat")
+            st.rerun()
+
+# ==============================================
+# ANTREAN JOB ANALISIS (PROSES LATAR BELAKANG)
+# ==============================================
+MAKS_WORKER_JOB = int(os.environ.get('KURISI_MAKS_WORKER_JOB', 2))
+JUMLAH_TAHAP_PIPELINE = 10
+UMUR_JOB_HARI = 7
+# Worker memperbarui kolom `diperbarui` job-nya secara berkala; job tanpa detak selama batas dianggap mati
+INTERVAL_DETAK_JOB_DETIK = 5
+BATAS_DETAK_JOB_DETIK = 60
+
+def _waktu_sekarang():
+    return pd.Timestamp.now().isoformat(timespec='seconds')
+
+def _proses_hidup(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+@st.cache_resource
+def proses_worker_job():
+    """Handle Popen worker job yang dijalankan proses server ini (dasar batas jumlah worker hidup)"""
+    return {'lock': threading.Lock(), 'proses': []}
+
+def worker_job_hidup():
+    """Handle worker yang masih hidup; poll() sekaligus memanen proses anak yang sudah selesai"""
+    pengelola = proses_worker_job()
+    with pengelola['lock']:
+        pengelola['proses'] = [proses for proses in pengelola['proses'] if proses.poll() is None]
+        return list(pengelola['proses'])
+
+def pastikan_worker_job(path=DB_PATH):
+    """Jalankan worker baru bila jumlah worker hidup masih di bawah MAKS_WORKER_JOB"""
+    pengelola = proses_worker_job()
+    with pengelola['lock']:
+        pengelola['proses'] = [proses for proses in pengelola['proses'] if proses.poll() is None]
+        if len(pengelola['proses']) >= MAKS_WORKER_JOB:
+            return False
+        # Worker berupa proses terpisah sehingga tetap hidup walau script Streamlit rerun / halaman di-refresh
+        pengelola['proses'].append(subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), '--worker-job', os.path.abspath(path)],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            start_new_session=True
+        ))
+        return True
+
+def bereskan_job_mati(conn):
+    """Tandai gagal job 'berjalan' yang worker-nya sudah mati (PID hilang) atau berhenti mengirim detak"""
+    worker_job_hidup()
+    batas_detak = (pd.Timestamp.now() - pd.Timedelta(seconds=BATAS_DETAK_JOB_DETIK)).isoformat(timespec='seconds')
+    mati = [
+        row['id'] for row in conn.execute("SELECT id, pid, diperbarui FROM job_analisis WHERE status = 'berjalan'")
+        if not (row['pid'] and _proses_hidup(row['pid'])) or row['diperbarui'] < batas_detak
+    ]
+    conn.executemany(
+        "UPDATE job_analisis SET status = 'gagal', error = ?, diperbarui = ? WHERE id = ? AND status = 'berjalan'",
+        [("Proses worker berhenti tiba-tiba", _waktu_sekarang(), job_id) for job_id in mati]
+    )
+    return mati
+
+def hash_parameter_analisis(parameter):
+    """Kunci deterministik untuk satu set data + konfigurasi analisis"""
+    return hashlib.sha256(json.dumps(parameter, sort_keys=True, default=float).encode('utf-8')).hexdigest()
+
+def kirim_job_analisis(parameter, path=DB_PATH):
+    """
+    Masukkan analisis ke antrean dan pastikan ada worker yang memprosesnya; kembalikan id job.
+    Bila job dengan parameter identik masih antri/berjalan atau selesai dalam masa TTL cache,
+    id job tersebut yang dikembalikan sehingga dataset yang sama tidak dihitung ulang.
+    Job yang worker-nya mati dibereskan lebih dulu agar kiriman baru tidak menempel pada job itu.
+    """
+    kunci = hash_parameter_analisis(parameter)
+    sekarang = _waktu_sekarang()
+    batas_umur = (pd.Timestamp.now() - pd.Timedelta(days=UMUR_JOB_HARI)).isoformat(timespec='seconds')
+    batas_cache = (pd.Timestamp.now() - pd.Timedelta(seconds=CACHE_TTL_DETIK)).isoformat(timespec='seconds')
+    
+    with closing(buka_database(path)) as conn, conn:
+        conn.execute("DELETE FROM job_analisis WHERE status IN ('selesai', 'gagal') AND diperbarui < ?", (batas_umur,))
+        bereskan_job_mati(conn)
+        sama = conn.execute(
+            "SELECT id FROM job_analisis WHERE kunci = ? AND status IN ('antri', 'berjalan', 'selesai') "
+            "AND dibuat >= ? ORDER BY dibuat DESC LIMIT 1",
+            (kunci, batas_cache)
+        ).fetchone()
+        if sama is not None:
+            job_id = sama['id']
+        else:
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                "INSERT INTO job_analisis (id, status, dibuat, diperbarui, parameter_blob, kunci) "
+                "VALUES (?, 'antri', ?, ?, ?, ?)",
+                (job_id, sekarang, sekarang, kemas_blob(parameter), kunci)
+            )
+        ada_antrean = conn.execute("SELECT 1 FROM job_analisis WHERE status = 'antri' LIMIT 1").fetchone()
+    
+    if ada_antrean:
+        pastikan_worker_job(path)
+    return job_id
+
+def _ambil_job_antri(conn):
+    """Klaim job antri tertua secara atomik (aman bila beberapa worker berjalan)"""
+    conn.execute("BEGIN IMMEDIATE")
+    row = conn.execute("SELECT id FROM job_analisis WHERE status = 'antri' ORDER BY dibuat LIMIT 1").fetchone()
+    if row is not None:
+        conn.execute(
+            "UPDATE job_analisis SET status = 'berjalan', pid = ?, diperbarui = ? WHERE id = ?",
+            (os.getpid(), _waktu_sekarang(), row['id'])
+        )
+    conn.execute("COMMIT")
+    return row['id'] if row is not None else None
+
+def jalankan_worker_job(path=DB_PATH):
+    """Loop worker: proses job antri satu per satu sampai antrean kosong"""
+    with closing(buka_database(path)) as conn:
+        conn.isolation_level = None
+        while True:
+            job_id = _ambil_job_antri(conn)
+            if job_id is None:
+                return
+            
+            berhenti = threading.Event()
+            def detak(job_id=job_id):
+                with closing(buka_database(path)) as conn_detak:
+                    while not berhenti.wait(INTERVAL_DETAK_JOB_DETIK):
+                        with conn_detak:
+                            conn_detak.execute(
+                                "UPDATE job_analisis SET diperbarui = ? WHERE id = ? AND status = 'berjalan'",
+                                (_waktu_sekarang(), job_id)
+                            )
+            pendetak = threading.Thread(target=detak, daemon=True)
+            pendetak.start()
+            
+            tahap = [0]
+            def laporan(pesan):
+                tahap[0] += 1
+                conn.execute(
+                    "UPDATE job_analisis SET progres = ?, log = log || ? || char(10), diperbarui = ? WHERE id = ?",
+                    (min(tahap[0] / JUMLAH_TAHAP_PIPELINE, 0.95), pesan, _waktu_sekarang(), job_id)
+                )
+            
+            try:
+                parameter = buka_blob(conn.execute(
+                    "SELECT parameter_blob FROM job_analisis WHERE id = ?", (job_id,)
+                ).fetchone()['parameter_blob'])
+                results = jalankan_pipeline_analisis(**parameter, laporan=laporan)
+            except Exception as e:
+                conn.execute(
+                    "UPDATE job_analisis SET status = 'gagal', error = ?, diperbarui = ? WHERE id = ?",
+                    (str(e), _waktu_sekarang(), job_id)
+                )
+            else:
+                conn.execute(
+                    "UPDATE job_analisis SET status = 'selesai', progres = 1, hasil_blob = ?, diperbarui = ? WHERE id = ?",
+                    (results.ke_bytes(), _waktu_sekarang(), job_id)
+                )
+            finally:
+                berhenti.set()
+                pendetak.join()
+
+def status_job_analisis(job_id, path=DB_PATH):
+    """
+    Status, progres, dan log job (tanpa blob hasil). Job yang worker-nya mati ditandai gagal;
+    job yang masih antri tanpa worker hidup (mis. worker keluar tepat saat job masuk) dibuatkan worker.
+    """
+    with closing(buka_database(path)) as conn, conn:
+        bereskan_job_mati(conn)
+        row = conn.execute(
+            "SELECT id, status, progres, log, pid, error FROM job_analisis WHERE id = ?", (job_id,)
+        ).fetchone()
+    if row is None:
+        return None
+    job = dict(row)
+    if job['status'] == 'antri':
+        pastikan_worker_job(path)
+    return job
+
+def hasil_job_analisis(job_id, path=DB_PATH):
+    with closing(buka_database(path)) as conn:
+        row = conn.execute("SELECT hasil_blob FROM job_analisis WHERE id = ?", (job_id,)).fetchone()
+    if row is None or row['hasil_blob'] is None:
+        return None
+    return HasilAnalisis.dari_bytes(row['hasil_blob'])
+
+def lepas_job_analisis():
+    """Hentikan pemantauan job di sesi ini (job di latar belakang tidak dibatalkan)"""
+    st.session_state.job_analisis = None
+    st.query_params.pop('job', None)
+
+@st.fragment(run_every=1.0)
+def pantau_job_analisis(job_id):
+    """Tampilkan progres job tanpa memblokir script; muat hasil ke sesi setelah selesai"""
+    job = status_job_analisis(job_id)
+    if job is None:
+        lepas_job_analisis()
+        st.warning("⚠️ Job analisis tidak ditemukan")
+        return
+    
+    if job['status'] == 'selesai':
+        st.session_state.analysis_results = hasil_job_analisis(job_id)
+        lepas_job_analisis()
+        st.rerun()
+    
+    label = {'antri': "⏳ Menunggu worker...", 'berjalan': "🔬 MELAKUKAN ANALISIS...", 'gagal': "❌ Analisis gagal"}
+    with st.status(label[job['status']], expanded=True, state="error" if job['status'] == 'gagal' else "running"):
+        st.progress(job['progres'])
+        for pesan in job['log'].splitlines():
+            st.write(pesan)
+        if job['status'] == 'gagal':
+            st.error(f"❌ {job['error']}")
+    
+    if job['status'] == 'gagal' and st.button("Tutup", key="tutup_job_gagal"):
+        lepas_job_analisis()
+        st.rerun()
+
+# ==============================================
+# ANGGARAN MEMORI SESI
+# ==============================================
+ANGGARAN_MEMORI_SESI_MB = float(os.environ.get('KURISI_ANGGARAN_SESI_MB', 64))
+ANGGARAN_MEMORI_TOTAL_MB = float(os.environ.get('KURISI_ANGGARAN_TOTAL_MB', 1024))
+BATAS_IDLE_SESI_DETIK = float(os.environ.get('KURISI_BATAS_IDLE_DETIK', 600))
+JEDA_MIN_TITIP_DETIK = 30
+INTERVAL_SAPU_DETIK = 30
+DIR_TITIPAN = os.environ.get('KURISI_DIR_TITIPAN', os.path.join(tempfile.gettempdir(), 'kurisi_titipan'))
+
+# Objek besar per sesi yang boleh dipindah ke disk; yang "dibuang" cukup dihapus karena dibuat ulang otomatis
+KUNCI_MEMORI_BESAR = ('analysis_results', 'data_tables', 'uploaded_data', 'cache_hasil')
+KUNCI_BISA_DIBUANG = ('cache_hasil',)
+PENANDA_TITIPAN = '__titipan_disk__'
+
+@st.cache_resource
+def registri_sesi():
+    """
+    Registri lintas sesi: id sesi -> weakref state sesi (hanya untuk mendeteksi sesi tertutup), waktu aktivitas
+    terakhir, penanda run berjalan, dan simpanan objek besar sesi di antara run. Hanya simpanan yang disentuh
+    oleh penyapu; state sesi hanya diubah oleh thread run sesi itu sendiri.
+    """
+    return {'lock': threading.Lock(), 'sesi': {}, 'sapu_terakhir': 0.0}
+
+def ukuran_objek(obj):
+    """Perkiraan ukuran objek di memori (byte)"""
+    if hasattr(obj, 'ke_bytes') and hasattr(obj, 'nilai'):
+        return obj.nilai.nbytes + 4096
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, (bytes, bytearray)):
+        return len(obj)
+    if isinstance(obj, io.BytesIO):
+        return obj.getbuffer().nbytes
+    if isinstance(obj, PILImage.Image):
+        return obj.width * obj.height * len(obj.getbands())
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(ukuran_objek(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(ukuran_objek(v) for v in obj)
+    return sys.getsizeof(obj)
+
+def _adalah_titipan(nilai):
+    return isinstance(nilai, dict) and PENANDA_TITIPAN in nilai
+
+def ukuran_sesi(state):
+    """Ukuran objek besar sesi per kunci (objek yang sudah dititipkan ke disk dihitung 0)"""
+    return {
+        kunci: 0 if _adalah_titipan(state[kunci]) else ukuran_objek(state[kunci])
+        for kunci in KUNCI_MEMORI_BESAR if kunci in state
+    }
+
+def titipkan_ke_disk(state, session_id, kunci):
+    """Pindahkan satu objek sesi ke disk (atau buang bila bisa dibuat ulang); kembalikan byte yang dibebaskan"""
+    if kunci not in state or state[kunci] is None or _adalah_titipan(state[kunci]):
+        return 0
+    nilai = state[kunci]
+    ukuran = ukuran_objek(nilai)
+    if kunci in KUNCI_BISA_DIBUANG:
+        del state[kunci]
+        return ukuran
+    
+    folder = os.path.join(DIR_TITIPAN, session_id)
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"{kunci}.bin")
+    format_titipan = 'hasil' if hasattr(nilai, 'ke_bytes') else 'pickle'
+    with open(path, 'wb') as f:
+        f.write(nilai.ke_bytes() if format_titipan == 'hasil' else kemas_blob(nilai))
+    state[kunci] = {PENANDA_TITIPAN: path, 'format': format_titipan, 'ukuran': ukuran}
+    return ukuran
+
+def muat_titipan(titipan):
+    """Muat kembali objek yang dititipkan ke disk lalu hapus berkasnya"""
+    with open(titipan[PENANDA_TITIPAN], 'rb') as f:
+        data = f.read()
+    os.remove(titipan[PENANDA_TITIPAN])
+    return HasilAnalisis.dari_bytes(data) if titipan['format'] == 'hasil' else buka_blob(data)
+
+def sapu_memori_sesi(registri):
+    """
+    Titipkan simpanan sesi idle ke disk, lalu simpanan sesi paling lama tidak aktif sampai total memori
+    di bawah anggaran. Sesi yang sedang menjalankan run dilewati (objeknya dipegang run tersebut).
+    """
+    sekarang = time.time()
+    kandidat = []
+    total = 0
+    
+    for session_id, info in list(registri['sesi'].items()):
+        if info['ref']() is None:
+            # Sesi sudah ditutup: bersihkan registri dan berkas titipannya
+            del registri['sesi'][session_id]
+            shutil.rmtree(os.path.join(DIR_TITIPAN, session_id), ignore_errors=True)
+            continue
+        if info['berjalan']:
+            total += info['ukuran']
+            continue
+        
+        simpanan = info['simpanan']
+        idle = sekarang - info['aktif']
+        if idle > BATAS_IDLE_SESI_DETIK:
+            for kunci in KUNCI_MEMORI_BESAR:
+                titipkan_ke_disk(simpanan, session_id, kunci)
+        
+        info['ukuran'] = sum(ukuran_sesi(simpanan).values())
+        total += info['ukuran']
+        if idle > JEDA_MIN_TITIP_DETIK and info['ukuran'] > 0:
+            kandidat.append((info['aktif'], session_id, info))
+    
+    for _, session_id, info in sorted(kandidat, key=lambda item: item[0]):
+        if total <= ANGGARAN_MEMORI_TOTAL_MB * 2**20:
+            break
+        for kunci in KUNCI_MEMORI_BESAR:
+            total -= titipkan_ke_disk(info['simpanan'], session_id, kunci)
+        info['ukuran'] = 0
+
+def _state_sesi_aktif():
+    """(id sesi, SessionState) run yang sedang berjalan, atau (None, None) di luar run Streamlit"""
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return None, None
+    # SessionState di balik proxy st.session_state bertahan selama sesi browser hidup
+    return ctx.session_id, getattr(ctx.session_state, '_state', ctx.session_state)
+
+def kelola_memori_sesi():
+    """
+    Dipanggil di awal setiap run: tandai sesi sedang berjalan, catat aktivitas, ambil kembali objek besar
+    dari simpanan registri (memuat dari disk bila sudah dititipkan), tegakkan anggaran per sesi,
+    dan (berkala) sapu simpanan sesi lain yang idle atau melebihi anggaran total. Semua di bawah lock registri.
+    """
+    session_id, state = _state_sesi_aktif()
+    if state is None:
+        return
+    
+    registri = registri_sesi()
+    with registri['lock']:
+        info = registri['sesi'].setdefault(session_id, {'simpanan': {}, 'ukuran': 0})
+        info.update(ref=weakref.ref(state), aktif=time.time(), berjalan=True)
+        simpanan, info['simpanan'] = info['simpanan'], {}
+        
+        for kunci, nilai in simpanan.items():
+            if kunci in state:
+                # Nilai yang ditulis di luar run penuh (mis. fragment pemantau job) lebih baru dari simpanan
+                if _adalah_titipan(nilai) and os.path.exists(nilai[PENANDA_TITIPAN]):
+                    os.remove(nilai[PENANDA_TITIPAN])
+                continue
+            if not _adalah_titipan(nilai):
+                state[kunci] = nilai
+                continue
+            try:
+                state[kunci] = muat_titipan(nilai)
+            except FileNotFoundError:
+                # Berkas titipan hilang (mis. folder temp dibersihkan): mulai ulang dari nilai awal
+                pass
+        
+        if sum(ukuran_sesi(state).values()) > ANGGARAN_MEMORI_SESI_MB * 2**20 and 'cache_hasil' in state:
+            # Grafik/ekspor ter-cache adalah turunan dan dibuat ulang saat dibutuhkan
+            del state['cache_hasil']
+        info['ukuran'] = sum(ukuran_sesi(state).values())
+        
+        if time.time() - registri['sapu_terakhir'] > INTERVAL_SAPU_DETIK:
+            registri['sapu_terakhir'] = time.time()
+            sapu_memori_sesi(registri)
+
+def simpan_memori_sesi():
+    """
+    Dipanggil di akhir setiap run penuh (juga saat run dihentikan oleh st.rerun atau error): pindahkan
+    objek besar sesi ke simpanan registri yang dibaca kembali pada run berikutnya, lalu lepas penanda berjalan.
+    """
+    session_id, state = _state_sesi_aktif()
+    if state is None:
+        return
+    
+    registri = registri_sesi()
+    with registri['lock']:
+        info = registri['sesi'].get(session_id)
+        if info is None:
+            return
+        simpanan = {kunci: state[kunci] for kunci in KUNCI_MEMORI_BESAR if kunci in state}
+        for kunci in simpanan:
+            del state[kunci]
+        info.update(simpanan=simpanan, ukuran=sum(ukuran_sesi(simpanan).values()),
+                    aktif=time.time(), berjalan=False)
+
+@contextmanager
+def siklus_memori_sesi():
+    """Bungkus satu run penuh aplikasi dengan pengambilan dan penyimpanan objek besar sesi"""
+    kelola_memori_sesi()
+    try:
+        yield
+    finally:
+        simpan_memori_sesi()
+
 # ==============================================
 # FUNGSI UTILITAS DAN KONFIGURASI
 # ==============================================
@@ -3115,6 +5637,36 @@ def save_config(gears, display_names, standard_gear, years, num_years):
 def generate_years(start_year, num_years):
     return [start_year + i for i in range(num_years)]
 
+def _cache_hasil_aktif():
+    """Cache objek turunan (grafik, ekspor) untuk set hasil analisis yang sedang aktif"""
+    id_hasil = st.session_state.analysis_results.id_hasil
+    cache = st.session_state.setdefault('cache_hasil', {})
+    if cache.get('id_hasil') != id_hasil:
+        cache.clear()
+        cache['id_hasil'] = id_hasil
+    return cache
+
+def ada_cache_hasil(kunci):
+    return kunci in _cache_hasil_aktif()
+
+def ambil_cache_hasil(kunci, pembuat):
+    """Ambil objek dari cache hasil aktif, bangun sekali dengan `pembuat` jika belum ada"""
+    cache = _cache_hasil_aktif()
+    if kunci not in cache:
+        cache[kunci] = pembuat()
+    return cache[kunci]
+
+def gambar_ke_png(fig, dpi=150, rapat=True):
+    """Render figure matplotlib ke PNG bytes lalu tutup figure (`rapat=False` melewati bbox 'tight')"""
+    buffer = BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight' if rapat else None)
+    plt.close(fig)
+    return buffer.getvalue()
+
+def tampilkan_grafik_cache(kunci, pembuat_grafik):
+    """Tampilkan grafik dari cache PNG; figure hanya dibuat pada render pertama"""
+    st.image(ambil_cache_hasil(kunci, lambda: gambar_ke_png(pembuat_grafik())), use_container_width=True)
+
 def reset_data():
     """Reset ke data contoh yang konsisten"""
     st.session_state.data_tables = {
@@ -3217,6 +5769,69 @@ def render_sidebar():
         else:
             st.session_state.selected_models = selected_models
         
+        # Metode standardisasi upaya
+        st.markdown("<h3 style='color: #3B82F6;'>⚖️ STANDARDISASI UPAYA</h3>", unsafe_allow_html=True)
+        st.session_state.metode_standardisasi = st.selectbox(
+            "**Metode standardisasi:**",
+            options=list(METODE_STANDARDISASI),
+            index=list(METODE_STANDARDISASI).index(st.session_state.metode_standardisasi),
+            format_func=METODE_STANDARDISASI.get,
+            help="FPI: CPUE dibagi CPUE tertinggi per tahun. Daya tangkap tetap: upaya dikali daya tangkap "
+                 "dari konfigurasi alat (atau FPI gabungan relatif alat standar) dalam satu operasi matriks. "
+                 "GLM: indeks tahunan dari model log-normal/Tweedie "
+                 "dengan faktor tahun, alat tangkap, bulan, dan kapal (jika tersedia)"
+        )
+        
+        config = get_config()
+        if config['gears']:
+            st.session_state.gear_config['standard_gear'] = st.selectbox(
+                "**Alat tangkap standar:**",
+                options=config['gears'],
+                index=config['gears'].index(config['standard_gear']) if config['standard_gear'] in config['gears'] else 0,
+                format_func=dict(zip(config['gears'], config['display_names'])).get,
+                help="Acuan (FPI = 1) untuk standardisasi daya tangkap tetap dan GLM"
+            )
+        
+        st.session_state.metode_imputasi = st.selectbox(
+            "**Imputasi sel kosong:**",
+            options=list(METODE_IMPUTASI),
+            index=list(METODE_IMPUTASI).index(st.session_state.metode_imputasi),
+            format_func=METODE_IMPUTASI.get,
+            help="Sel produksi/upaya yang kosong diisi sebelum CPUE dihitung dan ditandai sebagai hasil imputasi"
+        )
+        
+        st.session_state.perlakuan_imputasi = st.selectbox(
+            "**Tahun berimputasi pada fit MSY:**",
+            options=list(PERLAKUAN_IMPUTASI),
+            index=list(PERLAKUAN_IMPUTASI).index(st.session_state.perlakuan_imputasi),
+            format_func=PERLAKUAN_IMPUTASI.get
+        )
+        
+        st.session_state.metode_regresi = st.selectbox(
+            "**Regresi model Schaefer:**",
+            options=list(METODE_REGRESI),
+            index=list(METODE_REGRESI).index(st.session_state.metode_regresi),
+            format_func=METODE_REGRESI.get,
+            help="Penduga robust (Theil-Sen, Huber, RANSAC) mengurangi pengaruh satu tahun anomali "
+                 "terhadap garis CPUE-upaya dan JTB"
+        )
+        
+        st.session_state.metode_validasi = st.selectbox(
+            "**Pemilihan model terbaik:**",
+            options=list(METODE_VALIDASI),
+            index=list(METODE_VALIDASI).index(st.session_state.metode_validasi),
+            format_func=METODE_VALIDASI.get,
+            help="Hindcast: setiap model di-fit ulang tanpa tahun uji lalu memprediksi produksi tahun tersebut. "
+                 "Model dengan galat (RMSE) terkecil dipilih"
+        )
+        
+        st.session_state.grafik_interaktif = st.toggle(
+            "**Grafik interaktif (zoom & tooltip)**",
+            value=st.session_state.grafik_interaktif,
+            help="Grafik CPUE dan MSY dirender di browser dari data JSON ringkas; zoom dan tooltip "
+                 "tidak memerlukan render ulang di server. Nonaktifkan untuk gambar statis (PNG)."
+        )
+        
         st.markdown("---")
         
         # Informasi data saat ini
@@ -3250,88 +5865,303 @@ def render_sidebar():
         
         st.markdown("---")
         
+        # Simpan / muat sesi analisis
+        render_proyek_tersimpan()
+        
         # Tampilkan referensi ilmiah
         render_referensi_ilmiah()
         
         # Tampilkan informasi ikan kurisi
         render_kurisi_info()
 
+# ==============================================
+# STRUKTUR HASIL ANALISIS
+# ==============================================
+class HasilAnalisis:
+    """
+    Hasil analisis ringkas: semua tabel per tahun disimpan dalam satu array float64
+    berukuran (tahun × (alat + Jumlah) × metrik); DataFrame dibuat saat dibutuhkan.
+    """
+    METRIK = ('produksi', 'upaya', 'cpue', 'fpi', 'upaya_standar', 'cpue_standar')
+    
+    __slots__ = (
+        'id_hasil', 'tahun', 'gears', 'display_names', 'nilai', 'msy_results',
+        'recommendations', 'metode_standardisasi', 'info_standardisasi', 'hindcast', 'kualitas_data',
+        'imputasi', 'konversi', 'periode', 'tren'
+    )
+    
+    def __init__(self, tahun, gears, display_names, nilai, msy_results, recommendations,
+                 metode_standardisasi='fpi', info_standardisasi=None, id_hasil=None, hindcast=None,
+                 kualitas_data=None, imputasi=None, konversi=None,
+                 periode=None, tren=None):
+        self.id_hasil = id_hasil or uuid.uuid4().hex
+        self.tahun = np.asarray(tahun, dtype=np.int64)
+        self.gears = list(gears)
+        self.display_names = list(display_names)
+        self.nilai = np.ascontiguousarray(nilai, dtype=np.float64)
+        self.msy_results = msy_results
+        self.recommendations = recommendations
+        self.metode_standardisasi = metode_standardisasi
+        self.info_standardisasi = info_standardisasi
+        self.hindcast = hindcast
+        self.kualitas_data = kualitas_data
+        self.imputasi = imputasi
+        self.konversi = konversi
+        self.periode = periode
+        self.tren = tren
+    
+    @staticmethod
+    def _kolom(metrik, gears):
+        if metrik == 'cpue_standar':
+            return [f'{gear}_Std_CPUE' for gear in gears] + ['CPUE_Standar_Total']
+        return list(gears) + ['Jumlah']
+    
+    @classmethod
+    def dari_tabel(cls, tabel, gears, display_names, msy_results, recommendations,
+                   metode_standardisasi='fpi', info_standardisasi=None, id_hasil=None, hindcast=None,
+                   kualitas_data=None, imputasi=None, konversi=None,
+                   periode=None, tren=None):
+        """Kemas dict {metrik: DataFrame (Tahun, alat..., Jumlah)} ke dalam satu array"""
+        tahun = tabel['produksi']['Tahun'].to_numpy()
+        nilai = np.empty((len(tahun), len(gears) + 1, len(cls.METRIK)))
+        for k, metrik in enumerate(cls.METRIK):
+            nilai[:, :, k] = tabel[metrik][cls._kolom(metrik, gears)].to_numpy(dtype=np.float64)
+        return cls(tahun, gears, display_names, nilai, msy_results, recommendations,
+                   metode_standardisasi, info_standardisasi, id_hasil, hindcast, kualitas_data, imputasi,
+                   konversi, periode, tren)
+    
+    def tabel(self, metrik):
+        """DataFrame satu metrik dengan kolom Tahun, alat tangkap, dan total"""
+        df = pd.DataFrame(self.nilai[:, :, self.METRIK.index(metrik)], columns=self._kolom(metrik, self.gears))
+        df.insert(0, 'Tahun', self.tahun)
+        if metrik == 'cpue_standar':
+            total = df['CPUE_Standar_Total'].to_numpy()
+            df['Ln_CPUE'] = np.log(total, out=np.zeros_like(total), where=total > 0)
+        return df
+    
+    def total(self, metrik):
+        """Kolom total (Jumlah) satu metrik sebagai view array tanpa salinan"""
+        return self.nilai[:, -1, self.METRIK.index(metrik)]
+    
+    df_production = property(lambda self: self.tabel('produksi'))
+    df_effort = property(lambda self: self.tabel('upaya'))
+    df_cpue = property(lambda self: self.tabel('cpue'))
+    df_fpi = property(lambda self: self.tabel('fpi'))
+    df_standard_effort = property(lambda self: self.tabel('upaya_standar'))
+    df_standard_cpue = property(lambda self: self.tabel('cpue_standar'))
+    
+    @property
+    def years(self):
+        return self.tahun.tolist()
+    
+    def ke_dict(self):
+        return {kunci: getattr(self, kunci) for kunci in self.__slots__}
+    
+    @classmethod
+    def dari_dict(cls, data):
+        """Bangun dari ke_dict() atau dari dict hasil format lama (berisi DataFrame df_*)"""
+        if 'nilai' in data:
+            return cls(**data)
+        tabel = dict(zip(cls.METRIK, (
+            data['df_production'], data['df_effort'], data['df_cpue'],
+            data['df_fpi'], data['df_standard_effort'], data['df_standard_cpue']
+        )))
+        return cls.dari_tabel(
+            tabel, data['gears'], data['display_names'], data['msy_results'], data['recommendations'],
+            data.get('metode_standardisasi', 'fpi'), data.get('info_standardisasi'), data.get('id_hasil')
+        )
+    
+    def ke_bytes(self):
+        """Serialisasi biner terkompresi (hanya tipe dasar/numpy, bukan kelas ini, agar bisa dibuka lintas proses)"""
+        return zlib.compress(pickle.dumps(self.ke_dict(), protocol=pickle.HIGHEST_PROTOCOL), 6)
+    
+    @classmethod
+    def dari_bytes(cls, data):
+        return cls.dari_dict(pickle.loads(zlib.decompress(data)))
+
 # ==============================================
 # FUNGSI ANALISIS UTAMA
 # ==============================================
+def jalankan_pipeline_analisis(production_data, effort_data, gears, display_names, standard_gear,
+                               selected_models, r_value, metode_standardisasi='fpi', metode_validasi='loyo',
+                               metode_regresi='ols', metode_imputasi='interpolasi', perlakuan_imputasi='pakai',
+                               konversi=None, daya_tangkap=None, kolom_waktu='Tahun', laporan=None):
+    """
+    Pipeline analisis lengkap tanpa ketergantungan pada st.session_state:
+    QA data → satuan & kalibrasi → imputasi → CPUE → standardisasi upaya → model MSY → validasi hindcast → tren CPUE → status stok.
+    Data boleh berresolusi sub-tahunan (`kolom_waktu`, mis. 'Periode' berisi '2021-03' atau '2021Q2'):
+    CPUE/FPI dihitung per periode lalu dijumlahkan per tahun untuk model produksi surplus.
+    `laporan(pesan)` opsional dipanggil di setiap tahap untuk menampilkan progres.
+    """
+    laporan = laporan or (lambda pesan: None)
+    laporan("📊 Membaca data produksi dan upaya...")
+    
+    df_production = pd.DataFrame(production_data)
+    df_effort = pd.DataFrame(effort_data)
+    
+    if df_production.empty or df_effort.empty:
+        raise ValueError("Data produksi atau upaya kosong")
+    
+    laporan("🩺 Memeriksa kualitas data...")
+    kualitas_data = periksa_kualitas_data(df_production, df_effort, gears, kolom_waktu=kolom_waktu).to_dict('records')
+    
+    laporan("📏 Menyeragamkan satuan dan kalibrasi CPUE...")
+    df_production, df_effort, info_konversi = seragamkan_satuan(
+        df_production, df_effort, gears, konversi, kolom_waktu=kolom_waktu
+    )
+    
+    laporan(f"🩹 Mengisi sel kosong: {METODE_IMPUTASI[metode_imputasi]}...")
+    df_production, df_effort, sel_imputasi = imputasi_data(
+        df_production, df_effort, gears, metode_imputasi, kolom_waktu=kolom_waktu
+    )
+    info_imputasi = {
+        'metode': metode_imputasi, 'perlakuan': perlakuan_imputasi,
+        'sel': sel_imputasi.to_dict('records'), 'tahun_dikecualikan': [], 'catatan': None
+    }
+    
+    laporan("🧮 Menghitung CPUE...")
+    df_cpue = hitung_cpue(df_production, df_effort, gears, kolom_waktu)
+    
+    laporan(f"⚖️ Standardisasi upaya: {METODE_STANDARDISASI[metode_standardisasi]}...")
+    df_fpi, df_standard_effort, df_standard_cpue, info_standardisasi = standardisasi_upaya(
+        df_production, df_effort, df_cpue, gears, standard_gear, metode_standardisasi, daya_tangkap, kolom_waktu
+    )
+    
+    # Tren CPUE diuji pada resolusi asli data, sebelum dijumlahkan per tahun: per alat pada CPUE nominal
+    # (CPUE standar metode FPI per tahun sama untuk semua alat pada satu periode), total pada CPUE standar
+    df_cpue_tren = df_cpue[[kolom_waktu] + gears].merge(
+        df_standard_cpue[[kolom_waktu, KOLOM_TREN_TOTAL]], on=kolom_waktu, how='left'
+    )
+    periode = None
+    if kolom_waktu != 'Tahun':
+        # Tabel per periode disimpan; model produksi surplus memakai total tahunan
+        periode = {
+            'kolom_waktu': kolom_waktu,
+            'cpue': df_cpue.to_dict('records'),
+            'fpi': df_fpi.to_dict('records'),
+            'cpue_standar': df_standard_cpue.to_dict('records')
+        }
+        df_production = agregasi_tahunan(df_production, gears, kolom_waktu)
+        df_effort = agregasi_tahunan(df_effort, gears, kolom_waktu)
+        df_standard_effort = agregasi_tahunan(df_standard_effort, gears, kolom_waktu)
+        df_cpue = hitung_cpue(df_production, df_effort, gears)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fpi_efektif = np.where(df_effort[gears] > 0, df_standard_effort[gears] / df_effort[gears], 0.0)
+        df_fpi = _tabel_waktu(df_production['Tahun'], fpi_efektif, gears, 'Tahun')
+        df_fpi['Jumlah'] = fpi_efektif.sum(axis=1)
+        df_standard_cpue = hitung_cpue_standar(df_production, df_standard_effort, gears)
+        sel_imputasi = sel_imputasi.assign(Tahun=tahun_dari_waktu(sel_imputasi['Tahun']))
+    
+    laporan("🎯 Melakukan analisis MSY...")
+    standard_effort_total = df_standard_effort['Jumlah'].values
+    cpue_standard_total = df_standard_cpue['CPUE_Standar_Total'].values
+    production_total = df_production['Jumlah'].values
+    
+    # Tahun tanpa upaya/CPUE standar terestimasi (mis. tidak ada di indeks GLM) tidak pernah ikut fit MSY;
+    # tahun dengan sel imputasi dapat dikeluarkan dari fit (bukan dari tabel dan status stok)
+    pakai_fit = np.isfinite(standard_effort_total) & np.isfinite(cpue_standard_total)
+    if perlakuan_imputasi == 'kecualikan' and len(sel_imputasi):
+        berimputasi = df_production['Tahun'].isin(sel_imputasi['Tahun']).to_numpy()
+        if (pakai_fit & ~berimputasi).sum() >= MIN_TAHUN_FIT_MSY:
+            pakai_fit = pakai_fit & ~berimputasi
+            info_imputasi['tahun_dikecualikan'] = df_production.loc[berimputasi, 'Tahun'].tolist()
+        else:
+            info_imputasi['catatan'] = (f"Tahun tanpa imputasi kurang dari {MIN_TAHUN_FIT_MSY}; "
+                                        "semua tahun tetap dipakai pada fit MSY")
+    
+    msy_results = bandingkan_model_msy(
+        standard_effort_total[pakai_fit], 
+        cpue_standard_total[pakai_fit], 
+        production_total[pakai_fit], 
+        selected_models,
+        r_value,
+        metode_regresi
+    )
+    
+    hindcast, skor_model = None, None
+    if metode_validasi != 'r2':
+        laporan(f"🔁 Validasi model: {METODE_VALIDASI[metode_validasi]}...")
+        hindcast = hindcast_model_msy(
+            standard_effort_total[pakai_fit], cpue_standard_total[pakai_fit], production_total[pakai_fit],
+            msy_results, metode_validasi
+        )
+        if hindcast:
+            skor_model = {nama: nilai['rmse'] for nama, nilai in hindcast['model'].items()}
+    
+    years = df_production['Tahun'].values.tolist()
+    msy_results, hindcast = sejajarkan_hasil_fit(msy_results, hindcast, pakai_fit, years)
+    
+    laporan("📈 Menganalisis tren CPUE...")
+    tren = analisis_tren_cpue(df_cpue_tren, gears + [KOLOM_TREN_TOTAL], kolom_waktu)
+    tren_cpue = ringkas_tren_cpue(tren, KOLOM_TREN_TOTAL, dict(zip(gears, display_names)))
+    
+    laporan("📋 Menganalisis status stok...")
+    recommendations = analisis_status_stok(
+        msy_results, production_total, standard_effort_total, years, skor_model, tren_cpue
+    )
+    
+    tabel = dict(zip(HasilAnalisis.METRIK, (
+        df_production, df_effort, df_cpue, df_fpi, df_standard_effort, df_standard_cpue
+    )))
+    return HasilAnalisis.dari_tabel(
+        tabel, gears, display_names, msy_results, recommendations,
+        metode_standardisasi, info_standardisasi, hindcast=hindcast, kualitas_data=kualitas_data,
+        imputasi=info_imputasi, konversi=info_konversi, periode=periode, tren=kemas_tren(tren, df_cpue_tren)
+    )
+
+def parameter_analisis_sesi():
+    """Kumpulkan argumen pipeline analisis dari data dan konfigurasi sesi aktif"""
+    config = get_config()
+    return {
+        'production_data': st.session_state.data_tables['production'],
+        'effort_data': st.session_state.data_tables['effort'],
+        'gears': config['gears'],
+        'display_names': config['display_names'],
+        'standard_gear': config['standard_gear'],
+        'selected_models': st.session_state.selected_models,
+        'r_value': st.session_state.r_value,
+        'metode_standardisasi': st.session_state.metode_standardisasi,
+        'metode_validasi': st.session_state.metode_validasi,
+        'metode_regresi': st.session_state.metode_regresi,
+        'metode_imputasi': st.session_state.metode_imputasi,
+        'perlakuan_imputasi': st.session_state.perlakuan_imputasi,
+        'konversi': st.session_state.conversion_factors,
+        'daya_tangkap': {
+            baris['kode']: baris['daya_tangkap'] for baris in st.session_state.advanced_gears_config
+            if baris.get('kode') in config['gears']
+        },
+        'kolom_waktu': kolom_waktu_tabel(st.session_state.data_tables['production'])
+    }
+
 def lakukan_analisis():
-    """Fungsi utama untuk melakukan analisis lengkap"""
+    """Kirim analisis lengkap ke antrean job latar belakang; progres dipantau oleh pantau_job_analisis"""
     if 'data_tables' not in st.session_state:
         st.error("❌ Data tidak tersedia. Silakan konfigurasi data terlebih dahulu.")
         return None
     
-    with st.status("🔬 MELAKUKAN ANALISIS...", expanded=True) as status:
-        st.write("📊 Membaca data produksi dan upaya...")
-        
-        production_data = st.session_state.data_tables['production']
-        effort_data = st.session_state.data_tables['effort']
-        config = get_config()
-        gears = config['gears']
-        display_names = config['display_names']
-        
-        df_production = pd.DataFrame(production_data)
-        df_effort = pd.DataFrame(effort_data)
-        
-        if df_production.empty or df_effort.empty:
-            st.error("❌ Data produksi atau upaya kosong")
-            return None
-        
-        st.write("🧮 Menghitung CPUE...")
-        df_cpue = hitung_cpue(df_production, df_effort, gears)
-        
-        st.write("📈 Menghitung FPI...")
-        df_fpi = hitung_fpi_per_tahun(df_cpue, gears, config['standard_gear'])
-        
-        st.write("⚖️ Menghitung upaya standar...")
-        df_standard_effort = hitung_upaya_standar(df_effort, df_fpi, gears)
-        
-        st.write("📊 Menghitung CPUE standar...")
-        df_standard_cpue = hitung_cpue_standar(df_production, df_standard_effort, gears)
-        
-        st.write("🎯 Melakukan analisis MSY...")
-        standard_effort_total = df_standard_effort['Jumlah'].values
-        cpue_standard_total = df_standard_cpue['CPUE_Standar_Total'].values
-        production_total = df_production['Jumlah'].values
-        
-        msy_results = bandingkan_model_msy(
-            standard_effort_total, 
-            cpue_standard_total, 
-            production_total, 
-            st.session_state.selected_models,
-            st.session_state.r_value
-        )
-        
-        st.write("📋 Menganalisis status stok...")
-        years = df_production['Tahun'].values.tolist()
-        recommendations = analisis_status_stok(msy_results, production_total, standard_effort_total, years)
-        
-        results = {
-            'df_production': df_production,
-            'df_effort': df_effort,
-            'df_cpue': df_cpue,
-            'df_fpi': df_fpi,
-            'df_standard_effort': df_standard_effort,
-            'df_standard_cpue': df_standard_cpue,
-            'msy_results': msy_results,
-            'recommendations': recommendations,
-            'years': years,
-            'gears': gears,
-            'display_names': display_names
-        }
-        
-        st.session_state.analysis_results = results
-        status.update(label="✅ ANALISIS SELESAI!", state="complete")
-        
-        return results
+    parameter = parameter_analisis_sesi()
+    kualitas = periksa_kualitas_data(
+        pd.DataFrame(parameter['production_data']), pd.DataFrame(parameter['effort_data']), parameter['gears'],
+        kolom_waktu=parameter['kolom_waktu']
+    )
+    if len(kualitas):
+        st.toast(f"⚠️ Pemeriksaan kualitas: {len(kualitas)} temuan pada data (lihat bagian DATA DASAR)")
+    
+    job_id = kirim_job_analisis(parameter)
+    st.session_state.job_analisis = job_id
+    # Simpan id job di URL agar pemantauan berlanjut setelah halaman di-refresh
+    st.query_params['job'] = job_id
+    return job_id
 
 # ==============================================
 # TAMPILAN HASIL ANALISIS
 # ==============================================
+BAGIAN_HASIL_ANALISIS = [
+    "📈 DATA DASAR", "📊 GRAFIK CPUE", "🎣 CPUE & FPI", 
+    "⚖️ UPAYA STANDAR", "📈 CPUE STANDAR", "🎯 HASIL MSY", 
+    "📈 GRAFIK MSY", "💡 REKOMENDASI", "📤 EXCEL", "📄 PDF"
+]
+
 def render_hasil_analisis():
     """Tampilkan hasil analisis lengkap"""
     if st.session_state.analysis_results is None:
@@ -3342,78 +6172,126 @@ def render_hasil_analisis():
     
     st.header("📊 HASIL ANALISIS LENGKAP")
     
-    tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9, tab10 = st.tabs([
-        "📈 DATA DASAR", "📊 GRAFIK CPUE", "🎣 CPUE & FPI", 
-        "⚖️ UPAYA STANDAR", "📈 CPUE STANDAR", "🎯 HASIL MSY", 
-        "📈 GRAFIK MSY", "💡 REKOMENDASI", "📤 EXCEL", "📄 PDF"
-    ])
+    # Hanya bagian yang dipilih yang dieksekusi (st.tabs menjalankan semua isi tab setiap rerun)
+    bagian = st.radio(
+        "Bagian hasil analisis",
+        BAGIAN_HASIL_ANALISIS,
+        horizontal=True,
+        key="bagian_hasil_analisis",
+        label_visibility="collapsed"
+    )
     
-    with tab1:
+    if bagian == "📈 DATA DASAR":
+        if results.kualitas_data is not None:
+            render_kualitas_data(results.kualitas_data)
+        if results.imputasi is not None:
+            render_imputasi(results.imputasi)
+        satuan_upaya = results.konversi['satuan_upaya'] if results.konversi else 'trip'
+        if results.konversi and results.konversi['tahun_terkalibrasi']:
+            st.caption(f"📏 Upaya {len(results.konversi['tahun_terkalibrasi'])} tahun dikalibrasi "
+                       f"(tahun {min(results.konversi['tahun_terkalibrasi'])} dst.)")
+        
         st.subheader("📊 Data Produksi (kg)")
         st.dataframe(
-            results['df_production'].style.format({
-                col: "{:,.0f}" for col in results['df_production'].columns if col != 'Tahun'
+            results.df_production.style.format({
+                col: "{:,.0f}" for col in results.df_production.columns if col != 'Tahun'
             }), 
             use_container_width=True
         )
         
-        st.subheader("🎣 Data Upaya (trip)")
+        st.subheader(f"🎣 Data Upaya ({satuan_upaya})")
         st.dataframe(
-            results['df_effort'].style.format({
-                col: "{:,.0f}" for col in results['df_effort'].columns if col != 'Tahun'
+            results.df_effort.style.format({
+                col: "{:,.0f}" for col in results.df_effort.columns if col != 'Tahun'
             }), 
             use_container_width=True
         )
     
-    with tab2:
+    elif bagian == "📊 GRAFIK CPUE":
         # Tampilkan grafik CPUE
-        render_grafik_cpue(results['df_cpue'], results['df_effort'], 
-                          results['gears'], results['display_names'])
+        render_grafik_cpue(results.df_cpue, results.df_effort, 
+                          results.gears, results.display_names, tren_hasil(results))
     
-    with tab3:
+    elif bagian == "🎣 CPUE & FPI":
         st.subheader("📈 CPUE (kg/trip)")
         st.dataframe(
-            results['df_cpue'].style.format({
-                col: "{:.3f}" for col in results['df_cpue'].columns if col != 'Tahun'
+            results.df_cpue.style.format({
+                col: "{:.3f}" for col in results.df_cpue.columns if col != 'Tahun'
             }), 
             use_container_width=True
         )
         
         st.subheader("📊 Fishing Power Index (FPI)")
         st.dataframe(
-            results['df_fpi'].style.format({
-                col: "{:.3f}" for col in results['df_fpi'].columns if col != 'Tahun'
+            results.df_fpi.style.format({
+                col: "{:.3f}" for col in results.df_fpi.columns if col != 'Tahun'
             }), 
             use_container_width=True
         )
-    
-    with tab4:
+        
+        if results.periode:
+            kolom_waktu = results.periode['kolom_waktu']
+            st.subheader(f"🗓️ CPUE per {kolom_waktu}")
+            st.caption("Dihitung pada resolusi data asli; tabel di atas adalah total tahunan yang dipakai model MSY")
+            cpue_standar = pd.DataFrame(results.periode['cpue_standar'])
+            st.line_chart(cpue_standar.set_index(kolom_waktu)['CPUE_Standar_Total'])
+            with st.expander("📋 Tabel CPUE dan FPI per periode"):
+                for judul, kunci in (("CPUE", 'cpue'), ("FPI", 'fpi')):
+                    tabel_periode = pd.DataFrame(results.periode[kunci])
+                    st.write(f"**{judul}**")
+                    st.dataframe(tabel_periode.style.format({
+                        col: "{:.3f}" for col in tabel_periode.columns if col != kolom_waktu
+                    }), use_container_width=True, hide_index=True)
+    
+    elif bagian == "⚖️ UPAYA STANDAR":
         st.subheader("⚖️ Upaya Standar")
+        info_standar = results.info_standardisasi
+        if info_standar:
+            glm = 'n_record' in info_standar
+            if glm:
+                st.info(f"**Metode:** {METODE_STANDARDISASI[results.metode_standardisasi]} | "
+                        f"**Record:** {info_standar['n_record']:,} | **Faktor di-fit:** {' + '.join(info_standar['faktor'])} | "
+                        f"**Alat referensi:** {info_standar.get('referensi', {}).get('Alat', '-')}")
+                tidak_dipakai = info_standar.get('faktor_tidak_dipakai')
+                if tidak_dipakai:
+                    st.caption(f"Faktor tidak di-fit (tidak ada di data atau hanya satu level): {', '.join(tidak_dipakai)}")
+                for peringatan in info_standar.get('peringatan', []):
+                    st.warning(f"⚠️ {peringatan}")
+            else:
+                st.info(f"**Metode:** {METODE_STANDARDISASI[results.metode_standardisasi]} | "
+                        f"**Alat standar:** {info_standar['alat_standar']}")
+            st.write(f"**Daya tangkap relatif terhadap alat standar{' (GLM)' if glm else ''}:**")
+            st.dataframe(pd.DataFrame({
+                'Alat Tangkap': list(info_standar['daya_relatif']),
+                'Daya Relatif': list(info_standar['daya_relatif'].values())
+            }).style.format({'Daya Relatif': '{:.3f}'}), use_container_width=True)
+            if glm:
+                st.caption("Jumlah upaya standar = Produksi / indeks CPUE GLM, sehingga CPUE standar total = indeks GLM")
         st.dataframe(
-            results['df_standard_effort'].style.format({
-                col: "{:,.1f}" for col in results['df_standard_effort'].columns if col != 'Tahun'
+            results.df_standard_effort.style.format({
+                col: "{:,.1f}" for col in results.df_standard_effort.columns if col != 'Tahun'
             }), 
             use_container_width=True
         )
     
-    with tab5:
+    elif bagian == "📈 CPUE STANDAR":
         st.subheader("📊 CPUE Standar")
         st.dataframe(
-            results['df_standard_cpue'].style.format({
-                col: "{:.4f}" for col in results['df_standard_cpue'].columns if col != 'Tahun'
+            results.df_standard_cpue.style.format({
+                col: "{:.4f}" for col in results.df_standard_cpue.columns if col != 'Tahun'
             }), 
             use_container_width=True
         )
     
-    with tab6:
+    elif bagian == "🎯 HASIL MSY":
         st.subheader("🎯 HASIL ANALISIS MSY/JTB")
         st.info(f"**Parameter r yang digunakan:** {st.session_state.r_value:.3f} (sumber: FishBase)")
         
-        successful_models = {k: v for k, v in results['msy_results'].items() if v and v['success']}
+        successful_models = {k: v for k, v in results.msy_results.items() if v and v['success']}
         
         if not successful_models:
             st.error("❌ Tidak ada model yang berhasil dihitung")
-            for model_name, model_result in results['msy_results'].items():
+            for model_name, model_result in results.msy_results.items():
                 if model_result and not model_result['success']:
                     st.error(f"Model {model_name}: {model_result.get('error', 'Unknown error')}")
         else:
@@ -3449,24 +6327,70 @@ def render_hasil_analisis():
                         st.write(f"**P-value:** {model_results['p_value']:.6f}")
                         if 'q' in model_results:
                             st.write(f"**q (catchability):** {model_results['q']:.6f}")
-    
-    with tab7:
-        standard_effort_total = results['df_standard_effort']['Jumlah'].values
-        cpue_standard_total = results['df_standard_cpue']['CPUE_Standar_Total'].values
-        production_total = results['df_production']['Jumlah'].values
-        
-        render_grafik_msy_lengkap(standard_effort_total, cpue_standard_total, production_total, results['msy_results'])
-    
-    with tab8:
-        if 'recommendations' in results and results['recommendations']:
-            render_rekomendasi(results['recommendations'], results['df_production'].to_dict('records'), results['years'])
+            
+            schaefer = successful_models.get('Schaefer')
+            if schaefer and schaefer.get('diagnostik') is not None:
+                diagnostik = schaefer['diagnostik']
+                st.markdown(f"##### Diagnostik Regresi Schaefer: "
+                            f"{METODE_REGRESI[schaefer.get('metode_regresi', 'ols')]}")
+                berpengaruh = np.asarray(diagnostik['berpengaruh'])
+                if berpengaruh.any():
+                    tahun = np.asarray(results.years)
+                    st.warning(f"⚠️ Tahun berpengaruh/pencilan: {', '.join(map(str, tahun[berpengaruh]))}. "
+                               "Pertimbangkan regresi robust bila JTB sangat dipengaruhi tahun tersebut.")
+                    st.dataframe(pd.DataFrame({
+                        'Tahun': tahun,
+                        "Cook's D": diagnostik['cook'],
+                        'Bobot Robust': diagnostik['bobot'],
+                        'Berpengaruh': np.where(berpengaruh, '⚠️', '')
+                    }).style.format({"Cook's D": '{:.3f}', 'Bobot Robust': '{:.2f}'}, na_rep='—'),
+                        use_container_width=True, hide_index=True)
+                    st.caption(f"Ambang Cook's D = 4/n = {diagnostik['ambang_cook']:.3f}; "
+                               "bobot robust < 1 berarti tahun tersebut diturunkan bobotnya oleh penduga robust."
+                               + (" Tahun tanpa nilai tidak dipakai pada fit." if tahun_di_luar_fit(
+                                   {'Schaefer': schaefer}, results.years) else ""))
+                else:
+                    st.success("✅ Tidak ada tahun yang berpengaruh berlebihan terhadap garis CPUE-upaya")
+            
+            if results.hindcast and results.hindcast['model']:
+                st.markdown(f"##### Validasi Model: {METODE_VALIDASI[results.hindcast['skema']]}")
+                st.dataframe(pd.DataFrame([
+                    {
+                        'Model': model_name,
+                        'RMSE (kg)': nilai['rmse'],
+                        'MAE (kg)': nilai['mae'],
+                        'MAPE (%)': nilai['mape'],
+                        'Jumlah Tahun Uji': nilai['n_lipatan']
+                    }
+                    for model_name, nilai in results.hindcast['model'].items()
+                ]).style.format({'RMSE (kg)': '{:,.1f}', 'MAE (kg)': '{:,.1f}', 'MAPE (%)': '{:.1f}'}),
+                    use_container_width=True)
+                gagal = {nama: nilai.get('lipatan_gagal', 0) for nama, nilai in results.hindcast['model'].items()}
+                if any(gagal.values()):
+                    st.caption("Model dibandingkan hanya pada tahun uji yang berhasil diprediksi semua model; "
+                               + ", ".join(f"{nama} gagal pada {n} lipatan" for nama, n in gagal.items() if n) + ".")
+            if results.recommendations:
+                st.caption(f"Model terpilih: **{results.recommendations['best_model']}** — "
+                           f"{results.recommendations.get('dasar_pemilihan', 'R² in-sample tertinggi')}")
+    
+    elif bagian == "📈 GRAFIK MSY":
+        standard_effort_total = results.total('upaya_standar')
+        cpue_standard_total = results.total('cpue_standar')
+        production_total = results.total('produksi')
+        
+        render_grafik_msy_lengkap(standard_effort_total, cpue_standard_total, production_total, results.msy_results,
+                                  results.years)
+    
+    elif bagian == "💡 REKOMENDASI":
+        if results.recommendations:
+            render_rekomendasi(results.recommendations, results.df_production.to_dict('records'), results.years)
         else:
             st.warning("Rekomendasi belum tersedia")
     
-    with tab9:
+    elif bagian == "📤 EXCEL":
         render_ekspor_excel_section()
     
-    with tab10:
+    elif bagian == "📄 PDF":
         render_ekspor_pdf_section()
 
 # ==============================================
@@ -3517,10 +6441,9 @@ def main():
     col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
     
     with col1:
-        if st.button("🚀 LAKUKAN ANALISIS", type="primary", use_container_width=True):
-            results = lakukan_analisis()
-            if results:
-                st.success("✅ Analisis berhasil! Hasil siap dilihat di tab di bawah.")
+        if st.button("🚀 LAKUKAN ANALISIS", type="primary", use_container_width=True,
+                     disabled=st.session_state.job_analisis is not None):
+            lakukan_analisis()
     
     with col2:
         if st.session_state.analysis_results:
@@ -3540,6 +6463,9 @@ def main():
                 render_ekspor_pdf_section()
                 st.rerun()
     
+    if st.session_state.job_analisis:
+        pantau_job_analisis(st.session_state.job_analisis)
+    
     st.markdown("---")
     
     # Tampilkan data saat ini
@@ -3552,7 +6478,7 @@ def main():
         current_prod = pd.DataFrame(st.session_state.data_tables['production'])
         st.dataframe(
             current_prod.style.format({
-                col: "{:,.0f}" for col in current_prod.columns if col != 'Tahun'
+                col: "{:,.0f}" for col in current_prod.columns if col not in ('Tahun', KOLOM_PERIODE)
             }), 
             use_container_width=True,
             height=300
@@ -3563,7 +6489,7 @@ def main():
         current_eff = pd.DataFrame(st.session_state.data_tables['effort'])
         st.dataframe(
             current_eff.style.format({
-                col: "{:,.0f}" for col in current_eff.columns if col != 'Tahun'
+                col: "{:,.0f}" for col in current_eff.columns if col not in ('Tahun', KOLOM_PERIODE)
             }), 
             use_container_width=True,
             height=300
@@ -3614,4 +6540,8 @@ def main():
 # JALANKAN APLIKASI
 # ==============================================
 if __name__ == "__main__":
-    main()
+    if sys.argv[1:2] == ['--worker-job']:
+        jalankan_worker_job(sys.argv[2])
+    else:
+        with siklus_memori_sesi():
+            main()
@@ -0,0 +1,42 @@
+import copy
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Basis data dan direktori titipan sesi terpisah untuk pengujian; harus diset sebelum main diimpor
+DIR_UJI = tempfile.mkdtemp(prefix='kurisi_uji_')
+os.environ.setdefault('KURISI_DB_PATH', os.path.join(DIR_UJI, 'analisis_uji.db'))
+os.environ.setdefault('KURISI_DIR_TITIPAN', os.path.join(DIR_UJI, 'titipan'))
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import main  # noqa: E402
+
+PATH_MAIN = os.path.join(ROOT, 'main.py')
+
+
+@pytest.fixture
+def data_contoh():
+    """Data contoh PPN Karangantu (7 tahun, 4 alat tangkap) dengan kolom Jumlah"""
+    data = copy.deepcopy(main.DATA_CONTOH_TEMPLATE)
+    for tabel in data.values():
+        for baris in tabel:
+            baris['Jumlah'] = sum(nilai for kunci, nilai in baris.items() if kunci != 'Tahun')
+    return data
+
+
+@pytest.fixture
+def parameter_contoh(data_contoh):
+    """Argumen jalankan_pipeline_analisis untuk data contoh"""
+    return {
+        'production_data': data_contoh['production'],
+        'effort_data': data_contoh['effort'],
+        'gears': list(main.GEARS_CONTOH_TEMPLATE),
+        'display_names': [alat.replace('_', ' ') for alat in main.GEARS_CONTOH_TEMPLATE],
+        'standard_gear': 'Jaring_Hela_Dasar',
+        'selected_models': ['Schaefer', 'Fox'],
+        'r_value': 0.58
+    }
@@ -0,0 +1,100 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+import api
+
+
+@pytest.fixture(scope='module')
+def url():
+    server = api.buat_server(port=0, jumlah_worker=1, senyap=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def minta(url, path, body=None):
+    """Kirim GET (body None) atau POST JSON; kembalikan (kode HTTP, JSON respons)"""
+    data = None if body is None else (body if isinstance(body, bytes) else json.dumps(body).encode())
+    req = urllib.request.Request(url + path, data=data, headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req, timeout=120) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+@pytest.fixture
+def body_contoh(data_contoh):
+    return {'production': data_contoh['production'], 'effort': data_contoh['effort']}
+
+
+def test_health(url):
+    assert minta(url, '/health') == (200, {'status': 'ok'})
+    assert minta(url, '/tidak-ada')[0] == 404
+
+
+def test_analyze_dan_cache(url, body_contoh):
+    kode, hasil = minta(url, '/analyze', body_contoh)
+    assert kode == 200
+    assert hasil['tahun'] == list(range(2018, 2025))
+    assert hasil['status']['status_stok']
+    assert hasil['msy_results']['Schaefer']['success']
+    assert hasil['cache'] is False
+    
+    kode, ulang = minta(url, '/analyze', body_contoh)
+    assert kode == 200 and ulang['cache'] is True
+
+
+@pytest.mark.parametrize('ubah', [
+    {'r': 'abc'},
+    {'r': None},
+    {'r': 50},
+    {'production': [[1, 2]]},
+    {'production': {'Tahun': 2018}},
+    {'gears': 'abc'},
+    {'gears': ['Tahun']},
+    {'standard_gear': 'Tidak_Ada'},
+    {'models': 'Schaefer'},
+    {'metode_regresi': ['ols']},
+    {'kolom_waktu': 5},
+    {'daya_tangkap': {'Pancing': 'besar'}},
+    {'konversi': {'satuan_produksi': ['kg']}},
+    {'konversi': {'kalibrasi_cpue': 0}},
+    {'konversi': {'satuan_produksi': 'ekor', 'faktor_konversi_kg_ton': -0.5}},
+    {'display_names': ['A']},
+])
+def test_analyze_payload_tidak_valid(url, body_contoh, ubah):
+    kode, hasil = minta(url, '/analyze', {**body_contoh, **ubah})
+    assert kode == 400
+    assert hasil['error']
+
+
+def test_analyze_body_bukan_json(url):
+    assert minta(url, '/analyze', b'{bukan json')[0] == 400
+
+
+def test_kesalahan_internal_dijawab_json(url, body_contoh, monkeypatch):
+    def gagal(payload):
+        raise RuntimeError("gagal tak terduga")
+    monkeypatch.setattr(api, 'siapkan_parameter', gagal)
+    kode, hasil = minta(url, '/analyze', body_contoh)
+    assert kode == 500
+    assert 'gagal tak terduga' in hasil['error']
+
+
+def test_status_massal(url):
+    kode, hasil = minta(url, '/status', {
+        'id': ['A', 'B'], 'msy': [1000, 1000], 'f_msy': [100, 100],
+        'produksi': [500, 1200], 'upaya': [50, 150]
+    })
+    assert kode == 200
+    assert [baris['id'] for baris in hasil['hasil']] == ['A', 'B']
+    assert sum(hasil['ringkasan'].values()) == 2
+    
+    assert minta(url, '/status', {'msy': [1], 'f_msy': [1], 'produksi': [1, 2], 'upaya': [1]})[0] == 400
+    assert minta(url, '/status', {'msy': ['x'], 'f_msy': [1], 'produksi': [1], 'upaya': [1]})[0] == 400
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import main
+
+nan = np.nan
+
+
+def test_interpolasi_linear_dan_ujung_deret():
+    nilai = [[10.0, 1.0], [nan, 2.0], [nan, 3.0], [40.0, nan]]
+    terisi, label = main.imputasi_matriks(nilai, [2000, 2001, 2003, 2004], 'interpolasi')
+    # 2001 dan 2003 di antara 2000 (10) dan 2004 (40), jarak tahun tidak seragam; ujung diisi nilai terdekat
+    np.testing.assert_allclose(terisi, [[10, 1], [17.5, 2], [32.5, 3], [40, 3]])
+    assert label[1, 0] == label[2, 0] == label[3, 1] == 'interpolasi'
+    assert label[0, 0] is None
+
+
+def test_interpolasi_tidak_melintasi_grup():
+    nilai = [[10.0], [nan], [30.0], [100.0], [nan]]
+    terisi, _ = main.imputasi_matriks(nilai, [2000, 2001, 2002, 2000, 2001], 'interpolasi', grup=list('AAABB'))
+    np.testing.assert_allclose(terisi[:, 0], [10, 20, 30, 100, 100])
+
+
+def test_rasio_alat():
+    # Alat A selalu setengah jumlah alat lain pada tahun teramati
+    nilai = [[5.0, 4.0, 6.0], [10.0, 8.0, 12.0], [nan, 3.0, 9.0]]
+    terisi, label = main.imputasi_matriks(nilai, [2000, 2001, 2002], 'rasio_alat')
+    assert terisi[2, 0] == pytest.approx(6.0)
+    assert label[2, 0] == 'rasio_alat'
+
+
+def test_rasio_alat_jatuh_ke_interpolasi_lalu_nol():
+    # 2001: tidak ada alat lain teramati → interpolasi; alat C tidak pernah teramati → nol
+    nilai = [[10.0, 2.0, nan], [nan, nan, nan], [30.0, 6.0, nan]]
+    terisi, label = main.imputasi_matriks(nilai, [2000, 2001, 2002], 'rasio_alat')
+    np.testing.assert_allclose(terisi[1, :2], [20.0, 4.0])
+    assert list(label[1, :2]) == ['interpolasi', 'interpolasi']
+    assert list(terisi[:, 2]) == [0, 0, 0] and list(label[:, 2]) == ['nol'] * 3
+
+
+def test_model_multiplikatif_tepat():
+    efek_tahun = np.array([[1.0], [1.5], [0.5], [2.0]])
+    efek_alat = np.array([[0.0, 0.7, -0.3]])
+    benar = np.expm1(efek_tahun + efek_alat)
+    nilai = benar.copy()
+    nilai[2, 1] = nan
+    terisi, label = main.imputasi_matriks(nilai, [2000, 2001, 2002, 2003], 'model')
+    assert terisi[2, 1] == pytest.approx(benar[2, 1], rel=1e-4)
+    assert label[2, 1] == 'model'
+
+
+def test_imputasi_data_menghitung_ulang_jumlah_dan_menandai_sel():
+    produksi = pd.DataFrame({'Tahun': [2002, 2000, 2001], 'A': [30.0, 10.0, nan], 'B': [3.0, 1.0, 2.0]})
+    upaya = pd.DataFrame({'Tahun': [2000, 2001, 2002], 'A': [1.0, 1.0, 1.0], 'B': [1.0, 1.0, 1.0]})
+    df_prod, df_upaya, sel = main.imputasi_data(produksi, upaya, ['A', 'B'])
+    
+    assert df_prod['Tahun'].tolist() == [2000, 2001, 2002]
+    assert df_prod['Jumlah'].tolist() == [11.0, 22.0, 33.0]
+    assert df_upaya['Jumlah'].tolist() == [2.0, 2.0, 2.0]
+    assert sel.to_dict('records') == [
+        {'Tabel': 'Produksi', 'Tahun': 2001, 'Alat': 'A', 'Metode': 'interpolasi', 'Nilai': 20.0}
+    ]
+
+
+def test_editor_manual_mempertahankan_sel_kosong():
+    rows = [{'Tahun': 2020, 'A': 10.0, 'B': nan, 'Jumlah': 10.0}, {'Tahun': 2021, 'A': 12.0, 'B': 3.0, 'Jumlah': 15.0}]
+    tabel = main.tabel_input_manual(rows, [2020, 2021, 2022], ['A', 'B'])
+    # Sel kosong dari upload dan tahun baru tetap kosong, bukan 0
+    assert np.isnan(tabel.loc[2020, 'B']) and tabel.loc[2022].isna().all()
+    
+    baris = main.baris_dari_tabel_input(tabel, ['A', 'B'])
+    assert np.isnan(baris[0]['B']) and baris[0]['Jumlah'] == 10.0
+    assert baris[1] == {'Tahun': 2021, 'A': 12.0, 'B': 3.0, 'Jumlah': 15.0}
+    
+    # Disimpan lalu dianalisis: sel kosong diisi tahap imputasi dan ditandai
+    _, _, sel = main.imputasi_data(pd.DataFrame(baris[:2]), pd.DataFrame(baris[:2]), ['A', 'B'])
+    assert sel[['Tabel', 'Tahun', 'Alat']].to_dict('records') == [
+        {'Tabel': 'Produksi', 'Tahun': 2020, 'Alat': 'B'}, {'Tabel': 'Upaya', 'Tahun': 2020, 'Alat': 'B'}
+    ]
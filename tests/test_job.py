@@ -0,0 +1,99 @@
+import os
+import subprocess
+import sys
+import time
+
+import pandas as pd
+import pytest
+
+import main
+
+POPEN_ASLI = subprocess.Popen
+
+
+class ProsesPalsu:
+    """Pengganti Popen: worker 'hidup' sampai dimatikan oleh test"""
+    dibuat = []
+    
+    def __init__(self, *args, **kwargs):
+        self.hidup = True
+        ProsesPalsu.dibuat.append(self)
+    
+    def poll(self):
+        return None if self.hidup else 0
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    ProsesPalsu.dibuat = []
+    monkeypatch.setattr(main.subprocess, 'Popen', ProsesPalsu)
+    pengelola = {'lock': main.threading.Lock(), 'proses': []}
+    monkeypatch.setattr(main, 'proses_worker_job', lambda: pengelola)
+    return str(tmp_path / 'job.db')
+
+
+def pid_mati():
+    """PID proses yang sudah selesai dan dipanen"""
+    proses = POPEN_ASLI([sys.executable, '-c', 'pass'])
+    proses.wait()
+    return proses.pid
+
+
+def atur_job(path, job_id, **kolom):
+    with main.closing(main.buka_database(path)) as conn, conn:
+        conn.execute(
+            f"UPDATE job_analisis SET {', '.join(f'{k} = ?' for k in kolom)} WHERE id = ?",
+            (*kolom.values(), job_id)
+        )
+
+
+def test_jumlah_worker_dibatasi_handle_hidup(db):
+    # Lonjakan kiriman sebelum worker mana pun mengklaim job: jumlah worker tetap dibatasi
+    for i in range(5):
+        main.kirim_job_analisis({'data': i}, path=db)
+    assert len(ProsesPalsu.dibuat) == main.MAKS_WORKER_JOB
+    
+    # Worker yang keluar dipanen; job yang masih antri mendapat worker baru saat dipantau
+    ProsesPalsu.dibuat[0].hidup = False
+    job_id = main.kirim_job_analisis({'data': 0}, path=db)
+    assert main.status_job_analisis(job_id, path=db)['status'] == 'antri'
+    assert len(main.worker_job_hidup()) == main.MAKS_WORKER_JOB
+
+
+def test_kiriman_identik_tidak_menempel_pada_job_yang_worker_mati(db):
+    job_id = main.kirim_job_analisis({'data': 1}, path=db)
+    atur_job(db, job_id, status='berjalan', pid=pid_mati())
+    
+    job_baru = main.kirim_job_analisis({'data': 1}, path=db)
+    assert job_baru != job_id
+    job_lama = main.status_job_analisis(job_id, path=db)
+    assert job_lama['status'] == 'gagal' and job_lama['error']
+
+
+def test_job_tanpa_detak_dianggap_mati(db):
+    job_id = main.kirim_job_analisis({'data': 2}, path=db)
+    lampau = (pd.Timestamp.now() - pd.Timedelta(seconds=main.BATAS_DETAK_JOB_DETIK + 5)).isoformat(timespec='seconds')
+    # PID hidup (proses test ini) tetapi detak terakhir sudah lewat batas
+    atur_job(db, job_id, status='berjalan', pid=os.getpid(), diperbarui=lampau)
+    assert main.status_job_analisis(job_id, path=db)['status'] == 'gagal'
+
+
+def test_job_berjalan_dengan_detak_tidak_diganggu(db):
+    job_id = main.kirim_job_analisis({'data': 3}, path=db)
+    atur_job(db, job_id, status='berjalan', pid=os.getpid(), diperbarui=main._waktu_sekarang())
+    assert main.kirim_job_analisis({'data': 3}, path=db) == job_id
+    assert main.status_job_analisis(job_id, path=db)['status'] == 'berjalan'
+
+
+def test_worker_menyelesaikan_job(tmp_path, parameter_contoh):
+    path = str(tmp_path / 'worker.db')
+    with main.closing(main.buka_database(path)) as conn, conn:
+        conn.execute(
+            "INSERT INTO job_analisis (id, status, dibuat, diperbarui, parameter_blob, kunci) "
+            "VALUES ('a', 'antri', ?, ?, ?, 'a')",
+            (main._waktu_sekarang(), main._waktu_sekarang(), main.kemas_blob(parameter_contoh))
+        )
+    main.jalankan_worker_job(path)
+    job = main.status_job_analisis('a', path=path)
+    assert job['status'] == 'selesai' and job['progres'] == 1
+    assert main.hasil_job_analisis('a', path=path).recommendations is not None
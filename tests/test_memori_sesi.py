@@ -0,0 +1,104 @@
+import gc
+import os
+import time
+
+import pytest
+
+import main
+
+
+class StateSesi(dict):
+    """Pengganti SessionState (dict yang bisa di-weakref)"""
+
+
+@pytest.fixture
+def registri(monkeypatch, tmp_path):
+    registri = {'lock': main.threading.Lock(), 'sesi': {}, 'sapu_terakhir': time.time()}
+    monkeypatch.setattr(main, 'registri_sesi', lambda: registri)
+    monkeypatch.setattr(main, 'DIR_TITIPAN', str(tmp_path))
+    return registri
+
+
+@pytest.fixture
+def jalankan_sebagai(monkeypatch):
+    """Jadikan (session_id, state) sebagai run aktif untuk kelola/simpan_memori_sesi"""
+    aktif = [None, None]
+    monkeypatch.setattr(main, '_state_sesi_aktif', lambda: tuple(aktif))
+    
+    def atur(session_id, state):
+        aktif[:] = [session_id, state]
+    return atur
+
+
+def test_objek_besar_disimpan_di_registri_di_antara_run(registri, jalankan_sebagai):
+    state = StateSesi(data_tables={'production': [1, 2, 3]}, lain='tetap')
+    jalankan_sebagai('A', state)
+    
+    main.kelola_memori_sesi()
+    assert registri['sesi']['A']['berjalan']
+    main.simpan_memori_sesi()
+    
+    assert 'data_tables' not in state and state['lain'] == 'tetap'
+    assert registri['sesi']['A']['simpanan'] == {'data_tables': {'production': [1, 2, 3]}}
+    assert not registri['sesi']['A']['berjalan']
+    
+    main.kelola_memori_sesi()
+    assert state['data_tables'] == {'production': [1, 2, 3]}
+    assert registri['sesi']['A']['simpanan'] == {}
+
+
+def test_sapu_hanya_menyentuh_simpanan_sesi_idle(registri, jalankan_sebagai):
+    state_a = StateSesi(data_tables={'production': list(range(100))}, cache_hasil={'grafik': b'png'})
+    jalankan_sebagai('A', state_a)
+    main.kelola_memori_sesi()
+    main.simpan_memori_sesi()
+    registri['sesi']['A']['aktif'] -= main.BATAS_IDLE_SESI_DETIK + 1
+    
+    # Sesi B memulai run dan memicu sapuan; state A tidak boleh diubah dari thread B
+    state_b = StateSesi(data_tables={'production': [0]})
+    jalankan_sebagai('B', state_b)
+    registri['sapu_terakhir'] = 0.0
+    main.kelola_memori_sesi()
+    
+    simpanan_a = registri['sesi']['A']['simpanan']
+    assert 'cache_hasil' not in simpanan_a
+    assert main._adalah_titipan(simpanan_a['data_tables'])
+    assert os.path.exists(simpanan_a['data_tables'][main.PENANDA_TITIPAN])
+    assert dict(state_a) == {}
+    
+    # Sesi yang sedang berjalan dilewati meskipun sudah lama aktif
+    registri['sesi']['B']['aktif'] -= main.BATAS_IDLE_SESI_DETIK + 1
+    main.sapu_memori_sesi(registri)
+    assert state_b['data_tables'] == {'production': [0]}
+    
+    # Run berikutnya sesi A memuat kembali dari disk dan menghapus berkasnya
+    path = simpanan_a['data_tables'][main.PENANDA_TITIPAN]
+    jalankan_sebagai('A', state_a)
+    main.kelola_memori_sesi()
+    assert state_a['data_tables'] == {'production': list(range(100))}
+    assert not os.path.exists(path)
+
+
+def test_nilai_baru_di_luar_run_penuh_tidak_ditimpa_simpanan(registri, jalankan_sebagai):
+    state = StateSesi(analysis_results='lama')
+    jalankan_sebagai('A', state)
+    main.kelola_memori_sesi()
+    main.simpan_memori_sesi()
+    
+    # Mis. fragment pemantau job menulis hasil baru sebelum run penuh berikutnya
+    state['analysis_results'] = 'baru'
+    main.kelola_memori_sesi()
+    assert state['analysis_results'] == 'baru'
+
+
+def test_sesi_tertutup_dibersihkan(registri, jalankan_sebagai):
+    state = StateSesi(data_tables={'production': [1]})
+    jalankan_sebagai('A', state)
+    main.kelola_memori_sesi()
+    main.simpan_memori_sesi()
+    
+    jalankan_sebagai(None, None)
+    del state
+    gc.collect()
+    main.sapu_memori_sesi(registri)
+    assert 'A' not in registri['sesi']
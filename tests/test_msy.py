@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+import main
+
+
+def data_schaefer(noise=None):
+    """Upaya, CPUE dan produksi dari garis CPUE = 10 - 0,1 F (opsional ditambah noise pada CPUE)"""
+    effort = np.array([10.0, 20.0, 30.0, 40.0, 50.0, 60.0, 70.0])
+    cpue = 10.0 - 0.1 * effort
+    if noise is not None:
+        cpue = cpue + np.asarray(noise)
+    return effort, cpue, effort * cpue
+
+
+def test_lipatan_validasi():
+    bobot, uji = main.lipatan_validasi(5, 'loyo')
+    np.testing.assert_array_equal(bobot, 1 - np.eye(5))
+    np.testing.assert_array_equal(uji, np.arange(5))
+    
+    bobot, uji = main.lipatan_validasi(8, 'rolling')
+    np.testing.assert_array_equal(uji, [4, 5, 6, 7])
+    np.testing.assert_array_equal(bobot.sum(axis=1), [4, 5, 6, 7])
+    assert not bobot[0, 4:].any()
+
+
+def test_schaefer_msy_garis_tepat():
+    effort, cpue, production = data_schaefer()
+    hasil = main.analisis_msy_schaefer(effort, cpue, production, 0.5)
+    assert hasil['success']
+    assert hasil['a'] == pytest.approx(10.0)
+    assert hasil['b'] == pytest.approx(-0.1)
+    # F_MSY = -a/(2b) = 50, C_MSY = -a²/(4b) = 250
+    assert hasil['F_MSY'] == pytest.approx(50.0)
+    assert hasil['C_MSY'] == pytest.approx(250.0)
+    np.testing.assert_allclose(hasil['kurva']['residual_produksi'], 0, atol=1e-9)
+
+
+def test_hindcast_schaefer_tepat_tanpa_galat():
+    effort, cpue, production = data_schaefer()
+    msy_results = main.bandingkan_model_msy(effort, cpue, production, ['Schaefer'], 0.5)
+    hasil = main.hindcast_model_msy(effort, cpue, production, msy_results, 'loyo')
+    assert hasil['n_lipatan'] == len(effort)
+    assert hasil['model']['Schaefer']['rmse'] == pytest.approx(0, abs=1e-8)
+    assert hasil['model_terbaik'] == 'Schaefer'
+
+
+def test_hindcast_membandingkan_model_pada_lipatan_bersama(monkeypatch):
+    effort, cpue, production = data_schaefer(noise=[0.3, -0.2, 0.1, -0.4, 0.2, 0.1, -0.1])
+    msy_results = main.bandingkan_model_msy(effort, cpue, production, ['Schaefer', 'Fox'], 0.5)
+    assert msy_results['Fox']['success']
+    
+    # Fit Fox gagal pada lipatan pertama: lipatan itu tidak boleh ikut menilai Schaefer
+    asli = main.prediksi_fox_lipatan
+    def fox_gagal_satu(*args):
+        prediksi = asli(*args)
+        prediksi[0] = np.nan
+        return prediksi
+    monkeypatch.setattr(main, 'prediksi_fox_lipatan', fox_gagal_satu)
+    hasil = main.hindcast_model_msy(effort, cpue, production, msy_results, 'loyo')
+    
+    n = len(effort)
+    assert hasil['n_lipatan'] == n - 1
+    assert hasil['lipatan_bersama'] == [False] + [True] * (n - 1)
+    assert {nilai['n_lipatan'] for nilai in hasil['model'].values()} == {n - 1}
+    assert hasil['model']['Fox']['lipatan_gagal'] == 1
+    
+    bobot, uji = main.lipatan_validasi(n, 'loyo')
+    galat = main.prediksi_schaefer_lipatan(effort, cpue, bobot, uji)[1:] - production[1:]
+    assert hasil['model']['Schaefer']['rmse'] == pytest.approx(np.sqrt(np.mean(galat ** 2)))
+
+
+def garis_dengan_pencilan():
+    """Garis CPUE = 10 - 0,1 F pada 12 titik, dengan satu tahun anomali (+6) di upaya tertinggi"""
+    effort = np.arange(10.0, 130.0, 10.0)
+    cpue = 10.0 - 0.1 * effort + np.tile([0.02, -0.02], 6)
+    cpue[-1] += 6.0
+    return effort, cpue
+
+
+@pytest.mark.parametrize('metode', ['theil_sen', 'huber', 'ransac'])
+def test_regresi_robust_mengabaikan_pencilan(metode):
+    effort, cpue = garis_dengan_pencilan()
+    a, b, bobot = main.regresi_garis(effort, cpue, metode)
+    assert a == pytest.approx(10.0, abs=0.05)
+    assert b == pytest.approx(-0.1, abs=1e-3)
+    assert bobot[-1] < 0.5
+    assert np.all(bobot[:-1] > 0.5)
+    
+    # OLS tertarik pencilan berpengaruh; Schaefer robust tetap mendekati MSY garis asli (a²/4|b| = 250)
+    assert main.regresi_garis(effort, cpue, 'ols')[1] > -0.08
+    hasil = main.analisis_msy_schaefer(effort, cpue, effort * cpue, 0.5, metode_regresi=metode)
+    assert hasil['C_MSY'] == pytest.approx(250.0, rel=0.02)
+
+
+def test_cook_distance_sama_dengan_definisi_leave_one_out():
+    effort, cpue = garis_dengan_pencilan()
+    n = len(effort)
+    b, a = np.polyfit(effort, cpue, 1)
+    s2 = np.sum((cpue - (a + b * effort)) ** 2) / (n - 2)
+    # D_i = Σ_j (ŷ_j - ŷ_j(i))² / (p · s²), p = 2 parameter
+    harapan = []
+    for i in range(n):
+        tanpa = np.arange(n) != i
+        b_i, a_i = np.polyfit(effort[tanpa], cpue[tanpa], 1)
+        harapan.append(np.sum(((a + b * effort) - (a_i + b_i * effort)) ** 2) / (2 * s2))
+    
+    diagnostik = main.diagnostik_pengaruh(effort, cpue, np.ones(n))
+    assert diagnostik['cook'] == pytest.approx(harapan)
+    assert diagnostik['ambang_cook'] == pytest.approx(4 / n)
+    assert np.flatnonzero(diagnostik['berpengaruh']).tolist() == [n - 1]
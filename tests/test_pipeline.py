@@ -0,0 +1,154 @@
+import io
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import main
+from conftest import PATH_MAIN
+
+
+@pytest.fixture
+def parameter_kecualikan(parameter_contoh):
+    """Data contoh dengan satu sel kosong di 2020 (produksi) dan 2021 (upaya), tahun berimputasi dikecualikan"""
+    parameter_contoh['production_data'][2]['Pancing'] = np.nan
+    parameter_contoh['effort_data'][3]['Bagan_Berperahu'] = np.nan
+    return dict(parameter_contoh, perlakuan_imputasi='kecualikan')
+
+
+def test_pipeline_kecualikan_menyimpan_tahun_fit(parameter_kecualikan):
+    hasil = main.jalankan_pipeline_analisis(**parameter_kecualikan)
+    
+    assert hasil.imputasi['tahun_dikecualikan'] == [2020, 2021]
+    tahun_fit = [2018, 2019, 2022, 2023, 2024]
+    for model_name in ('Schaefer', 'Fox'):
+        model_results = hasil.msy_results[model_name]
+        assert model_results['success']
+        assert model_results['tahun_fit'] == tahun_fit
+        residual = model_results['kurva']['residual_produksi']
+        assert len(residual) == len(hasil.years)
+        assert np.isnan(residual[2:4]).all() and np.isfinite(residual[[0, 1, 4, 5, 6]]).all()
+    
+    diagnostik = hasil.msy_results['Schaefer']['diagnostik']
+    assert len(diagnostik['cook']) == len(diagnostik['berpengaruh']) == len(hasil.years)
+    assert not diagnostik['berpengaruh'][2:4].any()
+    # Indeks uji hindcast menunjuk ke tahun data penuh, tidak pernah ke tahun yang dikecualikan
+    assert set(hasil.hindcast['indeks_uji']) == {0, 1, 4, 5, 6}
+
+
+def test_tabel_residual_dan_pdf_kecualikan(parameter_kecualikan):
+    hasil = main.jalankan_pipeline_analisis(**parameter_kecualikan)
+    models = {k: v for k, v in hasil.msy_results.items() if v and v['success']}
+    
+    residual = main.tabel_residual_model(models, hasil.years, hasil.total('upaya_standar'), hasil.total('produksi'))
+    assert list(residual['Tahun']) == hasil.years
+    assert residual.loc[residual['Tahun'].isin([2020, 2021]), 'Residual Schaefer'].isna().all()
+    assert main.tahun_di_luar_fit(models, hasil.years) == [2020, 2021]
+    
+    assert main.generate_pdf_report(hasil, 0.58) is not None
+
+
+def tunggu_hasil(at, batas_detik=60):
+    """Jalankan ulang skrip sampai job analisis latar belakang selesai dan bagian hasil tampil"""
+    batas = time.time() + batas_detik
+    while not any(r.key == 'bagian_hasil_analisis' for r in at.radio) and time.time() < batas:
+        time.sleep(0.5)
+        at.run()
+    assert any(r.key == 'bagian_hasil_analisis' for r in at.radio)
+
+
+def test_render_msy_excel_pdf_kecualikan(parameter_kecualikan):
+    at = AppTest.from_file(PATH_MAIN, default_timeout=120)
+    at.run()
+    # Objek besar sesi disimpan di registri di antara run, jadi data diganti utuh, bukan dibaca dari state
+    at.session_state.data_tables = {
+        'production': parameter_kecualikan['production_data'],
+        'effort': parameter_kecualikan['effort_data']
+    }
+    at.session_state.perlakuan_imputasi = 'kecualikan'
+    at.run()
+    next(b for b in at.button if 'LAKUKAN ANALISIS' in b.label).click().run()
+    tunggu_hasil(at)
+    assert any('Kecualikan tahun berimputasi' in info.value for info in at.info)
+    
+    for bagian in ("🎯 HASIL MSY", "📈 GRAFIK MSY", "📤 EXCEL", "📄 PDF"):
+        at.radio(key='bagian_hasil_analisis').set_value(bagian).run()
+        assert not at.exception, (bagian, at.exception)
+        assert not at.error, (bagian, [e.value for e in at.error])
+    
+    next(b for b in at.button if 'Buat Laporan PDF' in b.label).click().run()
+    assert not at.exception
+    assert not at.error, [e.value for e in at.error]
+
+
+def test_agregasi_tahunan_menjumlahkan_periode():
+    df = pd.DataFrame({
+        'Periode': ['2020Q1', '2020Q2', '2020Q3', '2020Q4', '2021Q1', '2021Q2'],
+        'A': [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+        'B': [np.nan, np.nan, np.nan, np.nan, 1.0, np.nan]
+    })
+    df['Jumlah'] = df[['A', 'B']].sum(axis=1)
+    tahunan = main.agregasi_tahunan(df, ['A', 'B'], 'Periode')
+    assert tahunan['Tahun'].tolist() == [2020, 2021]
+    assert tahunan['A'].tolist() == [10.0, 11.0]
+    # Tahun tanpa satu pun nilai teramati tetap kosong, bukan 0
+    assert np.isnan(tahunan['B'][0]) and tahunan['B'][1] == 1.0
+    assert tahunan['Jumlah'].tolist() == [10.0, 12.0]
+
+
+def bagi_bulanan(tabel):
+    """Pecah tabel tahunan menjadi 12 periode bulanan bernilai sama (jumlahnya kembali ke nilai tahunan)"""
+    hasil = []
+    for baris in tabel:
+        for bulan in range(1, 13):
+            hasil.append({
+                'Periode': f"{baris['Tahun']}-{bulan:02d}",
+                **{kunci: nilai / 12 for kunci, nilai in baris.items() if kunci != 'Tahun'}
+            })
+    return hasil
+
+
+@pytest.mark.parametrize('metode', ['fpi', 'fpi_alat_standar'])
+def test_pipeline_bulanan_setara_tahunan(parameter_contoh, metode):
+    tahunan = main.jalankan_pipeline_analisis(**parameter_contoh, metode_standardisasi=metode)
+    bulanan = main.jalankan_pipeline_analisis(**dict(
+        parameter_contoh,
+        production_data=bagi_bulanan(parameter_contoh['production_data']),
+        effort_data=bagi_bulanan(parameter_contoh['effort_data']),
+        kolom_waktu='Periode'
+    ), metode_standardisasi=metode)
+    
+    assert list(bulanan.years) == list(tahunan.years)
+    assert len(bulanan.periode['cpue']) == 12 * len(tahunan.years)
+    np.testing.assert_allclose(
+        bulanan.df_standard_effort['Jumlah'], tahunan.df_standard_effort['Jumlah'], rtol=1e-9
+    )
+    for model_name in ('Schaefer', 'Fox'):
+        assert bulanan.msy_results[model_name]['C_MSY'] == pytest.approx(
+            tahunan.msy_results[model_name]['C_MSY'], rel=1e-9
+        )
+
+
+@pytest.mark.parametrize('konversi', [
+    {'kalibrasi_cpue': 0.0, 'tahun_dasar_kalibrasi': 2018},
+    {'satuan_produksi': 'ekor', 'faktor_konversi_kg_ton': -0.5}
+])
+def test_seragamkan_satuan_menolak_faktor_tidak_positif(parameter_contoh, konversi):
+    produksi = pd.DataFrame(parameter_contoh['production_data'])
+    upaya = pd.DataFrame(parameter_contoh['effort_data'])
+    with pytest.raises(ValueError):
+        main.seragamkan_satuan(produksi, upaya, parameter_contoh['gears'], {**main.KONVERSI_BAKU, **konversi})
+
+
+def test_sampul_pdf_memakai_varian_gambar_pdf(parameter_contoh, monkeypatch):
+    monkeypatch.chdir(os.path.dirname(PATH_MAIN))
+    main.load_kurisi_image.clear()
+    varian = main.load_kurisi_image()['varian']
+    assert set(varian) == set(main.UKURAN_VARIAN_GAMBAR)
+    assert main.PILImage.open(io.BytesIO(varian['pdf'])).width <= main.UKURAN_VARIAN_GAMBAR['pdf']
+    
+    pdf = main.generate_pdf_report(main.jalankan_pipeline_analisis(**parameter_contoh), 0.58)
+    assert b'/Subtype /Image' in pdf.getvalue()
@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import main
+
+TAHUN = np.arange(2015, 2021)
+INDEKS = np.array([4.0, 3.5, 3.0, 2.8, 2.0, 1.5])
+DAYA = {'A': 1.0, 'B': 2.5, 'C': 0.4}
+
+
+def tabel_multiplikatif(waktu, indeks, daya):
+    """Tabel produksi dan upaya periode × alat dengan CPUE = indeks periode × daya alat tepat"""
+    upaya = pd.DataFrame({'Tahun': waktu})
+    produksi = pd.DataFrame({'Tahun': waktu})
+    for i, (alat, q) in enumerate(daya.items()):
+        upaya[alat] = 100.0 + 10 * i + np.arange(len(waktu))
+        produksi[alat] = upaya[alat] * indeks * q
+    produksi['Jumlah'] = produksi[list(daya)].sum(axis=1)
+    upaya['Jumlah'] = upaya[list(daya)].sum(axis=1)
+    return produksi, upaya
+
+
+@pytest.mark.parametrize('distribusi', ['lognormal', 'tweedie'])
+def test_glm_memulihkan_indeks_tahun_dan_daya_alat(distribusi):
+    produksi, upaya = tabel_multiplikatif(TAHUN, INDEKS, DAYA)
+    record = main.tabel_ke_record(produksi, upaya, list(DAYA))
+    glm = main.standardisasi_cpue_glm(record, distribusi=distribusi, referensi={'Alat': 'A'})
+    
+    toleransi = 1e-8 if distribusi == 'lognormal' else 1e-4
+    assert glm['indeks_tahun']['CPUE_Standar'].to_numpy() == pytest.approx(INDEKS, rel=toleransi)
+    assert glm['daya_relatif'] == pytest.approx(DAYA, rel=toleransi)
+    # Data tahunan: hanya Tahun + Alat yang di-fit, dan itu tercatat
+    assert glm['faktor'] == ['Tahun', 'Alat']
+    assert glm['faktor_tidak_dipakai'] == ['Bulan']
+
+
+def test_glm_bulanan_memakai_faktor_bulan():
+    waktu = pd.period_range('2019-01', periods=24, freq='M').astype(str)
+    musim = np.tile([1.0, 1.5, 2.0, 1.5, 1.0, 0.5, 0.5, 1.0, 1.2, 1.0, 0.8, 1.0], 2)
+    indeks = np.repeat([3.0, 2.0], 12)
+    produksi, upaya = tabel_multiplikatif(waktu, indeks * musim, DAYA)
+    record = main.tabel_ke_record(produksi, upaya, list(DAYA), kolom_waktu='Tahun')
+    assert 'Bulan' not in record  # kolom waktu bernama Tahun: tidak dipecah
+    
+    produksi, upaya = produksi.rename(columns={'Tahun': 'Periode'}), upaya.rename(columns={'Tahun': 'Periode'})
+    record = main.tabel_ke_record(produksi, upaya, list(DAYA), kolom_waktu='Periode')
+    glm = main.standardisasi_cpue_glm(record, referensi={'Alat': 'A'})
+    
+    assert glm['faktor'] == ['Tahun', 'Alat', 'Bulan']
+    assert glm['faktor_tidak_dipakai'] == []
+    # Indeks pada level referensi Bulan (Januari, efek musim 1)
+    assert glm['indeks_tahun']['CPUE_Standar'].to_numpy() == pytest.approx([3.0, 2.0])
+    assert np.exp(glm['efek']['Bulan'][3]) == pytest.approx(2.0)
+
+
+def test_standardisasi_upaya_glm_cpue_total_sama_dengan_indeks():
+    produksi, upaya = tabel_multiplikatif(TAHUN, INDEKS, DAYA)
+    cpue = main.hitung_cpue(produksi, upaya, list(DAYA))
+    _, df_upaya_std, df_cpue_std, info = main.standardisasi_upaya(
+        produksi, upaya, cpue, list(DAYA), 'A', metode='glm_lognormal'
+    )
+    assert df_cpue_std['CPUE_Standar_Total'].to_numpy() == pytest.approx(INDEKS)
+    assert df_upaya_std['B'].to_numpy() == pytest.approx(upaya['B'].to_numpy() * 2.5)
+    assert info['faktor'] == ['Tahun', 'Alat']
+
+
+def test_daya_relatif_alat_standar_dari_cpue_gabungan():
+    produksi = pd.DataFrame({'Tahun': [2000, 2001], 'A': [10.0, 30.0], 'B': [50.0, 30.0], 'C': [0.0, 0.0]})
+    upaya = pd.DataFrame({'Tahun': [2000, 2001], 'A': [10.0, 10.0], 'B': [5.0, 15.0], 'C': [0.0, 0.0]})
+    # CPUE gabungan: A = 40/20 = 2, B = 80/20 = 4, C tanpa upaya = 0
+    daya = main.daya_relatif_alat_standar(produksi, upaya, ['A', 'B', 'C'], 'A')
+    assert daya == pytest.approx({'A': 1.0, 'B': 2.0, 'C': 0.0})
+
+
+def test_daya_tetap_satu_perkalian_matriks():
+    produksi = pd.DataFrame({'Tahun': [2000, 2001], 'A': [20.0, 10.0], 'B': [60.0, 90.0]})
+    produksi['Jumlah'] = produksi[['A', 'B']].sum(axis=1)
+    # Baris upaya sengaja tidak berurutan: disejajarkan ke periode produksi
+    upaya = pd.DataFrame({'Tahun': [2001, 2000], 'A': [5.0, 10.0], 'B': [10.0, 20.0]})
+    
+    df_fpi, df_upaya_std, df_cpue_std = main.standardisasi_daya_tetap(
+        produksi, upaya, ['A', 'B'], {'A': 1.0, 'B': 1.5}
+    )
+    assert df_fpi[['A', 'B']].to_numpy().tolist() == [[1.0, 1.5], [1.0, 1.5]]
+    np.testing.assert_allclose(df_upaya_std[['A', 'B']], [[10, 30], [5, 15]])
+    np.testing.assert_allclose(df_upaya_std['Jumlah'], [40, 20])
+    np.testing.assert_allclose(df_cpue_std['A_Std_CPUE'], [2, 2])
+    np.testing.assert_allclose(df_cpue_std['CPUE_Standar_Total'], [2, 5])
+    np.testing.assert_allclose(df_cpue_std['Ln_CPUE'], np.log([2, 5]))
+
+
+def test_daya_tangkap_konfigurasi_diskalakan_ke_alat_standar():
+    produksi, upaya = tabel_multiplikatif(TAHUN, INDEKS, DAYA)
+    cpue = main.hitung_cpue(produksi, upaya, list(DAYA))
+    _, df_upaya_std, df_cpue_std, info = main.standardisasi_upaya(
+        produksi, upaya, cpue, list(DAYA), 'B', metode='daya_tangkap', daya_tangkap={'A': 2.0, 'B': 4.0}
+    )
+    # C tanpa konfigurasi bernilai 1 sebelum diskalakan
+    assert info['daya_relatif'] == pytest.approx({'A': 0.5, 'B': 1.0, 'C': 0.25})
+    np.testing.assert_allclose(df_upaya_std['C'], upaya['C'] * 0.25)
+    
+    # Upaya sebanding antar alat: CPUE gabungan per alat = DAYA × rata-rata indeks berbobot yang sama
+    for i, alat in enumerate(DAYA):
+        upaya[alat] = (i + 1) * (50.0 + np.arange(len(TAHUN)))
+        produksi[alat] = upaya[alat] * INDEKS * DAYA[alat]
+    produksi['Jumlah'] = produksi[list(DAYA)].sum(axis=1)
+    upaya['Jumlah'] = upaya[list(DAYA)].sum(axis=1)
+    _, _, df_cpue_std, info = main.standardisasi_upaya(
+        produksi, upaya, cpue, list(DAYA), 'A', metode='fpi_alat_standar'
+    )
+    assert info['daya_relatif'] == pytest.approx(DAYA)
+    np.testing.assert_allclose(df_cpue_std['CPUE_Standar_Total'], INDEKS)
+
+
+def test_glm_alat_standar_tanpa_tangkapan_dicatat():
+    produksi, upaya = tabel_multiplikatif(TAHUN, INDEKS, DAYA)
+    produksi['A'] = 0.0
+    produksi['Jumlah'] = produksi[list(DAYA)].sum(axis=1)
+    cpue = main.hitung_cpue(produksi, upaya, list(DAYA))
+    _, _, _, info = main.standardisasi_upaya(produksi, upaya, cpue, list(DAYA), 'A', metode='glm_lognormal')
+    # Alat A tidak punya tangkapan positif: referensi yang dipakai adalah level pertama lain, dan itu tercatat
+    assert info['referensi'] == {'Alat': 'B'}
+    assert info['daya_relatif'] == pytest.approx({'B': 1.0, 'C': 0.4 / 2.5})
+    assert any("'A'" in pesan for pesan in info['peringatan'])
+
+
+def test_glm_tahun_tanpa_indeks_tidak_ikut_fit(parameter_contoh):
+    # Semua alat tanpa tangkapan pada satu tahun: GLM log-normal tidak punya record tahun itu
+    for baris in parameter_contoh['production_data'][2:3]:
+        for alat in parameter_contoh['gears']:
+            baris[alat] = 0.0
+        baris['Jumlah'] = 0.0
+    tahun_kosong = parameter_contoh['production_data'][2]['Tahun']
+    hasil = main.jalankan_pipeline_analisis(**parameter_contoh, metode_standardisasi='glm_lognormal')
+    
+    assert hasil.info_standardisasi['tahun_tanpa_indeks'] == [tahun_kosong]
+    assert np.isnan(hasil.total('upaya_standar')[2]) and np.isnan(hasil.total('cpue_standar')[2])
+    for model_name in ('Schaefer', 'Fox'):
+        assert tahun_kosong not in hasil.msy_results[model_name]['tahun_fit']
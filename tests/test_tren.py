@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import main
+
+
+def test_mann_kendall_deret_monoton():
+    # S = -45, Var(S) = 10·9·25/18 = 125, Z = (S + 1)/√Var(S)
+    mk = main.uji_mann_kendall(10 - np.arange(10.0))
+    assert mk['tau'] == pytest.approx(-1.0)
+    assert mk['s'] == pytest.approx(-45.0)
+    assert mk['z'] == pytest.approx(-44 / np.sqrt(125))
+
+
+@pytest.mark.parametrize('n', [50, main.BATAS_SEN_LANGSUNG + 500])
+def test_kemiringan_sen_garis_dengan_pencilan(n):
+    x = np.arange(n, dtype=float)
+    y = 3.0 * x + 7.0
+    y[::10] += 1000.0  # pencilan tidak menggeser median kemiringan
+    kemiringan, intersep = main.kemiringan_sen(x, y)
+    assert kemiringan == pytest.approx(3.0, rel=1e-6)
+    assert intersep == pytest.approx(7.0, rel=1e-6)
+
+
+@pytest.mark.parametrize('noise', [
+    np.tile([0.05, -0.05], 10),
+    np.random.default_rng(1).normal(0, 0.2, 20)
+])
+def test_titik_perubahan_satu_lompatan(noise):
+    y = np.r_[np.full(10, 1.0), np.full(10, 5.0)] + noise
+    assert main.deteksi_titik_perubahan(y) == [10]
+
+
+def test_tren_tahunan_linear():
+    df = pd.DataFrame({'Tahun': np.arange(2000, 2010), 'A': 10 - 0.5 * np.arange(10)})
+    baris = main.analisis_tren_cpue(df, ['A'])['ringkasan'].iloc[0]
+    assert baris['Kemiringan Sen'] == pytest.approx(-0.5)
+    # Garis Sen 10 → 5,5 sepanjang 9 tahun: -45% dari nilai garis pada tahun pertama
+    assert baris['Perubahan Sen (%)'] == pytest.approx(-45.0)
+    assert baris['Arah'].startswith("📉")
+
+
+def test_perubahan_sen_tidak_di_bawah_minus_100():
+    df = pd.DataFrame({'Tahun': np.arange(2000, 2008), 'A': [10.0, 8.0, 6.0, 4.0, 2.0, 0.5, 0.0, 0.0]})
+    assert main.analisis_tren_cpue(df, ['A'])['ringkasan'].iloc[0]['Perubahan Sen (%)'] >= -100
+
+
+def test_tren_bulanan_dinyatakan_per_tahun():
+    waktu = [f'{tahun}-{bulan:02d}' for tahun in range(2015, 2020) for bulan in range(1, 13)]
+    df = pd.DataFrame({'Periode': waktu, 'A': 100 - 2 * np.arange(60) / 12})
+    tren = main.analisis_tren_cpue(df, ['A'], 'Periode')
+    baris = tren['ringkasan'].iloc[0]
+    assert baris['Kemiringan Sen'] == pytest.approx(-2.0)
+    assert baris['Kemiringan Terakhir'] == pytest.approx(-2.0)
+    assert all(isinstance(t, str) for t in tren['titik_perubahan']['A'])
+
+
+def test_pipeline_tren_per_alat(parameter_contoh):
+    hasil = main.jalankan_pipeline_analisis(**parameter_contoh)
+    tren = hasil.recommendations['tren_cpue']
+    assert [alat['alat'] for alat in tren['per_alat']] == parameter_contoh['display_names']
+    assert all(alat['perubahan_persen'] >= -100 for alat in tren['per_alat'] if np.isfinite(alat['perubahan_persen']))
+    assert tren['resolusi'] == 'Tahun'
+
+
+def test_pipeline_tren_pada_resolusi_bulanan():
+    waktu = [f'{tahun}-{bulan:02d}' for tahun in range(2015, 2021) for bulan in range(1, 13)]
+    produksi = [{'Periode': p, 'A': 100.0 + (i % 12), 'B': 50.0 + i % 5} for i, p in enumerate(waktu)]
+    upaya = [{'Periode': p, 'A': 10.0 + i / 6, 'B': 20.0} for i, p in enumerate(waktu)]
+    for tabel in (produksi, upaya):
+        for baris in tabel:
+            baris['Jumlah'] = baris['A'] + baris['B']
+    hasil = main.jalankan_pipeline_analisis(
+        produksi, upaya, ['A', 'B'], ['Alat A', 'Alat B'], 'A', ['Schaefer'], 0.58, kolom_waktu='Periode'
+    )
+    tren = hasil.recommendations['tren_cpue']
+    assert tren['resolusi'] == 'Periode'
+    alat_a = next(alat for alat in tren['per_alat'] if alat['alat'] == 'Alat A')
+    assert alat_a['signifikan'] and alat_a['kemiringan_sen'] < 0
+
+
+def test_rekomendasi_memuat_alat_dengan_cpue_menurun(parameter_contoh):
+    hasil = main.jalankan_pipeline_analisis(**parameter_contoh)
+    tren = dict(hasil.recommendations['tren_cpue'], signifikan=False, per_alat=[
+        {'alat': 'Pancing', 'arah': "📉 Menurun signifikan", 'p_value': 0.01,
+         'kemiringan_sen': -0.2, 'perubahan_persen': -40.0, 'signifikan': True}
+    ])
+    rekomendasi = main.analisis_status_stok(
+        hasil.msy_results, hasil.total('produksi'), hasil.total('upaya_standar'), hasil.years, tren_cpue=tren
+    )
+    assert 'Pancing' in rekomendasi['peringatan_tren']
+
+
+def test_tren_per_alat_memakai_cpue_nominal(parameter_contoh):
+    # Metode FPI per tahun menyamakan CPUE standar semua alat pada satu tahun: uji per alat harus pada CPUE nominal
+    hasil = main.jalankan_pipeline_analisis(**parameter_contoh)
+    per_alat = hasil.recommendations['tren_cpue']['per_alat']
+    gears = parameter_contoh['gears']
+    harapan = main.analisis_tren_cpue(hasil.df_cpue, gears)['ringkasan']
+    assert [alat['p_value'] for alat in per_alat] == pytest.approx(harapan['p-value'].tolist())
+    assert [alat['kemiringan_sen'] for alat in per_alat] == pytest.approx(harapan['Kemiringan Sen'].tolist())
+    assert len({round(alat['p_value'], 6) for alat in per_alat}) == len(gears)
+
+
+def test_tab_tren_memakai_tren_tersimpan_yang_sama_dengan_rekomendasi(parameter_contoh):
+    hasil = main.HasilAnalisis.dari_bytes(main.jalankan_pipeline_analisis(**parameter_contoh).ke_bytes())
+    tren = main.tren_hasil(hasil)
+    total = tren['ringkasan'].set_index('Deret').loc[main.KOLOM_TREN_TOTAL]
+    rekomendasi = hasil.recommendations['tren_cpue']
+    assert total['p-value'] == pytest.approx(rekomendasi['p_value'])
+    assert total['Kemiringan Sen'] == pytest.approx(rekomendasi['kemiringan_sen'])
+    np.testing.assert_allclose(tren['data'][main.KOLOM_TREN_TOTAL], hasil.df_standard_cpue['CPUE_Standar_Total'])
+
+
+def test_grafik_tren_resolusi_bulanan():
+    waktu = [f'{tahun}-{bulan:02d}' for tahun in range(2015, 2019) for bulan in range(1, 13)]
+    produksi = [{'Periode': p, 'A': 100.0 + 40 * (i >= 24), 'B': 50.0} for i, p in enumerate(waktu)]
+    upaya = [{'Periode': p, 'A': 10.0, 'B': 20.0} for p in waktu]
+    for tabel in (produksi, upaya):
+        for baris in tabel:
+            baris['Jumlah'] = baris['A'] + baris['B']
+    hasil = main.jalankan_pipeline_analisis(
+        produksi, upaya, ['A', 'B'], ['Alat A', 'Alat B'], 'A', ['Schaefer'], 0.58, kolom_waktu='Periode'
+    )
+    tren = main.tren_hasil(hasil)
+    assert len(tren['data']) == len(waktu)
+    # Lompatan di awal 2017: batas setengah bulan sebelum Januari 2017
+    assert main.posisi_titik_perubahan(tren['data'], tren) == pytest.approx([2017 - 1 / 24])
+    spesifikasi = main.vega_trend_cpue(tren)
+    assert len(spesifikasi['layer'][0]['data']['values']) == len(waktu)
+    main.plt.close(main.buat_grafik_trend_cpue_total(tren))
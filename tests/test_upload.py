@@ -0,0 +1,90 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import main
+from conftest import PATH_MAIN
+
+
+def unggahan(waktu, **kolom_waktu_tambahan):
+    """Data upload dua alat tangkap dengan kolom waktu `waktu` (kolom pertama bernama sesuai kunci)"""
+    n = len(next(iter(waktu.values())))
+    produksi = pd.DataFrame({**waktu, **kolom_waktu_tambahan, 'Pancing': np.arange(n) + 100.0, 'Bagan': 50.0})
+    upaya = pd.DataFrame({**waktu, **kolom_waktu_tambahan, 'Pancing': 10.0, 'Bagan': 5.0})
+    return {'production': produksi, 'effort': upaya}
+
+
+def test_upload_tahunan_tetap_tahun():
+    data = main.convert_uploaded_data(unggahan({'Tahun': [2020, 2021, 'Total']}), log=[])
+    assert main.kolom_waktu_tabel(data['production']) == 'Tahun'
+    assert [baris['Tahun'] for baris in data['production']] == [2020, 2021]
+    assert data['gears'] == ['Pancing', 'Bagan']
+
+
+@pytest.mark.parametrize('waktu, tambahan, harapan', [
+    ({'Periode': ['2021-01', '2021-02', '2021-03']}, {}, ['2021-01', '2021-02', '2021-03']),
+    ({'Tanggal': pd.to_datetime(['2021-01-01', '2021-02-01', '2021-03-01'])}, {}, ['2021-01', '2021-02', '2021-03']),
+    ({'Tahun': [2021, 2021, 2021]}, {'Bulan': ['Januari', 2, 'Mar']}, ['2021-01', '2021-02', '2021-03']),
+    ({'Periode': ['2021Q1', '2021 Q2', '2021-Q3']}, {}, ['2021Q1', '2021Q2', '2021Q3']),
+])
+def test_upload_sub_tahunan_menjadi_periode(waktu, tambahan, harapan):
+    data = main.convert_uploaded_data(unggahan(waktu, **tambahan), log=[])
+    assert main.kolom_waktu_tabel(data['production']) == main.KOLOM_PERIODE
+    assert [baris['Periode'] for baris in data['production']] == harapan
+    assert data['gears'] == ['Pancing', 'Bagan']
+
+
+def test_upload_resolusi_berbeda_ditolak():
+    data = unggahan({'Periode': ['2021-01', '2021-02']})
+    data['effort'] = unggahan({'Tahun': [2021, 2022]})['effort']
+    log = []
+    assert main.convert_uploaded_data(data, log=log) is None
+    assert any(level == 'error' for level, _ in log)
+
+
+def test_gabung_file_periode_diurutkan():
+    bagian = [
+        main.convert_uploaded_data(unggahan({'Periode': waktu}), log=[])
+        for waktu in (['2021-03', '2021-04'], ['2020-12', '2021-01'])
+    ]
+    gabung = main.gabungkan_data_upload(bagian, log=[])
+    assert [baris['Periode'] for baris in gabung['production']] == ['2020-12', '2021-01', '2021-03', '2021-04']
+
+
+def test_analisis_bulanan_dari_aplikasi():
+    waktu = [f'{tahun}-{bulan:02d}' for tahun in range(2018, 2024) for bulan in range(1, 13)]
+    data = main.convert_uploaded_data(unggahan({'Periode': waktu}), log=[])
+    # Upaya menurun agar model produksi surplus punya kontras
+    for i, baris in enumerate(data['effort']):
+        baris['Pancing'] = 30.0 - i / 4
+        baris['Jumlah'] = baris['Pancing'] + baris['Bagan']
+    
+    at = AppTest.from_file(PATH_MAIN, default_timeout=120)
+    at.run()
+    at.session_state.data_tables = {'production': data['production'], 'effort': data['effort']}
+    at.session_state.gear_config = {
+        'gears': data['gears'], 'display_names': data['gears'], 'standard_gear': 'Pancing',
+        'years': list(range(2018, 2024)), 'num_years': 6
+    }
+    at.session_state.advanced_gears_config = []
+    at.run()
+    [b for b in at.button if 'LAKUKAN ANALISIS' in b.label][0].click().run()
+    for _ in range(120):
+        if any(r.key == 'bagian_hasil_analisis' for r in at.radio):
+            break
+        time.sleep(0.5)
+        at.run()
+    assert not at.exception, at.exception
+    
+    [r for r in at.radio if r.key == 'bagian_hasil_analisis'][0].set_value("🎣 CPUE & FPI").run()
+    assert not at.exception, at.exception
+    assert any(df.value.columns[0] == 'Periode' and len(df.value) == len(waktu) for df in at.dataframe)
+    
+    # Editor manual (berindeks tahun) tidak ditampilkan sehingga data periode tidak tertimpa
+    at.sidebar.radio[0].set_value('✏️ INPUT DATA').run()
+    assert not at.exception, at.exception
+    assert any('sub-tahunan' in info.value for info in at.info)
+    assert not any('Simpan Data Manual' in b.label for b in at.button)